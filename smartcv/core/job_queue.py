@@ -0,0 +1,237 @@
+# core/job_queue.py
+"""
+Reliable Redis job queue shared by the LLM gateway and the LaTeX compile service.
+
+Producers push JSON jobs onto a list (JobQueue.submit). A Consumer runs them
+as coroutines on one asyncio loop, at most `max_in_flight` at once:
+
+  * a job is moved onto the consumer's own processing list while it runs
+    and removed once it is settled;
+  * every consumer refreshes a heartbeat key; any consumer re-queues the
+    processing lists of instances whose heartbeat expired, so recovery does
+    not depend on a crashed instance restarting under the same name;
+  * a job that raises is retried up to JOB_MAX_ATTEMPTS times, then logged
+    and kept on the queue's failed list;
+  * Redis errors in the loop are logged and retried with backoff instead of
+    ending the consumer.
+
+RQ is not used for these because its workers run one synchronous job per
+process: the gateway exists to keep dozens of model calls open in a single
+event loop, and the compile service keeps warm scratch directories between
+jobs, which RQ's per-job work horse would throw away.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import signal
+import asyncio
+import logging
+
+from redis.exceptions import RedisError
+
+from core.utils.llm_stream import async_redis
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+_POLL_TIMEOUT = 5  # seconds a BLMOVE waits before re-checking for shutdown
+_HEARTBEAT_TTL = 30
+_HEARTBEAT_EVERY = 10
+_RECOVER_EVERY = 60
+_BACKOFF_MAX = 30
+_FAILED_KEEP = 1000
+
+
+def _redis():
+    import django_rq
+    return django_rq.get_connection("default")
+
+
+def _text(value) -> str:
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+# ------------------ PRODUCER SIDE ------------------
+class JobQueue:
+    def __init__(self, prefix: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self.jobs_key = f"{prefix}:jobs"
+        self.failed_key = f"{prefix}:failed"
+
+    def processing_key(self, name: str) -> str:
+        return f"{self.prefix}:processing:{name}"
+
+    def alive_key(self, name: str) -> str:
+        return f"{self.prefix}:alive:{name}"
+
+    def submit(self, **fields) -> str:
+        """Queue a job (fields must be JSON-serializable). Returns the job id."""
+        job_id = uuid.uuid4().hex
+        _redis().lpush(self.jobs_key, json.dumps({"id": job_id, "attempts": 0, **fields}))
+        return job_id
+
+    def depth(self) -> int:
+        return _redis().llen(self.jobs_key)
+
+    def in_progress(self) -> int:
+        conn = _redis()
+        return sum(conn.llen(k) for k in conn.scan_iter(self.processing_key("*")))
+
+    def failed_count(self) -> int:
+        return _redis().llen(self.failed_key)
+
+
+# ------------------ CONSUMER SIDE ------------------
+class Consumer:
+    """
+    Runs `handler(job)` for the jobs of `queue`. The handler is a coroutine
+    function; raising marks the attempt as failed.
+    """
+
+    def __init__(self, queue: JobQueue, handler, max_in_flight: int, name: str = None):
+        self.queue = queue
+        self.handler = handler
+        self.max_in_flight = max_in_flight
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processing_key = queue.processing_key(self.name)
+        self._stopping = asyncio.Event()
+        self._in_flight = set()
+        self._unsettled = {}  # raw job → error (None = succeeded) whose settling hit a Redis error
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _sleep(self, seconds: float):
+        """Sleep, but wake up as soon as stop() is called."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self, conn):
+        while True:
+            try:
+                await conn.set(self.queue.alive_key(self.name), int(time.time()), ex=_HEARTBEAT_TTL)
+            except RedisError as e:
+                logger.warning(f"⚠️ {self.name}: heartbeat failed: {e}")
+            await asyncio.sleep(_HEARTBEAT_EVERY)
+
+    async def _settle(self, conn, raw, error=None):
+        """Drop a finished job from the processing list; failed ones are retried or recorded."""
+        if error is None:
+            await conn.lrem(self.processing_key, 1, raw)
+            return
+
+        try:
+            job = json.loads(raw)
+        except ValueError:
+            job = None
+
+        pipe = conn.pipeline(transaction=True)
+        if isinstance(job, dict) and job.get("attempts", 0) + 1 < self.queue.max_attempts:
+            job["attempts"] = job.get("attempts", 0) + 1
+            pipe.lpush(self.queue.jobs_key, json.dumps(job))
+            logger.warning(f"🔁 Retrying {self.queue.prefix} job (attempt {job['attempts'] + 1}): {error}")
+        else:
+            pipe.lpush(self.queue.failed_key, json.dumps({"job": _text(raw), "error": error, "failed_at": int(time.time())}))
+            pipe.ltrim(self.queue.failed_key, 0, _FAILED_KEEP - 1)
+            logger.error(f"❌ {self.queue.prefix} job gave up: {error} — {_text(raw)[:200]!r}")
+        pipe.lrem(self.processing_key, 1, raw)
+        await pipe.execute()
+
+    async def _settle_leftovers(self, conn):
+        """Settle jobs whose first settling attempt hit a Redis error."""
+        for raw, error in list(self._unsettled.items()):
+            await self._settle(conn, raw, error)
+            del self._unsettled[raw]
+
+    async def _recover(self, conn):
+        """Re-queue the jobs of instances whose heartbeat expired."""
+        await self._settle_leftovers(conn)
+        prefix = self.queue.processing_key("")
+        async for key in conn.scan_iter(match=self.queue.processing_key("*")):
+            name = _text(key)[len(prefix):]
+            if name == self.name or await conn.exists(self.queue.alive_key(name)):
+                continue
+            recovered = 0
+            # LMOVE is atomic, so concurrent recoverers never take the same job
+            while (raw := await conn.lmove(key, self.processing_key, "RIGHT", "LEFT")) is not None:
+                await self._settle(conn, raw, f"consumer {name} stopped while running the job")
+                recovered += 1
+            if recovered:
+                logger.warning(f"♻️ Re-queued {recovered} unfinished {self.queue.prefix} job(s) from {name}")
+
+    async def _run(self, conn, raw, slots):
+        error = None
+        try:
+            await self.handler(json.loads(raw))
+        except Exception as e:
+            logger.exception(f"❌ {self.queue.prefix} job failed: {_text(raw)[:200]!r}")
+            error = f"{type(e).__name__}: {e}"
+        try:
+            await self._settle(conn, raw, error)
+        except RedisError as e:
+            logger.warning(f"⚠️ Could not settle {self.queue.prefix} job, will retry: {e}")
+            self._unsettled[raw] = error
+        finally:
+            slots.release()
+
+    async def serve(self):
+        conn = async_redis()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        heartbeat = asyncio.create_task(self._heartbeat(conn))
+        next_recover = 0
+        backoff = 1
+        logger.info(f"🚀 {self.queue.prefix} consumer {self.name} serving (max in flight: {self.max_in_flight})")
+
+        try:
+            while not self._stopping.is_set():
+                # Only pull a job once there is a free slot to run it
+                await slots.acquire()
+                try:
+                    if time.monotonic() >= next_recover:
+                        await self._recover(conn)
+                        next_recover = time.monotonic() + _RECOVER_EVERY
+                    raw = await conn.blmove(self.queue.jobs_key, self.processing_key, _POLL_TIMEOUT, "RIGHT", "LEFT")
+                    backoff = 1
+                except RedisError as e:
+                    slots.release()
+                    logger.warning(f"⚠️ {self.queue.prefix}: Redis error, retrying in {backoff}s: {e}")
+                    await self._sleep(backoff)
+                    backoff = min(backoff * 2, _BACKOFF_MAX)
+                    continue
+                if raw is None:
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._run(conn, raw, slots))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+        finally:
+            if self._in_flight:
+                logger.info(f"⏳ Waiting for {len(self._in_flight)} in-flight {self.queue.prefix} job(s)")
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
+            heartbeat.cancel()
+            try:
+                await self._settle_leftovers(conn)
+                await conn.delete(self.queue.alive_key(self.name))
+            except RedisError as e:
+                logger.warning(f"⚠️ {self.name}: cleanup failed, jobs are recovered once the heartbeat expires: {e}")
+            await conn.aclose()
+
+
+def run(service):
+    """
+    Blocking entry point for a Consumer (or anything with serve() / stop()):
+    serve until SIGINT/SIGTERM, then drain in-flight jobs.
+    """
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, service.stop)
+        await service.serve()
+
+    asyncio.run(main())
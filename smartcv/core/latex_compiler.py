@@ -0,0 +1,143 @@
+# core/latex_compiler.py
+"""
+Warm LaTeX compile service.
+
+Instead of every RQ job paying for a fresh temp tree and a cold tectonic
+start, compile_latex_task hands LatexResume ids to a long-lived pool of
+compile threads:
+
+    python manage.py run_latex_compiler --seed      # once, with network
+    LATEX_COMPILER_ENABLED=1 python manage.py run_latex_compiler --workers 4
+
+Each thread keeps its own scratch directory and all of them share the
+pinned TECTONIC_CACHE_DIR, which runs --only-cached (fully offline) once
+seeded. Jobs sit on a core.job_queue queue, like the LLM gateway's: jobs
+held by an instance that dies are re-queued by the others, failing jobs
+are retried, then logged on the queue's failed list, and Redis outages
+are waited out. Per-compile timings are kept in Redis:
+
+    python manage.py run_latex_compiler --stats
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+from core import job_queue
+from core.utils.latex_tools import CompileWorkdir
+
+logger = logging.getLogger(__name__)
+
+LATEX_COMPILER_ENABLED = os.getenv("LATEX_COMPILER_ENABLED", "0") == "1"
+LATEX_COMPILER_WORKERS = int(os.getenv("LATEX_COMPILER_WORKERS", "2"))
+
+QUEUE = job_queue.JobQueue("latex_compiler")
+
+_TIMINGS_KEY = "latex_compiler:timings"
+_TIMINGS_KEEP = 500
+
+
+def _redis():
+    import django_rq
+    return django_rq.get_connection("default")
+
+
+# ------------------ PRODUCER SIDE ------------------
+def submit(latex_resume_id) -> str:
+    """Queue a stored LaTeX source for compilation. Returns the job id."""
+    return QUEUE.submit(latex_resume_id=latex_resume_id)
+
+
+def queue_depth() -> int:
+    return QUEUE.depth()
+
+
+# ------------------ TIMINGS ------------------
+def record_timing(ms: float, ok: bool):
+    try:
+        conn = _redis()
+        conn.lpush(_TIMINGS_KEY, json.dumps({"ms": round(ms, 1), "ok": ok, "at": int(time.time())}))
+        conn.ltrim(_TIMINGS_KEY, 0, _TIMINGS_KEEP - 1)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not record compile timing: {e}")
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def stats() -> dict:
+    """Queue depth, jobs in progress / given up and latency over the last compiles."""
+    timings = [json.loads(t) for t in _redis().lrange(_TIMINGS_KEY, 0, -1)]
+    ok = [t["ms"] for t in timings if t["ok"]]
+    return {
+        "queue_depth": QUEUE.depth(),
+        "in_progress": QUEUE.in_progress(),
+        "failed_jobs": QUEUE.failed_count(),
+        "recent_compiles": len(timings),
+        "recent_failures": len(timings) - len(ok),
+        "p50_ms": _percentile(ok, 50),
+        "p95_ms": _percentile(ok, 95),
+        "max_ms": max(ok) if ok else None,
+    }
+
+
+# ------------------ CONSUMER SIDE ------------------
+class CompileService:
+    """
+    A job_queue consumer in front of `workers` compile threads. Each thread
+    creates its CompileWorkdir on first use and keeps it until shutdown.
+    """
+
+    def __init__(self, name: str = None, workers: int = LATEX_COMPILER_WORKERS):
+        self.workers = workers
+        self.consumer = job_queue.Consumer(QUEUE, self._handle, max_in_flight=workers, name=name)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="latex-compiler")
+        self._local = threading.local()
+        self._workdirs = []
+
+    def stop(self):
+        self.consumer.stop()
+
+    def _compile(self, latex_resume_id):
+        # core.tasks imports submit() from here, so the task is imported lazily.
+        from core.tasks import compile_latex_task
+
+        workdir = getattr(self._local, "workdir", None)
+        if workdir is None:
+            workdir = self._local.workdir = CompileWorkdir()
+            self._workdirs.append(workdir)
+
+        close_old_connections()
+        start = time.perf_counter()
+        ok = False
+        try:
+            ok = compile_latex_task(latex_resume_id, workdir=workdir)
+            return ok
+        finally:
+            record_timing((time.perf_counter() - start) * 1000, bool(ok))
+            close_old_connections()
+
+    async def _handle(self, job):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._compile, job["latex_resume_id"])
+
+    async def serve(self):
+        try:
+            await self.consumer.serve()
+        finally:
+            self._executor.shutdown(wait=True)
+            for workdir in self._workdirs:
+                workdir.close()
+
+
+def run(name: str = None, workers: int = LATEX_COMPILER_WORKERS):
+    """Blocking entry point: serve until SIGINT/SIGTERM, letting running compiles finish."""
+    job_queue.run(CompileService(name=name, workers=workers))
@@ -0,0 +1,133 @@
+# core/latex_sections.py
+"""
+Section-level storage and incremental regeneration for template-rendered
+LaTeX resumes (LATEX_RENDER_MODE=template).
+
+After a full generation the structured content is split into LatexSection
+rows — the contact header plus one row per section — each with a hash of
+its content. An edit then touches only the fragments it names:
+
+  * edits    {key: new content}  replace a fragment without a model call
+  * guidance {key: instruction}  regenerate a fragment with one small call
+
+Unchanged fragments (same content hash, or guidance already applied) are
+skipped, and the document is reassembled from all rows and recompiled.
+"""
+import json
+import hashlib
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from core.models import LatexSection
+from core.utils.clean_ai_output import conform
+from core.utils.response_schemas import LATEX_CONTENT_SCHEMA, LATEX_SECTION_SCHEMA
+from core.utils.latex_resume_generator import generate_section
+
+HEADER_KEY = "header"
+HEADER_FIELDS = ("name", "email", "phone", "website", "linkedin")
+HEADER_SCHEMA = {
+    **LATEX_CONTENT_SCHEMA,
+    "properties": {k: LATEX_CONTENT_SCHEMA["properties"][k] for k in HEADER_FIELDS},
+    "required": list(HEADER_FIELDS),
+}
+
+
+def content_hash(content) -> str:
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def guidance_hash(guidance: str) -> str:
+    text = " ".join((guidance or "").split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else ""
+
+
+def _keys(sections):
+    """Stable, unique slugs for section titles ("Experience" → "experience")."""
+    taken = {HEADER_KEY}
+    keys = []
+    for section in sections:
+        base = (slugify(section.get("title", "")) or "section")[:45]
+        key, n = base, 2
+        while key in taken:
+            key, n = f"{base}-{n}", n + 1
+        taken.add(key)
+        keys.append(key)
+    return keys
+
+
+# ------------------ STORE / ASSEMBLE ------------------
+def store_sections(latex_resume_id, content: dict):
+    """Replace the stored fragments of a LatexResume with freshly generated content."""
+    content, _ = conform(content, LATEX_CONTENT_SCHEMA)
+    header = {k: content[k] for k in HEADER_FIELDS}
+    fragments = [(HEADER_KEY, header)] + list(zip(_keys(content["sections"]), content["sections"]))
+
+    with transaction.atomic():
+        LatexSection.objects.filter(latex_resume_id=latex_resume_id).delete()
+        LatexSection.objects.bulk_create([
+            LatexSection(
+                latex_resume_id=latex_resume_id, key=key, position=position,
+                content=fragment, content_hash=content_hash(fragment),
+            )
+            for position, (key, fragment) in enumerate(fragments)
+        ])
+
+
+def assemble(latex_resume_id) -> dict:
+    """Rebuild the full content dict (render_latex input) from the stored fragments."""
+    content = {k: "" for k in HEADER_FIELDS}
+    content["sections"] = []
+    for row in LatexSection.objects.filter(latex_resume_id=latex_resume_id).order_by("position"):
+        if row.key == HEADER_KEY:
+            content.update(row.content)
+        else:
+            content["sections"].append(row.content)
+    return content
+
+
+# ------------------ INCREMENTAL CHANGES ------------------
+def apply_changes(latex_resume_id, guidance: dict = None, edits: dict = None):
+    """
+    Apply direct edits and per-section guidance. Returns the keys whose
+    content actually changed. Raises ValueError for unknown section keys.
+    """
+    guidance = guidance or {}
+    edits = edits or {}
+    rows = {row.key: row for row in LatexSection.objects.filter(latex_resume_id=latex_resume_id)}
+    unknown = sorted((set(guidance) | set(edits)) - set(rows))
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}")
+    if HEADER_KEY in guidance:
+        raise ValueError("The header can only be edited directly, not regenerated.")
+
+    # Model calls first: no row is written until every fragment is ready, and
+    # no transaction is held open across a model call.
+    updates = []
+    for key, row in rows.items():
+        if key not in edits and key not in guidance:
+            continue
+        content, g_hash = row.content, row.guidance_hash
+        if key in edits:
+            if key == HEADER_KEY:
+                content = {k: v for k, v in conform(edits[key], HEADER_SCHEMA)[0].items() if k in HEADER_FIELDS}
+            else:
+                content, _ = conform(edits[key], LATEX_SECTION_SCHEMA)
+            g_hash = ""  # hand-edited: earlier guidance no longer describes it
+
+        new_g_hash = guidance_hash(guidance.get(key))
+        if new_g_hash and new_g_hash != g_hash:
+            content = generate_section(content, guidance[key])
+            g_hash = new_g_hash
+        updates.append((row, content, g_hash))
+
+    changed = []
+    with transaction.atomic():
+        for row, content, g_hash in updates:
+            new_hash = content_hash(content)
+            if new_hash != row.content_hash:
+                changed.append(row.key)
+            row.content, row.content_hash, row.guidance_hash = content, new_hash, g_hash
+            row.save(update_fields=["content", "content_hash", "guidance_hash", "updated_at"])
+    return changed
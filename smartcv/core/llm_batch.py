@@ -0,0 +1,291 @@
+# core/llm_batch.py
+"""
+Deferred (batch) mode for non-urgent model calls.
+
+Bulk re-analysis and overnight imports run the normal RQ tasks with
+deferred=True: extraction and local checks happen as usual, but the model
+request is stored as a DeferredLLMRequest instead of being sent.
+
+Deferring a request schedules run_round() on the default RQ queue (the
+workers must run `python manage.py rqworker default --with-scheduler`). A
+round submits everything pending as one JSONL file to the Batch API, polls
+open batches, writes finished results back into ResumeAnalysis / JDMatch,
+and schedules the next round while anything is still open. Without the RQ
+scheduler, run the same rounds from cron or a long-running process:
+
+    python manage.py run_llm_batches --loop
+
+Live users keep the interactive rate limit to themselves.
+"""
+import io
+import os
+import json
+import uuid
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import DeferredLLMRequest, LLMBatch
+from core.utils.llm_cache import cache_get
+from core.utils.openai_client import get_batch_client
+from core.utils.general_cv_analysis import prepare_analysis, finish_analysis
+from core.utils.jd_resume_analysis import prepare_jd_match, finish_jd_match
+
+logger = logging.getLogger(__name__)
+
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "5000"))
+LLM_BATCH_COMPLETION_WINDOW = os.getenv("LLM_BATCH_COMPLETION_WINDOW", "24h")
+# Seconds between deferring a request and its round (lets bulk work pile up
+# into one batch), and between rounds while batches are open.
+LLM_BATCH_SUBMIT_DELAY = int(os.getenv("LLM_BATCH_SUBMIT_DELAY", "60"))
+LLM_BATCH_POLL_INTERVAL = int(os.getenv("LLM_BATCH_POLL_INTERVAL", "300"))
+# A claim older than this is from a crashed submitter: its requests go back to PENDING.
+LLM_BATCH_SUBMIT_TIMEOUT = int(os.getenv("LLM_BATCH_SUBMIT_TIMEOUT", "600"))
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Provider statuses after which a batch will not change any more
+_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+# ...and those where unanswered requests should simply go out again
+_RETRYABLE = {"expired", "cancelled"}
+
+_ROUND_KEY = "llm_batch:round_scheduled"
+
+
+# ------------------ DEFERRING ------------------
+def defer_resume_analysis(resume_id, text, local_check):
+    """Queue the AI analysis of a resume for the next batch (cache hits are stored at once)."""
+    request, key, budget = prepare_analysis(text)
+    cached = cache_get(key)
+    if cached is not None:
+        _store_analysis(resume_id, {**cached, "token_budget": budget}, local_check)
+        return None
+    row = DeferredLLMRequest.objects.create(
+        stage="resume_analysis", object_id=resume_id, body=request, cache_key=key,
+        payload={"local_check": local_check, "token_budget": budget},
+    )
+    schedule_round()
+    return row
+
+
+def defer_jd_match(jd_id, resume_text, jd_text):
+    """Queue a resume ↔ JD match for the next batch (cache hits are stored at once)."""
+    request, key, budget = prepare_jd_match(resume_text, jd_text)
+    cached = cache_get(key)
+    if cached is not None:
+        _store_jd(jd_id, {**cached, "token_budget": budget})
+        return None
+    row = DeferredLLMRequest.objects.create(
+        stage="jd_match", object_id=jd_id, body=request, cache_key=key,
+        payload={"token_budget": budget},
+    )
+    schedule_round()
+    return row
+
+
+# ------------------ STORING RESULTS ------------------
+# core.tasks imports the defer_* helpers from here, so its store helpers are imported lazily.
+
+def _store_analysis(resume_id, ai_result, local_check):
+    from core.tasks import store_resume_analysis
+    store_resume_analysis(resume_id, {"status": "SUCCESS", "local_check": local_check, "ai_analysis": ai_result})
+
+
+def _store_jd(jd_id, result):
+    from core.tasks import store_jd_result
+    store_jd_result(jd_id, {"status": "SUCCESS", "match": result})
+
+
+def _store_failure(row, error):
+    from core.tasks import store_resume_analysis, store_jd_result
+    if row.stage == "resume_analysis":
+        store_resume_analysis(row.object_id, {"status": "FAILED", "error": error})
+    else:
+        store_jd_result(row.object_id, {"status": "FAILED", "error": error})
+
+
+def _store_success(row, content):
+    budget = row.payload.get("token_budget")
+    if row.stage == "resume_analysis":
+        result = finish_analysis(content, row.cache_key, budget)
+        _store_analysis(row.object_id, result, row.payload.get("local_check"))
+    else:
+        _store_jd(row.object_id, finish_jd_match(content, row.cache_key, budget))
+
+
+# ------------------ SUBMIT ------------------
+def _custom_id(row) -> str:
+    return f"req-{row.id}"
+
+
+def _release(batch):
+    """Hand the requests of an unsent batch back to PENDING and drop the claim."""
+    with transaction.atomic():
+        batch.requests.update(status="PENDING", batch=None)
+        batch.delete()
+
+
+def _release_stale_claims():
+    cutoff = timezone.now() - timedelta(seconds=LLM_BATCH_SUBMIT_TIMEOUT)
+    for batch in LLMBatch.objects.filter(status="SUBMITTING", created_at__lt=cutoff):
+        logger.warning(f"♻️ Releasing requests of an unfinished submission ({batch.provider_batch_id})")
+        _release(batch)
+
+
+def submit_pending(max_requests: int = LLM_BATCH_MAX_REQUESTS):
+    """
+    Send up to `max_requests` pending requests as one batch.
+    Returns the LLMBatch, or None when nothing is pending.
+
+    Requests are claimed in a short transaction (a SUBMITTING placeholder
+    batch), the file upload and batch creation run outside any transaction,
+    and the result is recorded in a second short one.
+    """
+    _release_stale_claims()
+
+    with transaction.atomic():
+        rows = list(
+            DeferredLLMRequest.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="PENDING")
+            .order_by("id")[:max_requests]
+        )
+        if not rows:
+            return None
+        batch = LLMBatch.objects.create(
+            provider_batch_id=f"submitting-{uuid.uuid4().hex}", status="SUBMITTING", request_count=len(rows),
+        )
+        DeferredLLMRequest.objects.filter(id__in=[r.id for r in rows]).update(status="SUBMITTING", batch=batch)
+
+    lines = [
+        json.dumps({"custom_id": _custom_id(r), "method": "POST", "url": BATCH_ENDPOINT, "body": r.body},
+                   ensure_ascii=False)
+        for r in rows
+    ]
+    try:
+        client = get_batch_client()
+        input_file = client.files.create(
+            file=("smartcv_batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch",
+        )
+        provider_batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=LLM_BATCH_COMPLETION_WINDOW,
+        )
+    except Exception:
+        _release(batch)
+        raise
+
+    with transaction.atomic():
+        batch.provider_batch_id = provider_batch.id
+        batch.input_file_id = input_file.id
+        batch.status = "SUBMITTED"
+        batch.save(update_fields=["provider_batch_id", "input_file_id", "status"])
+        batch.requests.update(status="SUBMITTED")
+
+    logger.info(f"📦 Submitted batch {batch.provider_batch_id} with {len(rows)} request(s)")
+    return batch
+
+
+# ------------------ POLL + FAN OUT ------------------
+def _read_lines(client, file_id):
+    if not file_id:
+        return []
+    text = client.files.content(file_id).text
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _fan_out(batch, client):
+    """Write every answered request back to its ResumeAnalysis / JDMatch."""
+    rows = {_custom_id(r): r for r in batch.requests.filter(status="SUBMITTED")}
+
+    for line in _read_lines(client, batch.output_file_id) + _read_lines(client, batch.error_file_id):
+        row = rows.pop(line.get("custom_id"), None)
+        if row is None:
+            continue
+        response = line.get("response") or {}
+        try:
+            if line.get("error") or response.get("status_code") != 200:
+                error = line.get("error") or response.get("body", {}).get("error") or "Batch request failed"
+                raise RuntimeError(error.get("message", error) if isinstance(error, dict) else error)
+            content = response["body"]["choices"][0]["message"]["content"]
+            _store_success(row, content)
+            row.status = "DONE"
+        except Exception as e:
+            _store_failure(row, f"GPT-5 batch request failed: {e}")
+            row.status = "FAILED"
+        row.save(update_fields=["status"])
+    return list(rows.values())  # requests the provider never answered
+
+
+def poll_batches():
+    """
+    Check every open batch; fan results out for the ones that finished.
+    Returns the list of batches that reached a final state.
+    """
+    client = get_batch_client()
+    finished = []
+    for batch in LLMBatch.objects.filter(status="SUBMITTED").order_by("id"):
+        provider_batch = client.batches.retrieve(batch.provider_batch_id)
+        if provider_batch.status not in _TERMINAL:
+            continue
+
+        batch.output_file_id = provider_batch.output_file_id or ""
+        batch.error_file_id = provider_batch.error_file_id or ""
+        unanswered = _fan_out(batch, client)
+
+        if provider_batch.status in _RETRYABLE:
+            # Window ran out / cancelled: send the rest again with the next batch
+            DeferredLLMRequest.objects.filter(id__in=[r.id for r in unanswered]).update(status="PENDING", batch=None)
+        else:
+            for row in unanswered:
+                _store_failure(row, f"Batch {provider_batch.status} without a result for this request.")
+            DeferredLLMRequest.objects.filter(id__in=[r.id for r in unanswered]).update(status="FAILED")
+
+        batch.status = "COMPLETED" if provider_batch.status == "completed" else "FAILED"
+        batch.completed_at = timezone.now()
+        batch.save(update_fields=["status", "output_file_id", "error_file_id", "completed_at"])
+        logger.info(f"✅ Batch {batch.provider_batch_id} finished: {provider_batch.status}")
+        finished.append(batch)
+    return finished
+
+
+# ------------------ SCHEDULING ------------------
+def _work_open() -> bool:
+    return (
+        DeferredLLMRequest.objects.filter(status__in=["PENDING", "SUBMITTING"]).exists()
+        or LLMBatch.objects.filter(status__in=["SUBMITTING", "SUBMITTED"]).exists()
+    )
+
+
+def schedule_round(delay: int = LLM_BATCH_SUBMIT_DELAY):
+    """
+    Make sure a run_round job is scheduled on the default RQ queue; at most
+    one is pending at a time. Failures are logged — the requests stay
+    PENDING for the next round or for run_llm_batches.
+    """
+    import django_rq
+    try:
+        conn = django_rq.get_connection("default")
+        if conn.set(_ROUND_KEY, 1, nx=True, ex=delay + LLM_BATCH_POLL_INTERVAL):
+            django_rq.get_queue("default").enqueue_in(timedelta(seconds=delay), run_round)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not schedule a batch round: {e}")
+
+
+def run_round(max_requests: int = LLM_BATCH_MAX_REQUESTS):
+    """RQ entry point: one submit + one poll, then the next round while work is open."""
+    import django_rq
+    try:
+        django_rq.get_connection("default").delete(_ROUND_KEY)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not clear the batch round marker: {e}")
+
+    try:
+        submit_pending(max_requests=max_requests)
+        poll_batches()
+    finally:
+        if _work_open():
+            schedule_round(LLM_BATCH_POLL_INTERVAL)
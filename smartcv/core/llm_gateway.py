@@ -0,0 +1,123 @@
+# core/llm_gateway.py
+"""
+Async gateway for the LLM stages of the pipeline.
+
+RQ workers do the CPU-bound part (extraction, local checks) and then hand
+the model call off here with submit(). A single gateway process runs the
+calls as coroutines, keeping up to LLM_GATEWAY_MAX_IN_FLIGHT of them open
+at once, instead of one blocked worker process per call:
+
+    python manage.py run_llm_gateway --max-in-flight 32
+
+Jobs sit on a core.job_queue queue: jobs held by an instance that dies
+are re-queued by the others, and failing jobs are retried, then logged on
+the queue's failed list.
+"""
+import os
+import traceback
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from core import job_queue
+
+LLM_GATEWAY_ENABLED = os.getenv("LLM_GATEWAY_ENABLED", "0") == "1"
+LLM_GATEWAY_MAX_IN_FLIGHT = int(os.getenv("LLM_GATEWAY_MAX_IN_FLIGHT", "32"))
+
+QUEUE = job_queue.JobQueue("llm_gateway")
+
+
+# ------------------ PRODUCER SIDE ------------------
+def submit(stage: str, **payload) -> str:
+    """
+    Queue an LLM stage for the gateway. Payload must be JSON-serializable.
+    Returns the gateway job id.
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown LLM gateway stage: {stage}")
+    return QUEUE.submit(stage=stage, payload=payload)
+
+
+def queue_depth() -> int:
+    return QUEUE.depth()
+
+
+# ------------------ STAGES ------------------
+# core.tasks imports submit() from here, so the store helpers are imported lazily.
+
+def _db(fn):
+    """
+    sync_to_async(fn) for the store helpers. The gateway is long-lived and
+    never sees a request cycle, so — like the compile service — it drops
+    broken or expired DB connections around every write.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run)
+
+
+async def _resume_analysis(resume_id, text, local_check):
+    from core.tasks import store_resume_analysis, analysis_stream
+    from core.utils.general_cv_analysis import agemini_resume_analysis
+
+    try:
+        ai_result = await agemini_resume_analysis(text, stream=analysis_stream(resume_id))
+        data = {"status": "SUCCESS", "local_check": local_check, "ai_analysis": ai_result}
+    except Exception as e:
+        data = {"status": "FAILED", "error": str(e)}
+    await _db(store_resume_analysis)(resume_id, data)
+
+
+async def _jd_match(jd_id, resume_text, jd_text):
+    from core.tasks import store_jd_result, jd_stream
+    from core.utils.jd_resume_analysis import amatch_resume_to_jd
+
+    try:
+        result = await amatch_resume_to_jd(resume_text, jd_text, stream=jd_stream(jd_id))
+        result_json = {"status": "SUCCESS", "match": result}
+    except Exception as e:
+        result_json = {"status": "FAILED", "error": str(e), "trace": traceback.format_exc()}
+    await _db(store_jd_result)(jd_id, result_json)
+
+
+async def _latex(latex_resume_id, resume_text, ai_suggestions):
+    from core.tasks import store_latex_code, store_latex_result
+    from core.latex_sections import store_sections
+    from core.utils.latex_render import render_latex
+    from core.utils.latex_resume_generator import (
+        agenerate_latex_resume, agenerate_resume_content, LATEX_RENDER_MODE,
+    )
+
+    try:
+        if LATEX_RENDER_MODE == "template":
+            content = await agenerate_resume_content(resume_text, ai_suggestions)
+            await _db(store_sections)(latex_resume_id, content)
+            latex_code = render_latex(content)
+        else:
+            latex_code = await agenerate_latex_resume(resume_text, ai_suggestions)
+    except Exception as e:
+        await _db(store_latex_result)(latex_resume_id, {"status": "FAILED", "error": str(e)})
+        return
+    # Compiling is CPU work — hand it to the compile service (or back to the RQ workers)
+    await _db(store_latex_code)(latex_resume_id, latex_code, enqueue_compile=True)
+
+
+STAGES = {
+    "resume_analysis": _resume_analysis,
+    "jd_match": _jd_match,
+    "latex": _latex,
+}
+
+
+# ------------------ CONSUMER SIDE ------------------
+async def _handle(job):
+    await STAGES[job["stage"]](**job["payload"])
+
+
+def run(name: str = None, max_in_flight: int = LLM_GATEWAY_MAX_IN_FLIGHT):
+    """Blocking entry point: serve until SIGINT/SIGTERM, then drain in-flight calls."""
+    job_queue.run(job_queue.Consumer(QUEUE, _handle, max_in_flight=max_in_flight, name=name))
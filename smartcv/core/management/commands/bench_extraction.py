@@ -0,0 +1,355 @@
+"""
+Extraction benchmark over a generated resume corpus.
+
+    python manage.py bench_extraction --iterations 5 --output bench.json
+
+Reports pages/sec, p50/p95 latency and peak RSS for the extractors,
+normalize_text and run_local_checks, as JSON, so runs can be diffed
+before rolling out extractor changes. Text-level targets also run their
+original implementation on the same input and report the speedup over it.
+"""
+import json
+import math
+import os
+import platform
+import random
+import re
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import docx
+import fitz  # PyMuPDF
+import psutil
+from django.core.management.base import BaseCommand
+
+from core.utils.extract_text import extract_text_from_pdf, extract_text_from_docx, EXTRACTOR_VERSION
+from core.utils.local_checks import run_local_checks
+from core.utils.normalize import normalize_text
+
+PAGE_COUNTS = (1, 2, 3, 5)
+
+_ROLES = ["Software Engineer", "Data Analyst", "Security Intern", "Backend Developer", "QA Engineer"]
+_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries"]
+_VERBS = ["Engineered", "Automated", "Optimized", "Led", "Designed", "Reduced", "Deployed", "Migrated"]
+_OBJECTS = [
+    "a log aggregation pipeline", "the CI/CD workflow", "REST APIs for billing",
+    "an internal analytics dashboard", "database query performance", "a Django microservice",
+]
+_RESULTS = ["cutting latency by 35%", "saving 12 hours per week", "serving 50k users", "reducing costs by $20k"]
+
+
+# ------------------ CORPUS GENERATION ------------------
+def _resume_lines(rng: random.Random, pages: int):
+    """Plausible resume content, roughly one page of text per `pages`."""
+    lines = ["Jordan Example", "jordan.example@gmail.com • City, State • +00 0000000000", "", "SUMMARY",
+             "Engineer with hands-on experience building reliable backend systems.", "", "EXPERIENCE"]
+    for _ in range(pages * 3):
+        lines.append(f"{rng.choice(_ROLES)} — {rng.choice(_COMPANIES)}    {rng.randint(2015, 2024)}")
+        for _ in range(4):
+            lines.append(f"• {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}, {rng.choice(_RESULTS)}.")
+    lines += ["", "EDUCATION", "B.Sc. Computer Science — State University    2019", "",
+              "SKILLS", "Python, Django, PostgreSQL, Redis, Docker, AWS"]
+    return lines
+
+
+def _write_pdf(lines, path: str, pages: int, columns: int = 1):
+    doc = fitz.open()
+    per_page = max(len(lines) // pages, 1)
+    for p in range(pages):
+        page = doc.new_page()
+        chunk = "\n".join(lines[p * per_page:(p + 1) * per_page] if p < pages - 1 else lines[p * per_page:])
+        margin, width = 50, page.rect.width - 100
+        if columns == 1:
+            page.insert_textbox(fitz.Rect(margin, margin, margin + width, page.rect.height - margin), chunk, fontsize=10)
+        else:
+            half = chunk.splitlines()
+            mid = len(half) // 2
+            col_w = (width - 20) / 2
+            page.insert_textbox(fitz.Rect(margin, margin, margin + col_w, page.rect.height - margin),
+                                "\n".join(half[:mid]), fontsize=9)
+            page.insert_textbox(fitz.Rect(margin + col_w + 20, margin, margin + width, page.rect.height - margin),
+                                "\n".join(half[mid:]), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def _write_scanned_pdf(text_pdf: str, path: str, dpi: int = 200):
+    """Rasterize every page of a text PDF into an image-only PDF."""
+    out = fitz.open()
+    with fitz.open(text_pdf) as src:
+        for page in src:
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            new_page = out.new_page(width=page.rect.width, height=page.rect.height)
+            new_page.insert_image(new_page.rect, pixmap=pix)
+    out.save(path)
+    out.close()
+
+
+def _write_docx(lines, path: str, pages: int):
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Jordan Example — Resume"
+    document.sections[0].footer.paragraphs[0].text = "jordan.example@gmail.com"
+    for line in lines:
+        document.add_paragraph(line)
+    table = document.add_table(rows=pages * 2, cols=3)
+    for i, row in enumerate(table.rows):
+        row.cells[0].text = f"Project {i + 1}"
+        row.cells[1].text = "Python, Django"
+        row.cells[2].text = "2023"
+    document.save(path)
+
+
+def build_corpus(directory: str, seed: int = 7):
+    """
+    Generate the benchmark corpus into `directory`.
+    Returns [{"name", "kind", "path", "pages"}].
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for pages in PAGE_COUNTS:
+        lines = _resume_lines(rng, pages)
+
+        single = os.path.join(directory, f"single_{pages}p.pdf")
+        _write_pdf(lines, single, pages, columns=1)
+        corpus.append({"name": os.path.basename(single), "kind": "pdf_single_column", "path": single, "pages": pages})
+
+        double = os.path.join(directory, f"two_column_{pages}p.pdf")
+        _write_pdf(lines, double, pages, columns=2)
+        corpus.append({"name": os.path.basename(double), "kind": "pdf_two_column", "path": double, "pages": pages})
+
+        scanned = os.path.join(directory, f"scanned_{pages}p.pdf")
+        _write_scanned_pdf(single, scanned)
+        corpus.append({"name": os.path.basename(scanned), "kind": "pdf_scanned", "path": scanned, "pages": pages})
+
+        word = os.path.join(directory, f"tables_headers_{pages}p.docx")
+        _write_docx(lines, word, pages)
+        corpus.append({"name": os.path.basename(word), "kind": "docx", "path": word, "pages": pages})
+    return corpus
+
+
+# ------------------ BASELINES ------------------
+# The implementations the text-level targets replaced, kept verbatim so a
+# regression against them shows up in every run.
+def baseline_normalize_text(s: str) -> str:
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKC", s)
+    s = s.replace("•", "-").replace("●", "-").replace("‣", "-")
+    s = s.replace("–", "-").replace("—", "-").replace("−", "-")
+    s = s.replace("’", "'").replace("‘", "'")
+    s = s.replace("“", '"').replace("”", '"')
+    s = s.replace("\xa0", " ")
+    return s.strip()
+
+
+def baseline_run_local_checks(text: str):
+    feedback = []
+    failed = False
+    words = len(text.split())
+    text_lower = text.lower()
+
+    if words < 150:
+        feedback.append("Resume seems too short (<150 words). Add more experience or details.")
+        failed = True
+    elif words > 1200:
+        feedback.append("Resume seems too long (>1200 words). Condense to 1–2 pages.")
+        failed = True
+
+    exp_aliases = [
+        "experience", "work experience", "employment", "career history",
+        "professional experience", "internship", "projects", "work history"
+    ]
+    edu_aliases = [
+        "education", "academic background", "qualifications", "academics",
+        "educational qualifications", "degree", "university"
+    ]
+    has_exp = any(a in text_lower for a in exp_aliases)
+    has_edu = any(a in text_lower for a in edu_aliases)
+    if not has_exp or not has_edu:
+        missing = []
+        if not has_exp: missing.append("Experience")
+        if not has_edu: missing.append("Education")
+        feedback.append(f"Missing key section(s): {', '.join(missing)}.")
+        failed = True
+
+    if not any(sym in text for sym in ['-', '*', '•']):
+        feedback.append("No bullet points detected. Use '-' or '*' for clarity.")
+        failed = True
+
+    if re.search(r'\b(age|gender|religion|married|nationality)\b', text_lower):
+        feedback.append("Contains personal info (age, gender, religion, etc.). Remove it.")
+
+    if not re.search(r'[\w\.-]+@[\w\.-]+\.\w{2,}', text):
+        feedback.append("Missing a valid email address.")
+        failed = True
+
+    return {"failed": failed, "feedback": feedback}
+
+
+def _normalize_twice(s: str) -> str:
+    # extract_text normalizes, then the analysis task normalizes the text again
+    return normalize_text(normalize_text(s))
+
+
+def _baseline_normalize_twice(s: str) -> str:
+    return baseline_normalize_text(baseline_normalize_text(s))
+
+
+# target → {comparison: (current, baseline)}
+BASELINES = {
+    "normalize_text": {
+        "single_call": (normalize_text, baseline_normalize_text),
+        "extract_then_task": (_normalize_twice, _baseline_normalize_twice),
+    },
+    "run_local_checks": {
+        "single_call": (run_local_checks, baseline_run_local_checks),
+    },
+}
+
+
+# ------------------ MEASUREMENT ------------------
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _rss_kb(process) -> int:
+    return process.memory_info().rss // 1024
+
+
+def _run_target(target: str, items, iterations: int) -> dict:
+    """
+    Runs in a fresh child process so peak RSS is attributable to one target.
+    `items` is a list of (input, pages). Peak RSS is sampled after every call
+    (psutil, so this works on Windows too).
+    """
+    funcs = {
+        "extract_text_from_pdf": extract_text_from_pdf,
+        "extract_text_from_docx": extract_text_from_docx,
+        "normalize_text": normalize_text,
+        "run_local_checks": run_local_checks,
+    }
+    func = funcs[target]
+    process = psutil.Process()
+    rss_before = peak_rss = _rss_kb(process)
+
+    latencies, total_pages = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for value, pages in items:
+            t0 = time.perf_counter()
+            func(value)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            total_pages += pages
+            peak_rss = max(peak_rss, _rss_kb(process))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "runs": len(latencies),
+        "pages": total_pages,
+        "pages_per_sec": round(total_pages / elapsed, 2) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "peak_rss_kb": peak_rss,
+        "rss_growth_kb": peak_rss - rss_before,
+    }
+
+
+def _compare_to_baseline(target: str, items, iterations: int) -> dict:
+    """
+    Time a text-level target against its baseline on the same input, with
+    no RSS sampling in the loop (it would dwarf microsecond-scale calls).
+    Each round times both over the whole input, interleaved; like timeit,
+    the fastest round counts, which filters out scheduler and cache noise.
+    """
+    values = [value for value, _pages in items]
+    report = {}
+    for name, (func, baseline) in BASELINES[target].items():
+        best = {"current": math.inf, "baseline": math.inf}
+        for _ in range(iterations):
+            for key, f in (("current", func), ("baseline", baseline)):
+                t0 = time.perf_counter()
+                for value in values:
+                    f(value)
+                best[key] = min(best[key], time.perf_counter() - t0)
+        report[name] = {
+            "mean_us": round(best["current"] / len(values) * 1e6, 2),
+            "baseline_mean_us": round(best["baseline"] / len(values) * 1e6, 2),
+            "speedup": round(best["baseline"] / best["current"], 2),
+        }
+    return report
+
+
+def _isolated(func, *args):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+
+class Command(BaseCommand):
+    help = "Benchmark resume text extraction, normalization and local checks on a generated corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=3, help="Passes over the corpus per target.")
+        parser.add_argument("--corpus-dir", help="Where to write the corpus (default: a temp dir).")
+        parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--skip-ocr", action="store_true", help="Leave scanned PDFs out (no tesseract).")
+
+    def handle(self, *args, **opts):
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_dir = opts["corpus_dir"] or tmp
+            os.makedirs(corpus_dir, exist_ok=True)
+            corpus = build_corpus(corpus_dir, seed=opts["seed"])
+            if opts["skip_ocr"]:
+                corpus = [c for c in corpus if c["kind"] != "pdf_scanned"]
+
+            results = []
+            for kind in sorted({c["kind"] for c in corpus}):
+                docs = [c for c in corpus if c["kind"] == kind]
+                target = "extract_text_from_docx" if kind == "docx" else "extract_text_from_pdf"
+                items = [(c["path"], c["pages"]) for c in docs]
+                self.stderr.write(f"{target} / {kind} ...")
+                results.append({"target": target, "corpus": kind, **_isolated(_run_target, target, items, opts["iterations"])})
+
+            # Text-level targets run on raw (un-normalized) corpus text, with
+            # bullets and dashes, and on a plain ASCII version of it
+            texts = [
+                ("\n".join(_resume_lines(random.Random(opts["seed"] + c["pages"]), c["pages"])), c["pages"])
+                for c in corpus if c["kind"] == "pdf_single_column"
+            ]
+            ascii_texts = [(baseline_normalize_text(t).encode("ascii", "ignore").decode(), p) for t, p in texts]
+            iterations = opts["iterations"] * 50
+            for corpus_name, items in (("text", texts), ("text_ascii", ascii_texts)):
+                for target in ("normalize_text", "run_local_checks"):
+                    self.stderr.write(f"{target} / {corpus_name} ...")
+                    result = {"target": target, "corpus": corpus_name, **_isolated(_run_target, target, items, iterations)}
+                    if target in BASELINES:
+                        result["vs_baseline"] = _isolated(_compare_to_baseline, target, items, iterations)
+                    results.append(result)
+
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "extractor_version": EXTRACTOR_VERSION,
+                "iterations": opts["iterations"],
+                "seed": opts["seed"],
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "results": results,
+        }
+        payload = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as f:
+                f.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {opts['output']}"))
+        else:
+            self.stdout.write(payload)
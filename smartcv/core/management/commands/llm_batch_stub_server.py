@@ -0,0 +1,174 @@
+"""
+Local stand-in for the OpenAI Files + Batches endpoints.
+
+    python manage.py llm_batch_stub_server --port 8765 --delay 5
+    OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1 python manage.py run_llm_batches --loop
+
+Batches report "in_progress" for --delay seconds, then "completed" with a
+canned, schema-valid answer for every request — enough to exercise
+submit → poll → fan-out without spending tokens.
+"""
+import json
+import time
+import uuid
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+CANNED_ANALYSIS = {
+    "ai_analysis": {
+        "ats_score": 70,
+        "grammar_feedback": "Stub: no grammar issues checked.",
+        "impact_feedback": "Stub: impact not evaluated.",
+        "tone_feedback": "Stub: tone not evaluated.",
+        "keyword_feedback": "Stub: keywords not evaluated.",
+        "overall_recommendations": "Stub response from the local batch server.",
+        "confidence_score": 0.5,
+    }
+}
+CANNED_JD_MATCH = {
+    "status": "SUCCESS",
+    "evaluation": {
+        "overall_summary": "Stub response from the local batch server.",
+        "criteria": [],
+        "total_score": 3.0,
+        "competitiveness_percentile": "Average",
+        "action_recommendation": "Further Review",
+    },
+}
+
+
+def _canned_completion(body):
+    user_message = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+    answer = CANNED_JD_MATCH if "JOB DESCRIPTION TEXT:" in user_message else CANNED_ANALYSIS
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(answer)},
+            "finish_reason": "stop",
+        }],
+    }
+
+
+class _State:
+    def __init__(self, delay):
+        self.delay = delay
+        self.files = {}    # id → {"meta": {...}, "data": bytes}
+        self.batches = {}  # id → batch dict
+
+    def add_file(self, data: bytes, filename: str, purpose: str):
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        meta = {
+            "id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed",
+        }
+        self.files[file_id] = {"meta": meta, "data": data}
+        return meta
+
+    def batch_view(self, batch_id):
+        batch = self.batches[batch_id]
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.delay:
+            self._complete(batch)
+        return batch
+
+    def _complete(self, batch):
+        lines = self.files[batch["input_file_id"]]["data"].decode("utf-8").splitlines()
+        out = []
+        for line in filter(None, (l.strip() for l in lines)):
+            request = json.loads(line)
+            out.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex,
+                             "body": _canned_completion(request["body"])},
+                "error": None,
+            }))
+        output = self.add_file("\n".join(out).encode("utf-8"), "batch_output.jsonl", "batch_output")
+        batch.update({
+            "status": "completed",
+            "output_file_id": output["id"],
+            "completed_at": int(time.time()),
+            "request_counts": {"total": len(out), "completed": len(out), "failed": 0},
+        })
+
+
+def _handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload, raw=False):
+            body = payload if raw else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream" if raw else "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            if self.path == "/v1/files":
+                head = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+                message = BytesParser(policy=policy.HTTP).parsebytes(head + self._body())
+                fields = {
+                    part.get_param("name", header="content-disposition"): part
+                    for part in message.iter_parts()
+                }
+                upload = fields["file"]
+                purpose = fields["purpose"].get_payload(decode=True).decode("utf-8")
+                meta = state.add_file(upload.get_payload(decode=True), upload.get_filename() or "upload", purpose)
+                return self._send(200, meta)
+
+            if self.path == "/v1/batches":
+                request = json.loads(self._body())
+                if request.get("input_file_id") not in state.files:
+                    return self._send(404, {"error": {"message": "input file not found"}})
+                batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+                state.batches[batch_id] = {
+                    "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                    "input_file_id": request["input_file_id"],
+                    "completion_window": request.get("completion_window", "24h"),
+                    "status": "in_progress", "created_at": int(time.time()),
+                    "output_file_id": None, "error_file_id": None,
+                }
+                return self._send(200, state.batches[batch_id])
+
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in state.batches:
+                return self._send(200, state.batch_view(parts[2]))
+            if parts[:2] == ["v1", "files"] and len(parts) >= 3 and parts[2] in state.files:
+                stored = state.files[parts[2]]
+                if len(parts) == 4 and parts[3] == "content":
+                    return self._send(200, stored["data"], raw=True)
+                return self._send(200, stored["meta"])
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = "Serve a local stand-in for the OpenAI Batch API (files + batches) for development and tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--delay", type=float, default=2.0,
+                            help="Seconds a batch stays in_progress before completing.")
+
+    def handle(self, *args, **opts):
+        server = ThreadingHTTPServer((opts["host"], opts["port"]), _handler(_State(opts["delay"])))
+        self.stdout.write(f"Batch stub listening on http://{opts['host']}:{opts['port']}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
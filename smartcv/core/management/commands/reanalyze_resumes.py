@@ -0,0 +1,41 @@
+"""
+Bulk re-analysis of stored resumes (e.g. after a prompt change).
+
+    python manage.py reanalyze_resumes --user alice
+    python manage.py reanalyze_resumes --all --live
+
+By default the model calls are deferred to the Batch API (rounds are
+scheduled on the RQ queue, see core.llm_batch; or run run_llm_batches), so
+bulk work never competes with live users for the interactive rate limit.
+"""
+import django_rq
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import ResumeUpload
+from core.tasks import process_resume_upload, queue_name_for
+
+
+class Command(BaseCommand):
+    help = "Re-run resume analysis for stored uploads, batched by default."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only this username's resumes.")
+        parser.add_argument("--all", action="store_true", help="Every stored resume.")
+        parser.add_argument("--live", action="store_true", help="Call the model right away instead of batching.")
+
+    def handle(self, *args, **opts):
+        if not opts["user"] and not opts["all"]:
+            raise CommandError("Pass --user USERNAME or --all.")
+
+        uploads = ResumeUpload.objects.all()
+        if opts["user"]:
+            uploads = uploads.filter(user__username=opts["user"])
+
+        count = 0
+        for upload in uploads.iterator():
+            queue = django_rq.get_queue(queue_name_for(upload))
+            queue.enqueue(process_resume_upload, upload.id, deferred=not opts["live"])
+            count += 1
+
+        mode = "live" if opts["live"] else "deferred to the next batch"
+        self.stdout.write(self.style.SUCCESS(f"Queued {count} resume(s) for re-analysis ({mode})."))
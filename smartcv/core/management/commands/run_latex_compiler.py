@@ -0,0 +1,59 @@
+"""
+Warm LaTeX compile service.
+
+    TECTONIC_CACHE_DIR=/var/cache/smartcv-tectonic python manage.py run_latex_compiler --seed
+    LATEX_COMPILER_ENABLED=1 python manage.py run_latex_compiler --workers 4
+    python manage.py run_latex_compiler --stats
+
+Model calls stay with RQ / the LLM gateway; this process only compiles.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import latex_compiler
+from core.utils import latex_tools
+
+
+class Command(BaseCommand):
+    help = "Run the pool of warm tectonic workers that compile generated LaTeX resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=latex_compiler.LATEX_COMPILER_WORKERS,
+            help="Compile threads (default: LATEX_COMPILER_WORKERS).",
+        )
+        parser.add_argument(
+            "--name",
+            help="Instance name for logs and Redis keys (default: host:pid:random). "
+                 "Jobs of an instance that stops heartbeating are re-queued by the others.",
+        )
+        parser.add_argument("--seed", action="store_true",
+                            help="Populate TECTONIC_CACHE_DIR from the bundle (needs network) and exit.")
+        parser.add_argument("--stats", action="store_true",
+                            help="Print queue depth and recent compile timings as JSON and exit.")
+
+    def handle(self, *args, **opts):
+        if opts["seed"]:
+            try:
+                timings = latex_tools.seed_cache()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"Seeded {latex_tools.TECTONIC_CACHE_DIR}: cold {timings['cold_ms']} ms, warm {timings['warm_ms']} ms"
+            ))
+            return
+
+        if opts["stats"]:
+            self.stdout.write(json.dumps(latex_compiler.stats(), indent=2))
+            return
+
+        if not latex_compiler.LATEX_COMPILER_ENABLED:
+            self.stderr.write(self.style.WARNING(
+                "LATEX_COMPILER_ENABLED is not set — workers will keep compiling in-process."
+            ))
+        if not latex_tools.cache_seeded():
+            self.stderr.write(self.style.WARNING(
+                "Tectonic cache not seeded — compiles may hit the network. Run with --seed first."
+            ))
+        latex_compiler.run(name=opts["name"], workers=opts["workers"])
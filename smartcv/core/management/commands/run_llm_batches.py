@@ -0,0 +1,41 @@
+"""
+Submit deferred model calls as Batch API jobs and fan finished batches back out.
+
+    python manage.py run_llm_batches            # one submit + one poll
+    python manage.py run_llm_batches --loop     # keep going every --interval seconds
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import llm_batch
+
+
+class Command(BaseCommand):
+    help = "Submit pending deferred LLM requests as batches and store results of finished batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submit-only", action="store_true", help="Only submit pending requests.")
+        parser.add_argument("--poll-only", action="store_true", help="Only poll submitted batches.")
+        parser.add_argument("--loop", action="store_true", help="Repeat until interrupted.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between rounds with --loop.")
+        parser.add_argument("--max-requests", type=int, default=llm_batch.LLM_BATCH_MAX_REQUESTS,
+                            help="Requests per submitted batch.")
+
+    def _round(self, opts):
+        if not opts["poll_only"]:
+            batch = llm_batch.submit_pending(max_requests=opts["max_requests"])
+            if batch:
+                self.stdout.write(f"Submitted {batch.provider_batch_id} ({batch.request_count} requests)")
+        if not opts["submit_only"]:
+            for batch in llm_batch.poll_batches():
+                self.stdout.write(self.style.SUCCESS(f"Stored results of {batch.provider_batch_id} [{batch.status}]"))
+
+    def handle(self, *args, **opts):
+        self._round(opts)
+        while opts["loop"]:
+            try:
+                time.sleep(opts["interval"])
+                self._round(opts)
+            except KeyboardInterrupt:
+                break
@@ -0,0 +1,33 @@
+"""
+Async LLM gateway worker.
+
+    LLM_GATEWAY_ENABLED=1 python manage.py run_llm_gateway --max-in-flight 32
+
+RQ workers keep doing extraction and compiles; this process runs the
+model calls for resume analysis, JD matching and LaTeX generation.
+"""
+from django.core.management.base import BaseCommand
+
+from core import llm_gateway
+
+
+class Command(BaseCommand):
+    help = "Run the asyncio gateway that executes queued LLM calls concurrently."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-in-flight", type=int, default=llm_gateway.LLM_GATEWAY_MAX_IN_FLIGHT,
+            help="Model calls kept open at once (default: LLM_GATEWAY_MAX_IN_FLIGHT).",
+        )
+        parser.add_argument(
+            "--name",
+            help="Instance name for logs and Redis keys (default: host:pid:random). "
+                 "Jobs of an instance that stops heartbeating are re-queued by the others.",
+        )
+
+    def handle(self, *args, **opts):
+        if not llm_gateway.LLM_GATEWAY_ENABLED:
+            self.stderr.write(self.style.WARNING(
+                "LLM_GATEWAY_ENABLED is not set — RQ workers will keep calling the model themselves."
+            ))
+        llm_gateway.run(name=opts["name"], max_in_flight=opts["max_in_flight"])
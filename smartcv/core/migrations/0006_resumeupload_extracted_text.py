@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2025-11-02 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_jdmatch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeupload",
+            name="sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="extractor_version",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="extracted_text",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2025-11-04 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_resumeupload_extracted_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeupload",
+            name="file_type",
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="page_count",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="resumeupload",
+            name="has_text_layer",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+    ]
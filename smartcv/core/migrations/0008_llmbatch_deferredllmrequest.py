@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2025-11-06 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_resumeupload_triage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMBatch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("provider_batch_id", models.CharField(max_length=100, unique=True)),
+                ("input_file_id", models.CharField(max_length=100)),
+                ("output_file_id", models.CharField(blank=True, max_length=100)),
+                ("error_file_id", models.CharField(blank=True, max_length=100)),
+                ("status", models.CharField(default="SUBMITTED", max_length=20)),
+                ("request_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DeferredLLMRequest",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stage", models.CharField(max_length=30)),
+                ("object_id", models.PositiveIntegerField()),
+                ("body", models.JSONField()),
+                ("cache_key", models.CharField(blank=True, max_length=120)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("status", models.CharField(db_index=True, default="PENDING", max_length=20)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "batch",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="requests",
+                        to="core.llmbatch",
+                    ),
+                ),
+            ],
+        ),
+    ]
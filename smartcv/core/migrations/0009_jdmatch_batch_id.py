@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2025-11-07 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_llmbatch_deferredllmrequest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jdmatch",
+            name="batch_id",
+            field=models.CharField(blank=True, db_index=True, max_length=32),
+        ),
+    ]
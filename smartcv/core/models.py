@@ -28,6 +28,16 @@ class ResumeUpload(models.Model):
     # ✅ Resume files stored privately (NOT accessible via /media/)
     file = models.FileField(storage=PrivateMediaStorage(), upload_to=private_resume_path)
 
+    # ✅ Upload-time triage (magic bytes, not the filename)
+    file_type = models.CharField(max_length=10, blank=True)  # pdf | docx
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    has_text_layer = models.BooleanField(null=True, blank=True)
+
+    # ✅ Extracted text cache (content-addressed by file hash + extractor version)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    extractor_version = models.CharField(max_length=32, blank=True)
+    extracted_text = models.TextField(blank=True)
+
     def __str__(self):
         return f"{self.user.username if self.user else 'Anonymous'} • {self.file.name}"
 
@@ -75,6 +85,34 @@ class LatexResume(models.Model):
 
     def __str__(self):
         return f"LaTeX Resume → {self.resume_upload}"
+
+
+class LatexSection(models.Model):
+    """
+    One fragment of a template-rendered LaTeX resume (LATEX_RENDER_MODE=template):
+    the contact header or a section's structured content. Edits regenerate
+    single fragments; the document is reassembled from all of them.
+    """
+    latex_resume = models.ForeignKey(LatexResume, on_delete=models.CASCADE, related_name="sections")
+    key = models.CharField(max_length=50)  # "header" or a slug of the section title
+    position = models.PositiveIntegerField()
+    content = models.JSONField()
+
+    content_hash = models.CharField(max_length=64)  # SHA-256 of the canonical content JSON
+    guidance_hash = models.CharField(max_length=64, blank=True)  # last guidance applied to this fragment
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["latex_resume", "key"], name="unique_latex_section_key"),
+        ]
+
+    def __str__(self):
+        return f"LaTeX Section {self.key} → {self.latex_resume_id}"
+
+
 class JDMatch(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     resume = models.ForeignKey(ResumeUpload, on_delete=models.CASCADE)  # KEEP mandatory
@@ -86,7 +124,62 @@ class JDMatch(models.Model):
         default="PROCESSING"  # PROCESSING | SUCCESS | FAILED
     )
 
+    # Shared by every JDMatch created from one multi-JD request (blank for single matches)
+    batch_id = models.CharField(max_length=32, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"JD Match → {self.user.username} [{self.status}]"
+
+
+class LLMBatch(models.Model):
+    """
+    One submitted batch file of deferred model calls (OpenAI Batch API).
+    """
+    provider_batch_id = models.CharField(max_length=100, unique=True)
+    input_file_id = models.CharField(max_length=100)
+    output_file_id = models.CharField(max_length=100, blank=True)
+    error_file_id = models.CharField(max_length=100, blank=True)
+
+    status = models.CharField(
+        max_length=20,
+        default="SUBMITTED"  # SUBMITTING | SUBMITTED | COMPLETED | FAILED
+    )
+    request_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"LLM Batch {self.provider_batch_id} [{self.status}]"
+
+
+class DeferredLLMRequest(models.Model):
+    """
+    A non-urgent model call (bulk re-analysis, overnight imports) waiting to
+    go out in the next batch instead of a live request.
+    """
+    stage = models.CharField(max_length=30)  # resume_analysis | jd_match
+    object_id = models.PositiveIntegerField()  # ResumeUpload.id / JDMatch.id
+    body = models.JSONField()  # chat.completions request body
+    cache_key = models.CharField(max_length=120, blank=True)
+    payload = models.JSONField(default=dict, blank=True)  # extra state for storing the result
+
+    batch = models.ForeignKey(
+        LLMBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="requests",
+    )
+    status = models.CharField(
+        max_length=20,
+        default="PENDING",  # PENDING | SUBMITTING | SUBMITTED | DONE | FAILED
+        db_index=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Deferred {self.stage} #{self.object_id} [{self.status}]"
@@ -1,83 +1,271 @@
 # core/tasks.py
 
 from core.models import ResumeUpload, ResumeAnalysis, LatexResume, JDMatch
-from core.utils.extract_text import extract_text_from_pdf, extract_text_from_docx
-from core.utils.normalize import normalize_text
+from core.utils.extract_text import extract_text_from_pdf, extract_text_from_docx, EXTRACTOR_VERSION
+from core.utils.normalize import normalize_text, NormalizedText
 from core.utils.local_checks import run_local_checks
-from core.utils.general_cv_analysis import gemini_resume_analysis
-from core.utils.latex_resume_generator import generate_latex_resume
-from core.utils.latex_tools import compile_tex_to_pdf
-from core.utils.jd_resume_analysis import match_resume_to_jd
+from core.utils.triage import needs_ocr
+from core.utils.general_cv_analysis import gemini_resume_analysis, STREAM_FIELDS as ANALYSIS_STREAM_FIELDS
+from core.utils.latex_resume_generator import generate_latex_resume, generate_resume_content, LATEX_RENDER_MODE
+from core.utils.latex_render import render_latex
+from core.latex_sections import store_sections, assemble, apply_changes
+from core.utils.pdf_cache import compile_cached
+from core.utils.jd_resume_analysis import (
+    match_resume_to_jd,
+    STREAM_FIELDS as JD_STREAM_FIELDS,
+    STREAM_LIST_FIELD as JD_STREAM_LIST_FIELD,
+)
+from core.utils.llm_stream import LLM_STREAM_ENABLED, StreamPublisher, publish_done
+from core.llm_gateway import LLM_GATEWAY_ENABLED, submit
+from core.latex_compiler import LATEX_COMPILER_ENABLED, submit as submit_compile
+from core.llm_batch import defer_resume_analysis, defer_jd_match
+from django.conf import settings
 from django.core.files.base import ContentFile
-import base64
+import django_rq
+import hashlib
+import os
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Scanned PDFs (no text layer) go to a dedicated OCR-capable queue when
+# settings.RQ_QUEUES defines it, e.g.
+#   RQ_QUEUES = {"default": {...}, "ocr": {...}}
+# and a worker runs `python manage.py rqworker ocr`. Without it they stay on "default".
+OCR_QUEUE_NAME = os.getenv("RQ_OCR_QUEUE", "ocr")
 
-def process_resume_upload(resume_id):
+# Text-layer uploads up to this size / page count (and with nothing to OCR)
+# are extracted in-request from memory; everything else is left to the worker.
+INLINE_EXTRACT_MAX_BYTES = int(os.getenv("INLINE_EXTRACT_MAX_BYTES", str(512 * 1024)))
+INLINE_EXTRACT_MAX_PAGES = int(os.getenv("INLINE_EXTRACT_MAX_PAGES", "3"))
+
+# Model calls in flight at once for one multi-JD request.
+JD_MATCH_CONCURRENCY = int(os.getenv("JD_MATCH_CONCURRENCY", "4"))
+
+
+def queue_name_for(resume_upload):
+    """
+    Pick the RQ queue for a freshly triaged upload.
+    """
+    if resume_upload.file_type == "pdf" and resume_upload.has_text_layer is False:
+        if OCR_QUEUE_NAME in getattr(settings, "RQ_QUEUES", {}):
+            return OCR_QUEUE_NAME
+    return "default"
+
+
+def _file_type(resume_upload):
+    """
+    Triage result recorded at upload time; legacy rows fall back to the extension.
+    """
+    if resume_upload.file_type:
+        return resume_upload.file_type
+    name = resume_upload.file.name.lower()
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".docx"):
+        return "docx"
+    return None
+
+
+# -----------------------------------------------------------
+# E X T R A C T E D   T E X T   C A C H E
+# -----------------------------------------------------------
+
+def _read_file(field_file):
+    """
+    Read a stored file through its storage backend (works for remote storage too).
+    """
+    with field_file.open("rb") as f:
+        return f.read()
+
+
+def file_sha256(file):
+    """
+    SHA-256 of an uploaded file or stored FieldFile, read in chunks.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_resume_text(resume_upload, data=None, workers=None):
+    """
+    Return the extracted + normalized text for an upload, extracting at most once.
+
+    Text is cached on the ResumeUpload row keyed by (sha256, EXTRACTOR_VERSION).
+    A byte-identical earlier upload by the same user is reused without extraction
+    (anonymous uploads are never matched against each other).
+    `data` lets callers that already hold the file bytes (e.g. the upload
+    buffer) skip the storage read; otherwise the file is streamed from storage,
+    so no shared local disk is needed. `workers` overrides PDF_EXTRACT_WORKERS.
+    Raises ValueError for unsupported file types.
+    """
+    if resume_upload.extracted_text and resume_upload.extractor_version == EXTRACTOR_VERSION:
+        # Cached text was normalized at this version — tag it so it isn't redone
+        return NormalizedText(resume_upload.extracted_text)
+
+    if not resume_upload.sha256:
+        if data is None:
+            data = _read_file(resume_upload.file)
+        resume_upload.sha256 = hashlib.sha256(data).hexdigest()
+
+    # ---- Reuse text from an identical earlier upload by the same user ----
+    previous = None
+    if resume_upload.user_id is not None:
+        previous = (
+            ResumeUpload.objects
+            .filter(
+                user_id=resume_upload.user_id,
+                sha256=resume_upload.sha256,
+                extractor_version=EXTRACTOR_VERSION,
+            )
+            .exclude(id=resume_upload.id)
+            .exclude(extracted_text="")
+            .values_list("extracted_text", flat=True)
+            .first()
+        )
+
+    if previous is not None:
+        text = NormalizedText(previous)
+    else:
+        if data is None:
+            data = _read_file(resume_upload.file)
+        file_type = _file_type(resume_upload)
+        if file_type == "pdf":
+            text = extract_text_from_pdf(data, workers=workers)
+        elif file_type == "docx":
+            text = extract_text_from_docx(data)
+        else:
+            raise ValueError("Unsupported file type")
+
+        text = normalize_text(text)
+
+        # Extractors report failures inline — never cache those.
+        if text.startswith("[ERROR"):
+            resume_upload.save(update_fields=["sha256"])
+            return text
+
+    resume_upload.extracted_text = text
+    resume_upload.extractor_version = EXTRACTOR_VERSION
+    resume_upload.save(update_fields=["sha256", "extracted_text", "extractor_version"])
+    return text
+
+
+def prime_resume_text(resume_upload, file):
+    """
+    Extract small text-layer uploads straight from the request buffer, so the
+    worker finds cached text and never reads the file back from storage.
+    Only the cheap path runs here: no OCR and no process pool. Scanned or
+    image-bearing PDFs, long documents and large files are left to the workers.
+    """
+    if not resume_upload.has_text_layer or file.size > INLINE_EXTRACT_MAX_BYTES:
+        return
+    if (resume_upload.page_count or 0) > INLINE_EXTRACT_MAX_PAGES:
+        return
+    file.seek(0)
+    data = file.read()
+    if _file_type(resume_upload) == "pdf" and needs_ocr(data):
+        return
+    get_resume_text(resume_upload, data=data, workers=1)
+
+
+# -----------------------------------------------------------
+# R E S U L T   S T O R E S   (shared with the LLM gateway)
+# -----------------------------------------------------------
+
+def store_resume_analysis(resume_id, data):
+    ResumeAnalysis.objects.update_or_create(resume_id=resume_id, defaults={"data": data})
+    publish_done("resume", resume_id, data)
+
+
+def store_jd_result(jd_id, result_json):
+    JDMatch.objects.filter(id=jd_id).update(result_json=result_json, status=result_json["status"])
+    publish_done("jd", jd_id, result_json)
+
+
+def analysis_stream(resume_id):
+    """Publisher for partial analysis output (None when streaming is off)."""
+    if not LLM_STREAM_ENABLED:
+        return None
+    return StreamPublisher("resume", resume_id, ANALYSIS_STREAM_FIELDS)
+
+
+def jd_stream(jd_id):
+    """Publisher for partial JD match output (None when streaming is off)."""
+    if not LLM_STREAM_ENABLED:
+        return None
+    return StreamPublisher("jd", jd_id, JD_STREAM_FIELDS, JD_STREAM_LIST_FIELD)
+
+
+def store_latex_result(latex_resume_id, result_json):
+    LatexResume.objects.filter(id=latex_resume_id).update(result_json=result_json)
+
+
+def store_latex_code(latex_resume_id, latex_code, enqueue_compile=False):
+    LatexResume.objects.filter(id=latex_resume_id).update(latex_code=latex_code)
+    if enqueue_compile:
+        request_compile(latex_resume_id, inline=False)
+
+
+def request_compile(latex_resume_id, inline=True):
+    """
+    Hand a stored LaTeX source to the warm compile service when it is enabled;
+    otherwise compile here (inline) or on an RQ worker.
+    """
+    if LATEX_COMPILER_ENABLED:
+        try:
+            submit_compile(latex_resume_id)
+            return
+        except Exception as e:
+            print(f"⚠️ LaTeX compile service unavailable, compiling locally: {e}")
+    if inline:
+        compile_latex_task(latex_resume_id)
+    else:
+        django_rq.get_queue("default").enqueue(compile_latex_task, latex_resume_id)
+
+
+def process_resume_upload(resume_id, deferred=False):
     """
     Background job: extract, analyze, and store resume analysis.
+    With LLM_GATEWAY_ENABLED the AI analysis is handed to the async gateway;
+    deferred=True (bulk work) queues it for the next Batch API submission.
     """
     try:
         instance = ResumeUpload.objects.get(id=resume_id)
-        file_path = instance.file.path
 
-        # ---- Extract Text ----
-        if file_path.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_path)
-        elif file_path.lower().endswith(".docx"):
-            text = extract_text_from_docx(file_path)
-        else:
-            ResumeAnalysis.objects.update_or_create(
-                resume=instance,
-                defaults={
-                    "data": {
-                        "status": "FAILED",
-                        "error": "Unsupported file type"
-                    }
-                }
-            )
+        # ---- Extract Text (cached per file hash) ----
+        try:
+            text = get_resume_text(instance)
+        except ValueError as e:
+            store_resume_analysis(resume_id, {"status": "FAILED", "error": str(e)})
             return
 
-        text = normalize_text(text)
-
         # ---- Local Pre-checks ----
         local_check = run_local_checks(text)
         if local_check.get("failed", False):
-            ResumeAnalysis.objects.update_or_create(
-                resume=instance,
-                defaults={
-                    "data": {
-                        "status": "FAILED_PRECHECK",
-                        "local_check": local_check,
-                    }
-                }
-            )
+            store_resume_analysis(resume_id, {"status": "FAILED_PRECHECK", "local_check": local_check})
             return
 
         # ---- AI Analysis ----
-        ai_result = gemini_resume_analysis(text)
-
-        ResumeAnalysis.objects.update_or_create(
-            resume=instance,
-            defaults={
-                "data": {
-                    "status": "SUCCESS",
-                    "local_check": local_check,
-                    "ai_analysis": ai_result,
-                }
-            }
-        )
+        if deferred:
+            defer_resume_analysis(resume_id, text, local_check)
+            return
+
+        if LLM_GATEWAY_ENABLED:
+            submit("resume_analysis", resume_id=resume_id, text=str(text), local_check=local_check)
+            return
+
+        ai_result = gemini_resume_analysis(text, stream=analysis_stream(resume_id))
+
+        store_resume_analysis(resume_id, {
+            "status": "SUCCESS",
+            "local_check": local_check,
+            "ai_analysis": ai_result,
+        })
 
     except Exception as e:
-        ResumeAnalysis.objects.update_or_create(
-            resume=instance,
-            defaults={
-                "data": {
-                    "status": "FAILED",
-                    "error": str(e),
-                }
-            }
-        )
+        store_resume_analysis(resume_id, {"status": "FAILED", "error": str(e)})
 
 
 
@@ -88,85 +276,179 @@ def process_resume_upload(resume_id):
 def generate_latex_task(latex_resume_id):
     """
     Generate LaTeX & PDF for an existing LatexResume object.
+    With LLM_GATEWAY_ENABLED the model call runs in the async gateway, which
+    enqueues compile_latex_task once the LaTeX is stored.
     """
     try:
         latex_resume = LatexResume.objects.get(id=latex_resume_id)
         resume_upload = latex_resume.resume_upload
         ai_suggestions = latex_resume.ai_suggestions or {}
 
-        file_path = resume_upload.file.path
+        # Extract resume text (cached per file hash)
+        try:
+            resume_text = get_resume_text(resume_upload)
+        except ValueError as e:
+            store_latex_result(latex_resume_id, {"status": "FAILED", "error": str(e)})
+            return
 
-        # Extract resume text
-        if file_path.lower().endswith(".pdf"):
-            resume_text = extract_text_from_pdf(file_path)
-        elif file_path.lower().endswith(".docx"):
-            resume_text = extract_text_from_docx(file_path)
-        else:
-            latex_resume.result_json = {"status": "FAILED", "error": "Unsupported file type"}
-            latex_resume.save()
+        if LLM_GATEWAY_ENABLED:
+            submit("latex", latex_resume_id=latex_resume_id, resume_text=str(resume_text),
+                   ai_suggestions=ai_suggestions)
             return
 
-        resume_text = normalize_text(resume_text)
+        # Generate LaTeX (template mode keeps the content per section for later edits)
+        if LATEX_RENDER_MODE == "template":
+            content = generate_resume_content(resume_text, ai_suggestions)
+            store_sections(latex_resume_id, content)
+            latex_code = render_latex(content)
+        else:
+            latex_code = generate_latex_resume(resume_text, ai_suggestions)
+        store_latex_code(latex_resume_id, latex_code)
 
-        # Generate LaTeX
-        latex_code = generate_latex_resume(resume_text, ai_suggestions)
-        latex_resume.latex_code = latex_code
+        request_compile(latex_resume_id)
 
-        # Compile to PDF
-        pdf_bytes = compile_tex_to_pdf(latex_code)
-        pdf_name = f"resume_{latex_resume_id}.pdf"
-        latex_resume.pdf_file.save(pdf_name, ContentFile(pdf_bytes))
+    except Exception as e:
+        store_latex_result(latex_resume_id, {"status": "FAILED", "error": str(e)})
 
-        # Base64 encode for browser preview
-        pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
-        latex_resume.result_json = {
-            "status": "SUCCESS",
-            "pdf_data_uri": f"data:application/pdf;base64,{pdf_base64}"
-        }
-        latex_resume.save()
+
+def regenerate_latex_sections_task(latex_resume_id, guidance=None, edits=None):
+    """
+    Incremental edit of a template-mode LaTeX resume: regenerate/replace only
+    the named sections, reassemble the document and recompile it.
+    """
+    try:
+        changed = apply_changes(latex_resume_id, guidance, edits)
+        print(f"✏️ LaTeX resume {latex_resume_id}: sections changed → {changed or 'none'}")
+
+        # Nothing changed → same source, so the compile is a PDF cache hit
+        store_latex_code(latex_resume_id, render_latex(assemble(latex_resume_id)))
+        request_compile(latex_resume_id)
 
     except Exception as e:
-        latex_resume.result_json = {"status": "FAILED", "error": str(e)}
-        latex_resume.save()
+        store_latex_result(latex_resume_id, {"status": "FAILED", "error": str(e)})
 
 
+def _store_pdf(latex_resume, key, pdf_bytes):
+    """
+    Point pdf_file at the content-addressed copy of this PDF, writing it only
+    if storage doesn't hold it yet — identical PDFs are stored once.
+    """
+    field = latex_resume.pdf_file
+    name = f"latex_resumes/{key}.pdf"
+    if field.name == name:
+        return
+    if field.storage.exists(name):
+        field.name = name
+    else:
+        field.name = field.storage.save(name, ContentFile(pdf_bytes))
 
 
+def compile_latex_task(latex_resume_id, workdir=None):
+    """
+    Compile the stored LaTeX of a LatexResume to PDF.
+    The compile service passes its worker's CompileWorkdir to reuse scratch space.
+    Identical sources (after normalization) come from the compiled-PDF cache.
+    Returns True on success.
+    """
+    try:
+        latex_resume = LatexResume.objects.get(id=latex_resume_id)
+
+        # Compile to PDF
+        start = time.perf_counter()
+        pdf_bytes, key, cache_hit = compile_cached(latex_resume.latex_code, workdir=workdir)
+        compile_ms = round((time.perf_counter() - start) * 1000)
+        _store_pdf(latex_resume, key, pdf_bytes)
+
+        # Status polling only carries metadata; the PDF is served by api_latex_pdf
+        latex_resume.result_json = {
+            "status": "SUCCESS",
+            "pdf_etag": key,
+            "pdf_size": len(pdf_bytes),
+            "compile_ms": compile_ms,
+            "cache_hit": cache_hit,
+        }
+        latex_resume.save(update_fields=["pdf_file", "result_json"])
+        return True
 
+    except Exception as e:
+        store_latex_result(latex_resume_id, {"status": "FAILED", "error": str(e)})
+        return False
 
-def process_jd_match(jd_id):
-    jd_instance = JDMatch.objects.get(id=jd_id)
 
+def process_jd_match(jd_id, deferred=False):
+    """
+    Background job: match a resume against a JD.
+    With LLM_GATEWAY_ENABLED the model call is handed to the async gateway;
+    deferred=True (bulk work) queues it for the next Batch API submission.
+    """
     try:
+        jd_instance = JDMatch.objects.get(id=jd_id)
         resume_upload = jd_instance.resume
-        file_path = resume_upload.file.path
-
-        # Extract text directly (NO dependency on ResumeAnalysis)
-        if file_path.lower().endswith(".pdf"):
-            resume_text = extract_text_from_pdf(file_path)
-        elif file_path.lower().endswith(".docx"):
-            resume_text = extract_text_from_docx(file_path)
-        else:
-            raise ValueError("Unsupported resume format")
 
-        resume_text = normalize_text(resume_text)
+        # Extract text (NO dependency on ResumeAnalysis; cached per file hash)
+        resume_text = get_resume_text(resume_upload)
         jd_text = normalize_text(jd_instance.jd_text)
 
+        if deferred:
+            defer_jd_match(jd_id, resume_text, jd_text)
+            return
+
+        if LLM_GATEWAY_ENABLED:
+            submit("jd_match", jd_id=jd_id, resume_text=str(resume_text), jd_text=str(jd_text))
+            return
+
         # Run matching using GPT-5
-        result = match_resume_to_jd(resume_text, jd_text)
+        result = match_resume_to_jd(resume_text, jd_text, stream=jd_stream(jd_id))
 
-        jd_instance.result_json = {
-            "status": "SUCCESS",
-            "match": result
-        }
-        jd_instance.status = "SUCCESS"
-        jd_instance.save()
+        store_jd_result(jd_id, {"status": "SUCCESS", "match": result})
 
     except Exception as e:
-        jd_instance.result_json = {
+        store_jd_result(jd_id, {
             "status": "FAILED",
             "error": str(e),
             "trace": traceback.format_exc()
+        })
+
+
+def process_jd_match_batch(jd_ids, deferred=False):
+    """
+    Background job: match one resume against several JDs.
+    The resume is extracted once; the matches then run concurrently
+    (at most JD_MATCH_CONCURRENCY model calls at a time) and each result
+    is stored on its own JDMatch as soon as it finishes.
+    """
+    jd_instances = list(JDMatch.objects.filter(id__in=jd_ids).select_related("resume").order_by("id"))
+    if not jd_instances:
+        return
+
+    try:
+        resume_text = get_resume_text(jd_instances[0].resume)
+    except Exception as e:
+        for jd_instance in jd_instances:
+            store_jd_result(jd_instance.id, {"status": "FAILED", "error": str(e), "trace": traceback.format_exc()})
+        return
+
+    jd_texts = {jd.id: normalize_text(jd.jd_text) for jd in jd_instances}
+
+    if deferred:
+        for jd_id, jd_text in jd_texts.items():
+            defer_jd_match(jd_id, resume_text, jd_text)
+        return
+
+    if LLM_GATEWAY_ENABLED:
+        for jd_id, jd_text in jd_texts.items():
+            submit("jd_match", jd_id=jd_id, resume_text=str(resume_text), jd_text=str(jd_text))
+        return
+
+    # Threads only make the model calls; results are written from this thread
+    with ThreadPoolExecutor(max_workers=max(1, min(JD_MATCH_CONCURRENCY, len(jd_texts)))) as pool:
+        futures = {
+            pool.submit(match_resume_to_jd, resume_text, jd_text, stream=jd_stream(jd_id)): jd_id
+            for jd_id, jd_text in jd_texts.items()
         }
-        jd_instance.status = "FAILED"
-        jd_instance.save()
+        for future in as_completed(futures):
+            jd_id = futures[future]
+            try:
+                store_jd_result(jd_id, {"status": "SUCCESS", "match": future.result()})
+            except Exception as e:
+                store_jd_result(jd_id, {"status": "FAILED", "error": str(e), "trace": traceback.format_exc()})
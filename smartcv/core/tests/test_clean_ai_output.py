@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.utils import jd_resume_analysis
+from core.utils.clean_ai_output import extract_json, conform, parse_structured
+from core.utils.general_cv_analysis import parse_analysis_response
+from core.utils.jd_resume_analysis import parse_jd_response, finish_jd_match
+from core.utils.response_schemas import JD_MATCH_SCHEMA
+
+EVALUATION = {
+    "overall_summary": "Good fit",
+    "criteria": [{"id": 1, "name": "Python", "score": 4, "feedback": "Solid"}],
+    "total_score": 4.2,
+    "competitiveness_percentile": "Top 20%",
+    "action_recommendation": "Immediate Interview",
+}
+FULL = json.dumps({"status": "SUCCESS", "evaluation": EVALUATION})
+
+
+class ExtractJsonTests(SimpleTestCase):
+    def test_fences_and_chatter(self):
+        self.assertEqual(extract_json(f"Sure! ```json\n{FULL}\n``` Hope this helps."), json.loads(FULL))
+
+    def test_double_encoded(self):
+        self.assertEqual(extract_json(json.dumps(FULL)), json.loads(FULL))
+
+    def test_truncated_output_never_yields_a_nested_object(self):
+        with self.assertRaises(ValueError):
+            extract_json(FULL[:-40])
+
+    def test_no_object(self):
+        with self.assertRaises(ValueError):
+            extract_json("I cannot help with that.")
+
+
+class ConformTests(SimpleTestCase):
+    SCHEMA = JD_MATCH_SCHEMA["properties"]["evaluation"]
+
+    def test_coerces_and_clamps(self):
+        data, problems = conform({**EVALUATION, "total_score": "4/5", "criteria": [{"id": "3", "score": 9}]}, self.SCHEMA)
+        self.assertEqual(data["total_score"], 4.0)
+        self.assertEqual(data["criteria"][0]["id"], 3)
+        self.assertEqual(data["criteria"][0]["score"], 5.0)
+        self.assertIn("$.criteria[0].name: missing", problems)
+
+    def test_defaults_and_enum(self):
+        data, problems = conform({"action_recommendation": "Hire now"}, self.SCHEMA)
+        self.assertEqual(data["criteria"], [])
+        self.assertEqual(data["total_score"], 0)
+        self.assertTrue(any("not one of" in p for p in problems))
+
+    def test_parse_structured_rejects_a_fragment(self):
+        with self.assertRaises(ValueError):
+            parse_structured(json.dumps(EVALUATION["criteria"][0]), JD_MATCH_SCHEMA)
+
+
+class ParseResponseTests(SimpleTestCase):
+    def test_full_and_bare_evaluation(self):
+        self.assertEqual(parse_jd_response(FULL)["evaluation"]["total_score"], 4.2)
+        self.assertEqual(parse_jd_response(json.dumps(EVALUATION))["evaluation"]["total_score"], 4.2)
+
+    def test_truncated_or_foreign_output_is_an_error(self):
+        for content in (FULL[:-40], json.dumps({"id": 1, "name": "Python"}), '{"status": "SUCCESS"}'):
+            self.assertIn("error", parse_jd_response(content), content)
+
+    def test_errors_are_not_cached(self):
+        with mock.patch.object(jd_resume_analysis, "cache_set") as cache_set:
+            result = finish_jd_match(FULL[:-40], "key", {})
+            self.assertIn("error", result)
+            cache_set.assert_not_called()
+            finish_jd_match(FULL, "key", {})
+            cache_set.assert_called_once()
+
+    def test_analysis_fragment_is_an_error(self):
+        self.assertIn("error", parse_analysis_response('{"unrelated": 1}'))
+        ok = parse_analysis_response('{"ats_score": 77}')
+        self.assertEqual(ok["ai_analysis"]["ats_score"], 77)
@@ -0,0 +1,65 @@
+import os
+from unittest import mock
+
+import fitz  # PyMuPDF
+from django.test import SimpleTestCase
+
+from core.utils import extract_text
+from core.utils.extract_text import _chunks, _extract_pages
+
+
+def _pdf(pages):
+    with fitz.open() as pdf:
+        for i in range(pages):
+            pdf.new_page().insert_text((72, 72), f"Page {i + 1} Experience")
+        return pdf.tobytes()
+
+
+class ChunksTests(SimpleTestCase):
+    def test_contiguous_and_complete(self):
+        self.assertEqual([list(c) for c in _chunks(7, 3)], [[0, 1, 2], [3, 4], [5, 6]])
+        self.assertEqual([list(c) for c in _chunks(2, 4)], [[0], [1]])
+
+
+class ParallelExtractionTests(SimpleTestCase):
+    def tearDown(self):
+        extract_text._reset_pool(wait=True)
+
+    def test_pool_matches_sequential_extraction(self):
+        data = _pdf(6)
+        with mock.patch.object(extract_text, "PDF_PARALLEL_MIN_PAGES", 2):
+            sequential = _extract_pages(data, workers=1)
+            parallel = _extract_pages(data, workers=3)
+        self.assertEqual([p["text"] for p in parallel], [p["text"] for p in sequential])
+        self.assertEqual([p["page"] for p in parallel], list(range(6)))
+        # Outside a work-horse the pool is kept for the next call
+        self.assertIsNotNone(extract_text._pool)
+
+    def test_workers_get_a_path_not_the_pdf_bytes(self):
+        submitted = []
+        real_worker = extract_text._extract_pages_worker
+
+        def worker(path, page_indices):
+            submitted.append((path, list(page_indices)))
+            return real_worker(path, page_indices)
+
+        class InlinePool:
+            def map(self, func, *iterables):
+                return map(func, *iterables)
+
+        with mock.patch.object(extract_text, "_extract_pages_worker", worker), \
+                mock.patch.object(extract_text, "_get_pool", return_value=InlinePool()), \
+                mock.patch.object(extract_text, "PDF_PARALLEL_MIN_PAGES", 2):
+            _extract_pages(_pdf(4), workers=2)
+
+        self.assertEqual([pages for _, pages in submitted], [[0, 1], [2, 3]])
+        self.assertTrue(all(isinstance(path, str) for path, _ in submitted))
+        # The temp copy is removed once the pages are back
+        self.assertFalse(os.path.exists(submitted[0][0]))
+
+    def test_work_horse_shuts_the_pool_down(self):
+        with mock.patch.dict(os.environ, {"RQ_JOB_ID": "job-1"}), \
+                mock.patch.object(extract_text, "PDF_PARALLEL_MIN_PAGES", 2):
+            pages = _extract_pages(_pdf(4), workers=2)
+        self.assertEqual(len(pages), 4)
+        self.assertIsNone(extract_text._pool)
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from core.views.api import _byte_range, _pdf_etag
+
+KEY = "ab" * 32
+
+
+def _latex(result_json):
+    return SimpleNamespace(pdf_file=SimpleNamespace(name=f"latex_resumes/{KEY}.pdf"), result_json=result_json)
+
+
+class PdfEtagTests(SimpleTestCase):
+    def test_etag_is_the_storage_key(self):
+        self.assertEqual(_pdf_etag(_latex({"status": "SUCCESS", "pdf_etag": KEY})), f'"{KEY}"')
+
+    def test_etag_survives_a_status_reset(self):
+        success = _pdf_etag(_latex({"status": "SUCCESS", "pdf_etag": KEY}))
+        for result_json in ({"status": "PROCESSING"}, None):
+            self.assertEqual(_pdf_etag(_latex(result_json)), success)
+
+
+class ByteRangeTests(SimpleTestCase):
+    def test_whole_file(self):
+        for header in (None, "", "bytes=-", "items=0-10", "bytes=0-1,5-6"):
+            self.assertIsNone(_byte_range(header, 100), header)
+
+    def test_explicit_ranges(self):
+        self.assertEqual(_byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(_byte_range("bytes=90-", 100), (90, 99))
+        # An end past the file is clamped
+        self.assertEqual(_byte_range("bytes=50-500", 100), (50, 99))
+
+    def test_suffix_ranges(self):
+        self.assertEqual(_byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(_byte_range("bytes=-500", 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=100-", "bytes=100-200", "bytes=20-10", "bytes=-0"):
+            self.assertIs(_byte_range(header, 100), False, header)
@@ -0,0 +1,56 @@
+from django.test import SimpleTestCase
+
+from core.utils.latex_render import latex_escape, latex_url, render_latex
+
+CONTENT = {
+    "name": "R&D Jane_Doe",
+    "email": "jane@example.com",
+    "phone": "+1 555 0100",
+    "website": "janedoe.dev",
+    "linkedin": "",
+    "sections": [
+        {
+            "title": "Experience",
+            "kind": "entries",
+            "entries": [{
+                "title": "Acme #1", "location": "Remote", "subtitle": "C++ $dev", "dates": "2020 ~ 2023",
+                "bullets": [{"label": "Growth", "text": "Cut costs 30% with {templates}"}],
+            }],
+        },
+        {"title": "Empty", "kind": "skills", "skills": []},
+    ],
+}
+
+
+class LatexEscapeTests(SimpleTestCase):
+    def test_special_characters(self):
+        self.assertEqual(latex_escape("50% & $5 #1 a_b {x}"), r"50\% \& \$5 \#1 a\_b \{x\}")
+        self.assertEqual(latex_escape("~^"), r"\textasciitilde{}\textasciicircum{}")
+
+    def test_backslash_is_not_re_escaped(self):
+        self.assertEqual(latex_escape("\\section{x}"), r"\textbackslash{}section\{x\}")
+
+    def test_whitespace_and_empty_values(self):
+        self.assertEqual(latex_escape("  a\n\tb  "), "a b")
+        self.assertEqual(latex_escape(None), "")
+
+    def test_url_keeps_url_characters(self):
+        self.assertEqual(latex_url("https://x.dev/a_b?q=1&r=~u"), "https://x.dev/a_b?q=1&r=~u")
+        self.assertEqual(latex_url("https://x.dev/50%#top {x}"), r"https://x.dev/50\%\#top\{x\}")
+
+
+class RenderLatexTests(SimpleTestCase):
+    def test_values_are_escaped_in_the_document(self):
+        latex = render_latex(CONTENT)
+        self.assertIn(r"R\&D Jane\_Doe", latex)
+        self.assertIn(r"{Acme \#1}", latex)
+        self.assertIn(r"C++ \$dev", latex)
+        self.assertIn(r"Cut costs 30\% with \{templates\}", latex)
+        self.assertIn(r"\href{https://janedoe.dev}", latex)
+        self.assertNotIn("Cut costs 30% ", latex)
+
+    def test_empty_sections_are_left_out(self):
+        latex = render_latex(CONTENT)
+        self.assertIn(r"\section{Experience}", latex)
+        self.assertNotIn(r"\section{Empty}", latex)
+        self.assertIn(r"\end{document}", latex)
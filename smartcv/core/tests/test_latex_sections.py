@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core import latex_sections
+from core.latex_sections import apply_changes, assemble, store_sections
+from core.models import LatexResume, LatexSection, ResumeUpload
+
+CONTENT = {
+    "name": "Jane Doe", "email": "jane@example.com", "phone": "", "website": "", "linkedin": "",
+    "sections": [
+        {"title": "Summary", "kind": "lines", "lines": [{"text": "Engineer", "date": ""}]},
+        {"title": "Skills", "kind": "skills", "skills": [{"category": "Languages", "details": "Python"}]},
+    ],
+}
+
+
+def _rewrite(section, guidance):
+    return {**section, "title": f"{section['title']} ({guidance})"}
+
+
+class ApplyChangesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("jane", password="x")
+        upload = ResumeUpload.objects.create(user=self.user, file="resumes/jane.pdf")
+        self.latex = LatexResume.objects.create(user=self.user, resume_upload=upload)
+        store_sections(self.latex.id, CONTENT)
+
+    def _titles(self):
+        return [s["title"] for s in assemble(self.latex.id)["sections"]]
+
+    def test_edits_and_guidance_touch_only_named_sections(self):
+        untouched = LatexSection.objects.get(latex_resume=self.latex, key="header").updated_at
+        edit = {"title": "Skills", "kind": "skills", "skills": [{"category": "Languages", "details": "Go"}]}
+        with mock.patch.object(latex_sections, "generate_section", side_effect=_rewrite) as generate:
+            changed = apply_changes(self.latex.id, guidance={"summary": "shorter"}, edits={"skills": edit})
+
+        self.assertEqual(sorted(changed), ["skills", "summary"])
+        generate.assert_called_once()
+        self.assertEqual(self._titles(), ["Summary (shorter)", "Skills"])
+        self.assertEqual(assemble(self.latex.id)["sections"][1]["skills"][0]["details"], "Go")
+        self.assertEqual(LatexSection.objects.get(latex_resume=self.latex, key="header").updated_at, untouched)
+
+    def test_applied_guidance_is_not_sent_again(self):
+        with mock.patch.object(latex_sections, "generate_section", side_effect=_rewrite) as generate:
+            apply_changes(self.latex.id, guidance={"summary": "shorter"})
+            changed = apply_changes(self.latex.id, guidance={"summary": "  shorter "})
+
+        self.assertEqual(changed, [])
+        generate.assert_called_once()
+
+    def test_failed_model_call_saves_nothing(self):
+        def generate(section, guidance):
+            if section["title"] == "Skills":
+                raise RuntimeError("model down")
+            return _rewrite(section, guidance)
+
+        before = assemble(self.latex.id)
+        edit = {"title": "Summary", "kind": "lines", "lines": [{"text": "Edited", "date": ""}]}
+        with mock.patch.object(latex_sections, "generate_section", side_effect=generate):
+            with self.assertRaises(RuntimeError):
+                apply_changes(self.latex.id, guidance={"summary": "a", "skills": "b"}, edits={"summary": edit})
+
+        self.assertEqual(assemble(self.latex.id), before)
+        self.assertFalse(LatexSection.objects.exclude(guidance_hash="").exists())
+
+    def test_unknown_keys_and_header_guidance_are_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_changes(self.latex.id, edits={"missing": {}})
+        with self.assertRaises(ValueError):
+            apply_changes(self.latex.id, guidance={"header": "bolder"})
+
+
+    def test_api_rejects_a_body_that_is_not_an_object(self):
+        self.client.force_login(self.user)
+        url = reverse("api_latex_sections", args=[self.latex.id])
+        for body in ("[]", '"text"', "3"):
+            response = self.client.post(url, body, content_type="application/json")
+            self.assertEqual(response.status_code, 400, body)
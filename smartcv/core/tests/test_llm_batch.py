@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from core import llm_batch
+from core.models import DeferredLLMRequest, LLMBatch
+
+
+class FakeBatchClient:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.in_transaction = []
+        self.files = SimpleNamespace(create=self._create_file)
+        self.batches = SimpleNamespace(create=self._create_batch)
+
+    def _create_file(self, file, purpose):
+        self.in_transaction.append(connection.in_atomic_block)
+        if self.fail:
+            raise RuntimeError("upload failed")
+        return SimpleNamespace(id="file-1")
+
+    def _create_batch(self, **kwargs):
+        self.in_transaction.append(connection.in_atomic_block)
+        return SimpleNamespace(id="batch-1")
+
+
+class SubmitPendingTests(TransactionTestCase):
+    def setUp(self):
+        for i in range(3):
+            DeferredLLMRequest.objects.create(stage="jd_match", object_id=i, body={"model": "gpt-5"})
+
+    def test_network_calls_run_outside_transactions(self):
+        client = FakeBatchClient()
+        with mock.patch.object(llm_batch, "get_batch_client", return_value=client):
+            batch = llm_batch.submit_pending()
+
+        self.assertEqual(client.in_transaction, [False, False])
+        batch.refresh_from_db()
+        self.assertEqual((batch.provider_batch_id, batch.input_file_id, batch.status), ("batch-1", "file-1", "SUBMITTED"))
+        self.assertEqual(set(DeferredLLMRequest.objects.values_list("status", flat=True)), {"SUBMITTED"})
+
+    def test_failed_upload_releases_the_claim(self):
+        with mock.patch.object(llm_batch, "get_batch_client", return_value=FakeBatchClient(fail=True)):
+            with self.assertRaises(RuntimeError):
+                llm_batch.submit_pending()
+
+        self.assertFalse(LLMBatch.objects.exists())
+        self.assertEqual(DeferredLLMRequest.objects.filter(status="PENDING", batch=None).count(), 3)
+
+    def test_stale_claim_is_released(self):
+        stale = LLMBatch.objects.create(provider_batch_id="submitting-x", status="SUBMITTING")
+        DeferredLLMRequest.objects.update(status="SUBMITTING", batch=stale)
+        LLMBatch.objects.filter(id=stale.id).update(created_at="2020-01-01T00:00:00Z")
+
+        with mock.patch.object(llm_batch, "get_batch_client", return_value=FakeBatchClient()):
+            batch = llm_batch.submit_pending()
+
+        self.assertFalse(LLMBatch.objects.filter(id=stale.id).exists())
+        self.assertEqual(batch.requests.count(), 3)
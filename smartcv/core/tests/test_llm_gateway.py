@@ -0,0 +1,31 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core import llm_gateway
+
+
+class DbHelperTests(SimpleTestCase):
+    def test_closes_stale_connections_around_the_write(self):
+        events = []
+
+        def store(resume_id, data):
+            events.append(("store", resume_id, data))
+            return "stored"
+
+        with mock.patch.object(llm_gateway, "close_old_connections", side_effect=lambda: events.append("close")):
+            result = asyncio.run(llm_gateway._db(store)(7, {"status": "SUCCESS"}))
+
+        self.assertEqual(result, "stored")
+        self.assertEqual(events, ["close", ("store", 7, {"status": "SUCCESS"}), "close"])
+
+    def test_closes_connections_when_the_write_fails(self):
+        def store(*args):
+            raise RuntimeError("connection already closed")
+
+        with mock.patch.object(llm_gateway, "close_old_connections") as close:
+            with self.assertRaises(RuntimeError):
+                asyncio.run(llm_gateway._db(store)(7))
+
+        self.assertEqual(close.call_count, 2)
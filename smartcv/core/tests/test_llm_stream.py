@@ -0,0 +1,64 @@
+import json
+import random
+
+from django.test import SimpleTestCase
+
+from core.utils.llm_stream import PartialFields
+
+FIELDS = ("overall_summary", "total_score", "competitiveness_percentile")
+
+DOC = {
+    "overall_summary": 'Strong "backend" fit \\ needs cloud — ünïcode',
+    "total_score": 72,
+    "competitiveness_percentile": -3.5e1,
+    "flags": [True, None, "x"],
+    "criteria": [
+        {"name": "Python", "score": 9, "notes": ["a", "b}"], "nested": {"x": [1, 2]}},
+        {"name": "SQL [advanced]", "score": 6.5, "notes": []},
+        {"name": "Docker", "score": 0, "evidence": "\\"},
+    ],
+    "action_recommendation": "Apply",
+}
+
+
+def _feed_in_chunks(text, rng, max_chunk=7):
+    parser = PartialFields(FIELDS, "criteria")
+    fields, items, pos = {}, [], 0
+    while pos < len(text):
+        step = rng.randint(1, max_chunk)
+        update = parser.feed(text[pos:pos + step])
+        assert not fields.keys() & update["fields"].keys(), "field reported twice"
+        fields.update(update["fields"])
+        items.extend(update["items"])
+        pos += step
+    return fields, items
+
+
+class PartialFieldsTests(SimpleTestCase):
+    def test_any_chunking_gives_the_same_result(self):
+        rng = random.Random(3)
+        for text in (json.dumps(DOC), json.dumps(DOC, indent=2, ensure_ascii=False), "```json\n" + json.dumps(DOC)):
+            for max_chunk in (1, 2, 5, 40):
+                fields, items = _feed_in_chunks(text, rng, max_chunk)
+                self.assertEqual(fields, {k: DOC[k] for k in FIELDS})
+                self.assertEqual(items, DOC["criteria"])
+
+    def test_fields_reported_as_soon_as_complete(self):
+        parser = PartialFields(["total_score", "overall_summary"])
+        self.assertEqual(parser.feed('{"overall_summary": "Go'), {"fields": {}, "items": []})
+        self.assertEqual(parser.feed('od", "total_score": 8')["fields"], {"overall_summary": "Good"})
+        self.assertEqual(parser.feed("5,")["fields"], {"total_score": 85})
+
+    def test_escape_split_across_deltas(self):
+        parser = PartialFields(["summary"])
+        parser.feed('{"summary": "a\\')
+        self.assertEqual(parser.feed('"b"}')["fields"], {"summary": 'a"b'})
+
+    def test_buffer_only_keeps_unfinished_token(self):
+        parser = PartialFields(["summary"], "criteria")
+        text = json.dumps({"summary": "x" * 50, "criteria": [{"n": i} for i in range(2000)]})
+        items = []
+        for ch in text:
+            items.extend(parser.feed(ch)["items"])
+        self.assertEqual(len(items), 2000)
+        self.assertLess(len(parser._buf), 20)
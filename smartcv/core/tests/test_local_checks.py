@@ -0,0 +1,104 @@
+import re
+import random
+
+from django.test import SimpleTestCase
+
+from core.utils.local_checks import MAX_POSITIONS, run_local_checks, scan_text
+
+_EXP = ["experience", "work experience", "employment", "career history",
+        "professional experience", "internship", "projects", "work history"]
+_EDU = ["education", "academic background", "qualifications", "academics",
+        "educational qualifications", "degree", "university"]
+
+
+def _baseline(text):
+    """The pre-registry implementation, kept as the reference for pass/fail and feedback."""
+    feedback, failed = [], False
+    words = len(text.split())
+    text_lower = text.lower()
+    if words < 150:
+        feedback.append("Resume seems too short (<150 words). Add more experience or details.")
+        failed = True
+    elif words > 1200:
+        feedback.append("Resume seems too long (>1200 words). Condense to 1–2 pages.")
+        failed = True
+    has_exp = any(a in text_lower for a in _EXP)
+    has_edu = any(a in text_lower for a in _EDU)
+    if not has_exp or not has_edu:
+        missing = [n for n, ok in (("Experience", has_exp), ("Education", has_edu)) if not ok]
+        feedback.append(f"Missing key section(s): {', '.join(missing)}.")
+        failed = True
+    if not any(sym in text for sym in ["-", "*", "•"]):
+        feedback.append("No bullet points detected. Use '-' or '*' for clarity.")
+        failed = True
+    if re.search(r"\b(age|gender|religion|married|nationality)\b", text_lower):
+        feedback.append("Contains personal info (age, gender, religion, etc.). Remove it.")
+    if not re.search(r"[\w\.-]+@[\w\.-]+\.\w{2,}", text):
+        feedback.append("Missing a valid email address.")
+        failed = True
+    return {"failed": failed, "feedback": feedback}
+
+
+_TOKENS = [
+    "jane@university.edu", "me@projects.io", "a.b-c@degree.co", "x@y", "@", ".", "-", "*", "•",
+    "Experience", "EDUCATION", "work", "history", "age", "Age:", "ages", "gender", "married",
+    "İnternship", "ΣΣ", "ß", "employment", "academic", "background", "Qualifications",
+    "lorem", "ipsum", "dolor", "2019", "C++", "nationality.", "e-mail", "\n", "  ",
+]
+
+
+def _fuzz_text(rng):
+    words = rng.choice((rng.randint(0, 30), rng.randint(140, 170)))
+    seps = ["", " ", " ", "\n", "-", "@"]
+    return "".join(rng.choice(_TOKENS) + rng.choice(seps) for _ in range(words))
+
+
+class LocalChecksTests(SimpleTestCase):
+    def test_matches_baseline_on_fuzzed_input(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            text = _fuzz_text(rng)
+            result = run_local_checks(text)
+            expected = _baseline(text)
+            self.assertEqual(
+                (result["failed"], result["feedback"]),
+                (expected["failed"], expected["feedback"]),
+                msg=repr(text),
+            )
+
+    def test_matches_baseline_on_overlapping_keywords(self):
+        # Fragments glued together so keywords overlap and hide one another
+        fragments = ["experienc", "e", "ducation", "ag", "page", "internshi", "p", "rojects", "degre",
+                     "nationalit", "y", " ", "married", "work ", "histor", "educational qualification", "s"]
+        rng = random.Random(4321)
+        for _ in range(3000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 8)))
+            result = run_local_checks(text)
+            expected = _baseline(text)
+            self.assertEqual((result["failed"], result["feedback"]), (expected["failed"], expected["feedback"]), repr(text))
+
+    def test_email_does_not_hide_section_alias(self):
+        found = scan_text("Contact: jane@university.edu - projects")["found"]
+        self.assertTrue(found["email"])
+        self.assertTrue(found["education"])
+        self.assertTrue(found["experience"])
+
+    def test_overlapping_aliases_are_both_found(self):
+        found = scan_text("experienceducation")["found"]
+        self.assertTrue(found["experience"])
+        self.assertTrue(found["education"])
+
+    def test_positions_are_capped(self):
+        scan = scan_text("education " * (MAX_POSITIONS + 10) + "age")
+        self.assertEqual(len(scan["positions"]["education"]), MAX_POSITIONS)
+        self.assertEqual(scan["positions"]["sensitive"], [[10 * (MAX_POSITIONS + 10), 10 * (MAX_POSITIONS + 10) + 3]])
+
+    def test_positions_refer_to_original_text(self):
+        text = "İİ Education"
+        start, end = scan_text(text)["positions"]["education"][0]
+        self.assertEqual(text[start:end], "Education")
+
+    def test_issue_positions(self):
+        text = "Age: 30"
+        issue = next(i for i in run_local_checks(text)["issues"] if i["rule"] == "sensitive_info")
+        self.assertEqual(issue["positions"], [[0, 3]])
@@ -0,0 +1,32 @@
+import pickle
+import random
+
+from django.test import SimpleTestCase
+
+from core.management.commands.bench_extraction import baseline_normalize_text
+from core.utils.normalize import NormalizedText, normalize_text, normalize_many
+
+
+class NormalizeTextTests(SimpleTestCase):
+    def test_matches_baseline(self):
+        rng = random.Random(99)
+        chars = "ab 1\n•●‣–—−’‘“”\xa0ﬁ½é"
+        for _ in range(5000):
+            text = "".join(rng.choice(chars) for _ in range(rng.randint(0, 25)))
+            self.assertEqual(normalize_text(text), baseline_normalize_text(text), repr(text))
+
+    def test_ascii_text_is_only_stripped(self):
+        self.assertEqual(normalize_text("  plain - text \n"), "plain - text")
+
+    def test_normalized_text_is_returned_as_is(self):
+        text = normalize_text("• Built things — fast")
+        self.assertIsInstance(text, NormalizedText)
+        self.assertIs(normalize_text(text), text)
+        self.assertEqual(normalize_many([" a ", " a ", "b"]), ["a", "a", "b"])
+
+    def test_pickled_text_keeps_its_version(self):
+        old = NormalizedText("x")
+        old.version = "0"
+        restored = pickle.loads(pickle.dumps(old))
+        self.assertEqual(restored.version, "0")
+        self.assertIsNot(normalize_text(restored), restored)
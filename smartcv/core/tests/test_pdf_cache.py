@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.utils import pdf_cache
+from core.utils.pdf_cache import normalize_latex
+
+
+class NormalizeLatexTests(SimpleTestCase):
+    def test_drops_whole_line_comments(self):
+        source = "% generated\n\\documentclass{article}\n  % indented comment\n\\begin{document}\n"
+        self.assertEqual(normalize_latex(source), "\\documentclass{article}\n\\begin{document}\n")
+
+    def test_keeps_escaped_percent_and_inline_comments(self):
+        source = "\\% of revenue\nGrew sales 20\\% % note\n"
+        self.assertEqual(normalize_latex(source), source)
+
+    def test_line_endings_and_trailing_whitespace(self):
+        self.assertEqual(normalize_latex("a  \r\nb\t\rc"), "a\nb\nc\n")
+
+    def test_collapses_blank_runs_to_one_paragraph_break(self):
+        self.assertEqual(normalize_latex("a\n\n\n\n b\n"), "a\n\n b\n")
+        # A comment between paragraphs leaves no extra blank line behind
+        self.assertEqual(normalize_latex("a\n\n% x\n\nb"), "a\n\nb\n")
+
+    def test_equivalent_sources_share_a_cache_key(self):
+        with mock.patch.object(pdf_cache, "tectonic_version", return_value="tectonic 0.15.0"):
+            self.assertEqual(
+                pdf_cache.pdf_cache_key("% v1\n\\section{A}  \r\n"),
+                pdf_cache.pdf_cache_key("\\section{A}\n"),
+            )
+            self.assertNotEqual(
+                pdf_cache.pdf_cache_key("\\section{A}\n"),
+                pdf_cache.pdf_cache_key("\\section{B}\n"),
+            )
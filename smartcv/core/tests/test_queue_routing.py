@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from core.tasks import queue_name_for, OCR_QUEUE_NAME
+
+SCANNED = SimpleNamespace(file_type="pdf", has_text_layer=False)
+TEXT_LAYER = SimpleNamespace(file_type="pdf", has_text_layer=True)
+
+QUEUE = {"HOST": "localhost", "PORT": 6379, "DB": 0}
+
+
+class QueueNameForTests(SimpleTestCase):
+    @override_settings(RQ_QUEUES={"default": QUEUE, OCR_QUEUE_NAME: QUEUE})
+    def test_scanned_pdf_uses_ocr_queue_when_configured(self):
+        self.assertEqual(queue_name_for(SCANNED), OCR_QUEUE_NAME)
+
+    @override_settings(RQ_QUEUES={"default": QUEUE})
+    def test_scanned_pdf_falls_back_to_default(self):
+        self.assertEqual(queue_name_for(SCANNED), "default")
+
+    @override_settings(RQ_QUEUES={"default": QUEUE, OCR_QUEUE_NAME: QUEUE})
+    def test_text_layer_pdf_uses_default(self):
+        self.assertEqual(queue_name_for(TEXT_LAYER), "default")
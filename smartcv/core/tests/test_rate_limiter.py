@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.utils import rate_limiter
+from core.utils.llm_stream import acollect, collect, stream_request
+
+REQUEST = {"model": "gpt-test", "messages": [{"role": "user", "content": "hi"}], "max_completion_tokens": 100}
+
+
+def _completion(content, total_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+
+
+def _chunk(content=None, usage=None):
+    choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+STREAM = [_chunk("Hel"), _chunk("lo"), _chunk(usage=SimpleNamespace(total_tokens=42))]
+
+
+@mock.patch.object(rate_limiter, "_try_acquire", return_value=0)
+@mock.patch.object(rate_limiter, "_after_failure", return_value=0)
+@mock.patch.object(rate_limiter, "_settle")
+class RateLimitedCallTests(SimpleTestCase):
+    def test_settles_against_the_raw_response_and_returns_parsed(self, settle, after_failure, acquire):
+        result = rate_limiter.rate_limited_call(
+            lambda: _completion("ok", 321), REQUEST, parse=lambda r: r.choices[0].message.content.upper(),
+        )
+        self.assertEqual(result, "OK")
+        estimated = rate_limiter.estimate_request_tokens(REQUEST)
+        settle.assert_called_once_with("gpt-test", estimated, 321)
+
+    def test_parse_error_is_retried_when_listed(self, settle, after_failure, acquire):
+        responses = iter([_completion("bad", 10), _completion("good", 20)])
+
+        def parse(response):
+            content = response.choices[0].message.content
+            if content == "bad":
+                raise ValueError("unparseable")
+            return content
+
+        result = rate_limiter.rate_limited_call(
+            lambda: next(responses), REQUEST, parse=parse, retry_on=(ValueError,),
+        )
+        self.assertEqual(result, "good")
+        self.assertEqual([c.args[2] for c in settle.call_args_list], [10, 20])
+        after_failure.assert_called_once()
+
+    def test_parse_error_is_raised_when_not_listed(self, settle, after_failure, acquire):
+        def parse(response):
+            raise ValueError("unparseable")
+
+        with self.assertRaises(ValueError):
+            rate_limiter.rate_limited_call(lambda: _completion("x", 5), REQUEST, parse=parse)
+        after_failure.assert_not_called()
+
+    def test_async_call_settles_and_parses(self, settle, after_failure, acquire):
+        async def call():
+            return _completion("ok", 77)
+
+        result = asyncio.run(rate_limiter.arate_limited_call(call, REQUEST, parse=lambda r: r.choices[0].message.content))
+        self.assertEqual(result, "ok")
+        self.assertEqual(settle.call_args.args[2], 77)
+
+    def test_streamed_call_settles_against_the_reported_usage(self, settle, after_failure, acquire):
+        text = rate_limiter.rate_limited_call(lambda: collect(iter(STREAM)), REQUEST)
+        self.assertEqual(text, "Hello")
+        self.assertEqual(settle.call_args.args[2], 42)
+
+
+class StreamUsageTests(SimpleTestCase):
+    def test_stream_request_asks_for_usage(self):
+        streamed = stream_request(REQUEST)
+        self.assertTrue(streamed["stream"])
+        self.assertEqual(streamed["stream_options"], {"include_usage": True})
+        self.assertNotIn("stream", REQUEST)
+
+    def test_collect_keeps_the_final_usage(self):
+        text = collect(iter(STREAM))
+        self.assertEqual(text, "Hello")
+        self.assertEqual(text.usage.total_tokens, 42)
+
+    def test_acollect_keeps_the_final_usage(self):
+        async def chunks():
+            for chunk in STREAM:
+                yield chunk
+
+        text = asyncio.run(acollect(chunks()))
+        self.assertEqual(text, "Hello")
+        self.assertEqual(text.usage.total_tokens, 42)
+
+    def test_stream_without_usage(self):
+        self.assertIsNone(collect(iter(STREAM[:2])).usage)
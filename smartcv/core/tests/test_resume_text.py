@@ -0,0 +1,43 @@
+import hashlib
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core import tasks
+from core.models import ResumeUpload
+from core.utils.extract_text import EXTRACTOR_VERSION
+
+DATA = b"%PDF-1.7 identical bytes"
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+class ExtractedTextReuseTests(TestCase):
+    def _upload(self, user=None, text=""):
+        return ResumeUpload.objects.create(
+            user=user, file="resumes/cv.pdf", file_type="pdf", sha256=SHA,
+            extracted_text=text, extractor_version=EXTRACTOR_VERSION if text else "",
+        )
+
+    def test_same_user_reuses_identical_upload(self):
+        user = get_user_model().objects.create_user("jane", password="x")
+        self._upload(user, text="Jane's resume")
+        upload = self._upload(user)
+
+        with mock.patch.object(tasks, "extract_text_from_pdf") as extract:
+            text = tasks.get_resume_text(upload, data=DATA)
+
+        self.assertEqual(text, "Jane's resume")
+        extract.assert_not_called()
+
+    def test_anonymous_uploads_are_not_shared(self):
+        self._upload(text="Someone else's resume")
+        upload = self._upload()
+
+        with mock.patch.object(tasks, "extract_text_from_pdf", return_value="My resume") as extract:
+            text = tasks.get_resume_text(upload, data=DATA)
+
+        self.assertEqual(text, "My resume")
+        extract.assert_called_once()
+        upload.refresh_from_db()
+        self.assertEqual(upload.extracted_text, "My resume")
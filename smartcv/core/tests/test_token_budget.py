@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from core.utils.token_budget import clean_text, fit_resume, fit_text, estimate_tokens
+
+RESUME = """Jane Doe
+Software Engineer
+jane@example.com
+
+Skills
+C/C++
+C++, C#, .NET
+
+Experience
+Software Engineer
+Acme Corp, 2019-2023
+- Built things
+"""
+
+
+class CleanTextTests(SimpleTestCase):
+    def test_keeps_symbol_heavy_skills_and_repeated_title(self):
+        cleaned, dropped = clean_text(RESUME)
+        self.assertEqual(dropped, 0)
+        for line in ("C/C++", "C++, C#, .NET", "- Built things"):
+            self.assertIn(line, cleaned)
+        self.assertEqual(cleaned.count("Software Engineer"), 2)
+
+    def test_drops_lines_without_letters_or_digits(self):
+        cleaned, dropped = clean_text("Jane Doe\n|||| ~~ ||\n•\n...\nPython")
+        self.assertEqual(cleaned, "Jane Doe\n•\nPython")
+        self.assertEqual(dropped, 2)
+
+    def test_drops_running_page_header(self):
+        text = RESUME + "Jane Doe\nSoftware Engineer\nEducation\nBSc, 2018\n"
+        cleaned, dropped = clean_text(text)
+        self.assertEqual(dropped, 2)
+        self.assertEqual(cleaned.count("Jane Doe"), 1)
+        # The title inside Experience is not part of a repeated block
+        self.assertEqual(cleaned.count("Software Engineer"), 2)
+
+    def test_drops_running_page_footer(self):
+        text = "Jane Doe\nEngineer\nmail@x.io\nConfidential\nPage footer\nExperience\nBuilt it\nConfidential\nPage footer"
+        cleaned, _ = clean_text(text)
+        self.assertEqual(cleaned.count("Confidential"), 1)
+        self.assertTrue(cleaned.endswith("Confidential\nPage footer"))
+
+
+class FitTests(SimpleTestCase):
+    def test_under_budget_is_untouched(self):
+        text = RESUME + "\n\n\n|||\nReferences available on request\n"
+        fitted, stats = fit_resume(text, budget=10_000)
+        self.assertEqual(fitted, text)
+        self.assertEqual(stats["dropped_lines"], 0)
+        self.assertEqual(fit_text(text, 10_000)[0], text)
+
+    def test_over_budget_drops_low_priority_sections_first(self):
+        text = RESUME + "\nHobbies\n" + "\n".join(f"Hobby number {i}" for i in range(200))
+        fitted, stats = fit_resume(text, budget=estimate_tokens(RESUME) + 20)
+        self.assertNotIn("Hobby number", fitted)
+        self.assertIn("hobbies", stats["trimmed_sections"])
+        self.assertIn("C/C++", fitted)
+        self.assertLessEqual(stats["tokens_after"], stats["budget"])
@@ -0,0 +1,34 @@
+import fitz  # PyMuPDF
+from django.test import SimpleTestCase
+
+from core.utils.triage import needs_ocr
+
+
+def _pdf(*page_texts):
+    with fitz.open() as pdf:
+        for text in page_texts:
+            page = pdf.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        return pdf.tobytes()
+
+
+class NeedsOcrTests(SimpleTestCase):
+    def test_text_only_pdf(self):
+        self.assertFalse(needs_ocr(_pdf("Jane Doe", "Experience")))
+
+    def test_page_without_text(self):
+        self.assertTrue(needs_ocr(_pdf("Jane Doe", "")))
+
+    def test_large_image(self):
+        with fitz.open() as pdf:
+            page = pdf.new_page()
+            page.insert_text((72, 72), "Jane Doe")
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+            pix.clear_with(200)
+            page.insert_image(fitz.Rect(72, 200, 472, 600), pixmap=pix)
+            data = pdf.tobytes()
+        self.assertTrue(needs_ocr(data))
+
+    def test_unreadable(self):
+        self.assertTrue(needs_ocr(b"not a pdf"))
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from core.views import base, auth, api, jd
+from core.views import base, auth, api, jd, stream
 
 urlpatterns = [
     # Pages
@@ -17,16 +17,22 @@ urlpatterns = [
     # Resume API
     path("api/resume/analyze/", api.api_resume_analyze, name="api_resume_analyze"),
     path("api/resume/status/<int:resume_id>/", api.api_resume_status, name="api_resume_status"),
+    path("api/resume/stream/<int:resume_id>/", stream.api_resume_stream, name="api_resume_stream"),
 
     
 
     # LaTeX API
     path("api/latex/generate/", api.api_latex_generate, name="api_latex_generate"),
     path("api/latex/status/<int:latex_resume_id>/", api.api_latex_status, name="api_latex_status"),
+    path("api/latex/pdf/<int:latex_resume_id>/", api.api_latex_pdf, name="api_latex_pdf"),
+    path("api/latex/sections/<int:latex_resume_id>/", api.api_latex_sections, name="api_latex_sections"),
 
     # Background Worker UI
     path("django-rq/", include("django_rq.urls")),
     path("api/jd/match/", jd.jd_match_api, name="jd_match_api"),
     path("api/jd/status/<int:jd_id>/", jd.jd_match_status, name="jd_match_status"),
+    path("api/jd/stream/<int:jd_id>/", stream.api_jd_stream, name="api_jd_stream"),
+    path("api/jd/match/batch/", jd.jd_match_batch_api, name="jd_match_batch_api"),
+    path("api/jd/batch/<str:batch_id>/", jd.jd_match_batch_status, name="jd_match_batch_status"),
 
 ]
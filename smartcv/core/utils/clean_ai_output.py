@@ -1,81 +1,164 @@
 import re
 import json
-import ast
 import logging
 
 logger = logging.getLogger(__name__)
 
+_DECODER = json.JSONDecoder()
+_FENCE = re.compile(r"```(?:json)?", re.I)
+
+
+def extract_json(raw_output):
+    """
+    Decode the outermost JSON object in model output.
+
+    Uses the C-accelerated decoder's raw_decode at the first '{', so
+    surrounding chatter, code fences or trailing text cost nothing extra.
+    Only that outermost value is tried: truncated output must fail rather
+    than yield one of its nested objects. A JSON-encoded string holding the
+    object (double-encoded output) is unwrapped. Raises ValueError when no
+    object can be decoded.
+    """
+    if isinstance(raw_output, dict):
+        return raw_output
+    text = _FENCE.sub("", str(raw_output or "")).strip()
+
+    if text.startswith('"'):
+        try:
+            inner, _ = _DECODER.raw_decode(text)
+            if isinstance(inner, str):
+                return extract_json(inner)
+        except ValueError:
+            pass
+
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in model output.")
+    try:
+        obj, _ = _DECODER.raw_decode(text, start)
+    except ValueError as e:
+        raise ValueError(f"Model output is not a complete JSON object: {e}") from e
+    return obj
+
+
+# ------------------ SCHEMA VALIDATION ------------------
+def _default(schema):
+    if "default" in schema:
+        return schema["default"]
+    kind = schema.get("type")
+    if kind == "object":
+        return conform({}, schema)[0]
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False}.get(kind)
+
+
+def _number(value, schema):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, str):
+        m = re.search(r"-?\d+(?:\.\d+)?", value)
+        if not m:
+            raise ValueError
+        value = float(m.group())
+    if not isinstance(value, (int, float)):
+        raise ValueError
+    value = min(max(value, schema.get("minimum", value)), schema.get("maximum", value))
+    return int(round(value)) if schema["type"] == "integer" else float(value)
+
+
+def conform(value, schema, path="$", problems=None):
+    """
+    Validate `value` against a (JSON-Schema subset) schema in one pass,
+    coercing near-misses ("4/5" → 4.0, out-of-range → clamped) and filling
+    defaults for anything missing or unusable.
+    Returns (value, problems) where problems lists what had to be fixed.
+    """
+    if problems is None:
+        problems = []
+    kind = schema.get("type")
+
+    if kind == "object":
+        if not isinstance(value, dict):
+            problems.append(f"{path}: expected object")
+            value = {}
+        out = {}
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                out[name] = conform(value[name], sub, f"{path}.{name}", problems)[0]
+            else:
+                problems.append(f"{path}.{name}: missing")
+                out[name] = _default(sub)
+        # Unknown keys are kept — strict mode forbids them, older cached output may have them
+        for name, v in value.items():
+            out.setdefault(name, v)
+        return out, problems
+
+    if kind == "array":
+        if not isinstance(value, list):
+            problems.append(f"{path}: expected array")
+            return _default(schema), problems
+        items = schema.get("items", {})
+        return [conform(v, items, f"{path}[{i}]", problems)[0] for i, v in enumerate(value)], problems
+
+    if kind in ("number", "integer"):
+        try:
+            return _number(value, schema), problems
+        except (ValueError, TypeError):
+            problems.append(f"{path}: expected {kind}")
+            return _default(schema), problems
+
+    if kind == "string":
+        if value is None:
+            problems.append(f"{path}: expected string")
+            return _default(schema), problems
+        value = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+        if "enum" in schema and value not in schema["enum"]:
+            problems.append(f"{path}: not one of {schema['enum']}")
+        return value, problems
+
+    return value, problems
+
+
+def matches_schema(value, schema) -> bool:
+    """
+    True when `value` is an object that can stand for `schema`: it has at
+    least one of the top-level keys, and every top-level object the schema
+    requires is present as an object.
+    """
+    properties = schema.get("properties", {})
+    if not isinstance(value, dict) or (properties and not any(k in value for k in properties)):
+        return False
+    return all(isinstance(value.get(k), dict) for k, sub in properties.items() if sub.get("type") == "object")
+
+
+def parse_structured(raw_output, schema):
+    """
+    extract_json + conform. Returns (data, problems).
+    Raises ValueError when there is no object, or when it does not match the
+    schema's top level (see matches_schema): defaults would only dress it up
+    as a valid, empty result.
+    """
+    value = extract_json(raw_output)
+    if not matches_schema(value, schema):
+        raise ValueError("Model output does not match the expected schema.")
+    data, problems = conform(value, schema)
+    if problems:
+        logger.info(f"ℹ️ Model output fixed up against schema: {problems[:10]}")
+    return data, problems
+
+
 def clean_gpt_response(raw_output):
     """
     Cleans messy GPT output and extracts + parses the first valid JSON object.
-    Handles both JSON text and accidentally stringified Python dicts.
 
     Returns:
       dict -> parsed content if valid
       {"error": "..."} -> fallback structure if parsing fails
     """
+    if raw_output is None:
+        return {}
     try:
-        if raw_output is None:
-            return {}
-
-        # If GPT already returned a Python dict, just return it.
-        if isinstance(raw_output, dict):
-            return raw_output
-
-        text = str(raw_output).strip()
-
-        # --- 1️⃣ Basic cleanup ---
-        text = re.sub(r"^.*?RAW\s*GPT.*?:", "", text, flags=re.I | re.S)
-        text = re.sub(r"```(?:json)?", "", text, flags=re.I)
-        text = text.replace("\r", "\n")
-
-        # --- 2️⃣ Find first balanced JSON block ---
-        start = text.find("{")
-        if start == -1:
-            raise ValueError("No opening '{' found in GPT output.")
-        depth, in_string, escape = 0, False, False
-        end = None
-        for i in range(start, len(text)):
-            ch = text[i]
-            if ch == '"' and not escape:
-                in_string = not in_string
-            if in_string and ch == "\\" and not escape:
-                escape = True
-                continue
-            if not in_string:
-                if ch == "{":
-                    depth += 1
-                elif ch == "}":
-                    depth -= 1
-                    if depth == 0:
-                        end = i
-                        break
-            escape = False
-        if end is None:
-            raise ValueError("No balanced '}' found for JSON object.")
-        json_block = text[start:end + 1].strip()
-
-        # --- 3️⃣ Attempt JSON or Python-dict parsing ---
-        parsed = None
-        try:
-            parsed = json.loads(json_block)
-        except json.JSONDecodeError:
-            try:
-                # Handle accidentally Python dict-style text
-                parsed = ast.literal_eval(json_block)
-            except Exception:
-                raise ValueError("Failed to parse JSON or Python-like dict.")
-
-        # --- 4️⃣ Handle nested JSON strings ---
-        if isinstance(parsed, str):
-            try:
-                parsed = json.loads(parsed)
-            except Exception:
-                pass
-
-        return parsed
-
-    except Exception as exc:
+        return extract_json(raw_output)
+    except ValueError as exc:
         preview = (str(raw_output)[:1000] + "...") if len(str(raw_output)) > 1000 else str(raw_output)
         logger.warning(f"⚠️ GPT output cleaning failed: {exc} — raw_preview={preview}")
         return {
@@ -0,0 +1,108 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+W_P, W_R, W_T = f"{W}p", f"{W}r", f"{W}t"
+W_TAB, W_BR, W_CR = f"{W}tab", f"{W}br", f"{W}cr"
+W_TR, W_TC = f"{W}tr", f"{W}tc"
+
+BODY_PART = "word/document.xml"
+_HEADER_RE = re.compile(r"^word/header\d*\.xml$")
+_FOOTER_RE = re.compile(r"^word/footer\d*\.xml$")
+
+
+# ------------------ STREAMING PARSER ------------------
+def iter_part_text(stream):
+    """
+    Yield text lines from one WordprocessingML part, in document order,
+    using an incremental parser (the full XML tree is never built).
+
+    - Paragraphs → one line each
+    - Table rows → cells joined with " | " (nested tables fold into their cell)
+    - Text boxes → their paragraphs, once (mc:Fallback copies are skipped)
+    """
+    paras, cells, rows = [], [], []
+    run_depth = 0
+    fallback_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+
+        if event == "start":
+            if tag == MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == W_P:
+                paras.append([])
+            elif tag == W_R:
+                run_depth += 1
+            elif tag == W_TR:
+                rows.append([])
+            elif tag == W_TC:
+                cells.append([])
+            continue
+
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+            elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if tag == W_T:
+            if paras:
+                paras[-1].append(elem.text or "")
+        elif tag == W_R:
+            run_depth -= 1
+        elif tag == W_TAB and run_depth and paras:
+            paras[-1].append("\t")
+        elif tag in (W_BR, W_CR) and run_depth and paras:
+            paras[-1].append("\n")
+        elif tag == W_P:
+            text = "".join(paras.pop()).strip()
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+            elem.clear()
+        elif tag == W_TC:
+            cell_text = "\n".join(cells.pop()).strip()
+            if rows:
+                rows[-1].append(cell_text)
+            elem.clear()
+        elif tag == W_TR:
+            row_text = " | ".join(c for c in rows.pop() if c)
+            if row_text:
+                if cells:
+                    # Nested table: the row belongs to the enclosing cell
+                    cells[-1].append(row_text)
+                else:
+                    yield row_text
+            elem.clear()
+
+
+def iter_docx_text(source):
+    """
+    Yield text lines from a .docx: body first, then each distinct
+    header and footer once (sections commonly share the same parts,
+    and first/even/default variants often repeat the same text).
+    """
+    with zipfile.ZipFile(source) as zf:
+        names = zf.namelist()
+
+        with zf.open(BODY_PART) as part:
+            yield from iter_part_text(part)
+
+        seen = set()
+        for pattern in (_HEADER_RE, _FOOTER_RE):
+            for name in sorted(n for n in names if pattern.match(n)):
+                with zf.open(name) as part:
+                    text = " ".join(iter_part_text(part))
+                if text and text not in seen:
+                    seen.add(text)
+                    yield text
@@ -1,87 +1,235 @@
 
-from core.utils.normalize import normalize_text
+import io
+import os
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.utils.normalize import normalize_text, NORMALIZER_VERSION
+from core.utils.ocr import ocr_page
+from core.utils.pdf_layout import extract_page_layout
+from core.utils.docx_stream import iter_docx_text
 import fitz  # PyMuPDF
-import docx
-import pytesseract
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-from PIL import Image
+
+# Bump whenever extraction output changes so cached text is rebuilt
+# (normalizer changes are picked up through NORMALIZER_VERSION).
+EXTRACTOR_VERSION = f"4-n{NORMALIZER_VERSION}"
+
+# Per-page PDF extraction runs in a process pool when > 1 (set per deployment).
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+# Shorter documents are extracted in-process: for a typical 1-3 page resume
+# shipping the bytes to a worker costs more than it saves.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+
+# ------------------ SOURCES ------------------
+def _as_source(source):
+    """
+    Extractors accept a filesystem path, raw bytes, or a binary file-like
+    object (upload buffer, storage stream). File-likes are read into bytes
+    so they can also be shipped to pool workers.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+def _open_pdf(source):
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
 # ------------------ TEXT EXTRACTION ------------------
-def extract_text_from_pdf(path: str) -> str:
+def _extract_page(page, page_index: int) -> dict:
+    """
+    One structured text pass (reading order + span metadata), then
+    region-level OCR for whatever the text layer doesn't cover.
+    """
+    layout = extract_page_layout(page, page_index)
+    page_text = layout["text"]
+
+    if not page_text.strip():
+        # Scanned page: OCR its image regions (or the whole page)
+        page_text = ocr_page(page) or f"[OCR failed on page {page_index + 1}]"
+    else:
+        # Mixed page: OCR image regions that the text layer doesn't cover
+        ocr_text = ocr_page(page, layout["text_rects"])
+        if ocr_text:
+            page_text = f"{page_text}\n{ocr_text}"
+
+    return {
+        "page": page_index,
+        "text": page_text,
+        "columns": layout["columns"],
+        "spans": layout["spans"],
+    }
+
+
+def _extract_pages_worker(path: str, page_indices) -> list:
+    """
+    Process-pool entry point: PyMuPDF documents can't be pickled, so each
+    task gets the file path and a run of page indices, and opens the file once.
+    """
+    with fitz.open(path) as pdf:
+        return [_extract_page(pdf[i], i) for i in page_indices]
+
+
+@contextmanager
+def _as_path(source):
+    """A filesystem path for the source; bytes are written to a temp file once for all workers."""
+    if not isinstance(source, bytes):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _chunks(count: int, parts: int):
+    """range(count) split into `parts` contiguous runs of near-equal length."""
+    size, extra = divmod(count, parts)
+    start = 0
+    for i in range(parts):
+        end = start + size + (i < extra)
+        if end > start:
+            yield range(start, end)
+        start = end
+
+
+# ------------------ PROCESS POOL ------------------
+# One pool per process, started on first use and reused by every later call.
+# That only pays off in a long-lived process: run the RQ queues that extract
+# PDFs with a non-forking worker class
+#     python manage.py rqworker default --worker-class rq.worker.SimpleWorker
+# Under RQ's default forking Worker every job runs in a fresh work-horse that
+# ends with os._exit() (atexit hooks never run), so there the pool is shut
+# down at the end of each call instead of being kept.
+_pool = None
+_pool_key = None  # (pid, workers) the pool was started for
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_key
+    key = (os.getpid(), workers)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None and _pool_key[0] == key[0]:
+                _pool.shutdown(wait=False)
+            # A pool inherited over fork() belongs to the parent — never reuse it
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_key = key
+        return _pool
+
+
+def _reset_pool(wait: bool = False):
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key[0] == os.getpid():
+            _pool.shutdown(wait=wait, cancel_futures=True)
+        _pool, _pool_key = None, None
+
+
+atexit.register(_reset_pool)
+
+
+def _in_work_horse() -> bool:
+    """True inside an RQ work-horse (the forking Worker sets RQ_JOB_ID for each job it forks)."""
+    return "RQ_JOB_ID" in os.environ
+
+
+def _extract_pages(source, workers: int = None) -> list:
+    """
+    Extract every page of a PDF, in order.
+    With workers > 1 (default: PDF_EXTRACT_WORKERS) and at least
+    PDF_PARALLEL_MIN_PAGES pages, pages are fanned out to the shared
+    process pool.
+    """
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    source = _as_source(source)
+    with _open_pdf(source) as pdf:
+        page_count = pdf.page_count
+        parallel = workers > 1 and page_count >= max(PDF_PARALLEL_MIN_PAGES, 2)
+        if not parallel:
+            return [_extract_page(page, page_index) for page_index, page in enumerate(pdf)]
+
+    chunks = list(_chunks(page_count, workers))
+    try:
+        with _as_path(source) as path:
+            # map() yields results in submission order → page order preserved
+            results = _get_pool(workers).map(_extract_pages_worker, [path] * len(chunks), chunks)
+            return [page for chunk in results for page in chunk]
+    except BrokenProcessPool:
+        # A worker died (OOM, segfault in a page): start a fresh pool next time
+        _reset_pool()
+        raise
+    finally:
+        if _in_work_horse():
+            _reset_pool(wait=True)
+
+
+def extract_text_from_pdf(source, workers: int = None) -> str:
     """
     Fully resilient PDF extractor:
-    1. Normal text extraction (PyMuPDF)
-    2. Fallback to block extraction for multi-column layouts
-    3. OCR fallback for image/scanned pages
+    1. Single layout-aware text pass (columns detected, reading order)
+    2. Region-level OCR for image/scanned content
+    3. Optional per-page process pool (see _extract_pages)
     4. Never returns empty string
+
+    `source` may be a path, bytes or a binary file-like object.
     """
-    text_content = []
     try:
-        with fitz.open(path) as pdf:
-            for page_index, page in enumerate(pdf):
-                page_text = page.get_text("text")
-
-                # Block extraction if text is empty or too short
-                if not page_text.strip() or len(page_text.strip()) < 40:
-                    blocks = page.get_text("blocks")
-                    page_text = "\n".join(
-                        b[4] for b in blocks if b[4].strip()
-                    )
-
-                # OCR fallback if still blank
-                if not page_text.strip():
-                    pix = page.get_pixmap(dpi=300)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    ocr_text = pytesseract.image_to_string(img)
-                    page_text = ocr_text.strip() or f"[OCR failed on page {page_index + 1}]"
-
-                text_content.append(page_text)
+        pages = _extract_pages(source, workers)
     except Exception as e:
         return f"[ERROR extracting PDF text: {e}]"
 
-    combined = "\n".join(text_content)
-    print(combined)
+    combined = "\n".join(p["text"] for p in pages)
     return normalize_text(combined)
 
 
+def extract_layout_from_pdf(source, workers: int = None) -> dict:
+    """
+    Same pass as extract_text_from_pdf, but keeps the layout information:
+
+      {"text": "...", "pages": [{"page", "text", "columns", "spans": [...]}]}
+
+    Span metadata (font size, bold, italic, bbox) is meant for downstream
+    section/heading detection.
+    """
+    pages = _extract_pages(source, workers)
+    return {
+        "text": normalize_text("\n".join(p["text"] for p in pages)),
+        "pages": pages,
+    }
+
 
-def extract_text_from_docx(path: str) -> str:
+def extract_text_from_docx(source) -> str:
     """
-    Robust DOCX extractor:
-    - Reads paragraphs, tables, headers/footers
+    Streaming DOCX extractor:
+    - Reads word/document.xml + header/footer parts straight from the zip
+    - Paragraphs, nested tables and text boxes in document order
+    - Shared headers/footers emitted once
+    - Accepts a path, bytes or a seekable binary stream
     - Gracefully handles malformed documents
     """
-    text_content = []
     try:
-        doc = docx.Document(path)
-
-        # Paragraphs
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_content.append(para.text.strip())
-
-        # Tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                if row_text:
-                    text_content.append(row_text)
-
-        # Headers and footers (optional)
-        for section in doc.sections:
-            if hasattr(section, "header"):
-                header_text = " ".join(
-                    p.text.strip() for p in section.header.paragraphs if p.text.strip()
-                )
-                if header_text:
-                    text_content.append(header_text)
-            if hasattr(section, "footer"):
-                footer_text = " ".join(
-                    p.text.strip() for p in section.footer.paragraphs if p.text.strip()
-                )
-                if footer_text:
-                    text_content.append(footer_text)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif hasattr(source, "seek"):
+            source.seek(0)  # zipfile reads seekable streams in place
+        text_content = list(iter_docx_text(source))
     except Exception as e:
         return f"[ERROR extracting DOCX text: {e}]"
 
     combined = "\n".join(text_content)
-    return normalize_text(combined)
\ No newline at end of file
+    return normalize_text(combined)
@@ -1,138 +1,122 @@
 
 
 import os
-import json
-from datetime import datetime
-from openai import OpenAI
+import asyncio
 from dotenv import load_dotenv
+from core.utils.llm_cache import cache_key, cache_get, cache_set, acache_get
+from core.utils.clean_ai_output import extract_json, parse_structured, matches_schema
+from core.utils.response_schemas import JD_MATCH_SCHEMA, response_format
+from core.utils.openai_client import get_openai_client, get_async_openai_client
+from core.utils.llm_stream import collect, acollect, stream_request
+from core.utils.prompt_registry import get_prompt, today
+from core.utils.token_budget import fit_resume, fit_text, JD_TOKEN_BUDGET
+from core.utils.rate_limiter import rate_limited_call, arate_limited_call
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-today = datetime.now().strftime("%B %d, %Y")
+MODEL = "gpt-5"
+RESPONSE_FORMAT = response_format("jd_match", JD_MATCH_SCHEMA)
 
-def match_resume_to_jd(resume_text: str, jd_text: str):
+# Streamed to the browser as they complete: scalar fields, then each criterion object.
+STREAM_FIELDS = ("overall_summary", "total_score", "competitiveness_percentile", "action_recommendation")
+STREAM_LIST_FIELD = "criteria"
+
+def build_jd_messages(resume_text: str, jd_text: str):
+    """Chat messages for the resume ↔ JD match call (shared by the sync and async paths)."""
+    return get_prompt("jd_match").messages(today=today(), resume_text=resume_text, jd_text=jd_text)
+
+
+def parse_jd_response(content: str):
+    """Raw model output → match dict validated against JD_MATCH_SCHEMA (or an {"error": ...} dict)."""
+    content = (content or "").strip()
+    try:
+        parsed = extract_json(content)
+    except ValueError:
+        return {"error": "Invalid JSON output from GPT-5", "raw_output": content}
+    # Tolerate the bare evaluation object without the status wrapper
+    if "evaluation" not in parsed and matches_schema(parsed, JD_MATCH_SCHEMA["properties"]["evaluation"]):
+        parsed = {"status": "SUCCESS", "evaluation": parsed}
+    try:
+        return parse_structured(parsed, JD_MATCH_SCHEMA)[0]
+    except ValueError:
+        return {"error": "GPT-5 output does not match the JD match format", "raw_output": content}
+
+
+def jd_cache_key(resume_text: str, jd_text: str):
+    return cache_key("jd_match", MODEL, get_prompt("jd_match").version, RESPONSE_FORMAT, resume_text, jd_text)
+
+
+def prepare_jd_match(resume_text: str, jd_text: str):
+    """
+    Fit resume and JD to their token budgets and build (request body, cache key, budget stats).
+    Shared by the sync, async and batch call paths.
+    """
+    resume_text, resume_budget = fit_resume(resume_text)
+    jd_text, jd_budget = fit_text(jd_text, JD_TOKEN_BUDGET, label="jd")
+    request = {"model": MODEL, "messages": build_jd_messages(resume_text, jd_text)}
+    if RESPONSE_FORMAT:
+        request["response_format"] = RESPONSE_FORMAT
+    return request, jd_cache_key(resume_text, jd_text), {"resume": resume_budget, "jd": jd_budget}
+
+
+def finish_jd_match(content: str, key: str, budget: dict):
+    """Parse model output, cache it if it is a usable result, attach budget stats."""
+    result = parse_jd_response(content)
+    if isinstance(result, dict) and "error" not in result:
+        cache_set(key, result)
+    return {**result, "token_budget": budget} if isinstance(result, dict) else result
+
+
+def match_resume_to_jd(resume_text: str, jd_text: str, stream=None):
     """
     Compare resume vs job description using GPT-5 and produce ATS match scoring.
+    `stream` (a StreamPublisher) switches to a streamed call and receives partial fields.
     """
     if not os.getenv("OPENAI_API_KEY"):
         return {"error": "Missing OPENAI_API_KEY"}
 
-    system_prompt = f"""
-You are a Fortune-100 Senior Recruiter and ATS Optimization Specialist with 15+ years of experience hiring across global tech, finance, and consulting organizations.
-
-You are known for critical, data-driven resume benchmarking. You must evaluate a candidate's resume in comparison to *industry-best resumes for that same role* and grade strictly, assuming hundreds of competitive applicants exist.
-
-SYSTEM DATE: {today}
-You are evaluating this resume as if reviewed today.
-
-EVALUATION CONTEXT:
-You are evaluating this resume against:
-1. The provided Job Description (JD)
-2. The top 10% of resumes in the same role, based on measurable outcomes, keyword strength, layout precision, and ATS parsing quality
-3. Market expectations for the role (certifications, technical depth, methodologies)
-
-EVALUATION GOAL:
-Provide a compact JSON object that evaluates how competitive, ATS-compliant, and employer-ready the resume is — using a strict, realistic grading curve (average resumes score 60-70; exceptional resumes exceed 90).
-
--------------------------------------
-EVALUATION CRITERIA (SCORE 0-5 EACH)
--------------------------------------
-1. Layout & ATS Compatibility - one-column, text-based, machine-readable
-2. Professional Presentation - clean header, consistent formatting
-3. Resume Length - 1-2 pages, based on experience
-4. Skim Value & Readability - logical flow, concise bullet points
-5. Summary/Profile - clarity, role alignment, value proposition
-6. Work Experience Structure - reverse chronology, scope clarity
-7. Language & Tone - professional, confident, not verbose
-8. Work Experience Timeline Clarity - no unexplained gaps
-9. Education - appropriately placed and relevant
-10. Quantifiable Achievements - >=50% bullets include measurable results
-11. Action-Result Structure - STAR/PAR storytelling strength
-12. Skills Section - organized, relevant, and realistically leveled
-13. JD Keyword Alignment - overlap with essential job requirements
-14. Early Visibility of Key Qualifications - key strengths appear at top
-15. Originality - avoids JD copy-paste wording
-16. Job Level Fit - experience matches role expectations
-17. Market Competitiveness - comparison to top 10% resumes in field
-
--------------------------------------
-ADDITIONAL SCORING RULES
--------------------------------------
-- Deduct points if critical domain skills are missing (even if JD does not list them).
-- Weight meaningful accomplishments more heavily than formatting.
-- Resume should reflect modern tools + skill depth for the candidate's level.
-- Avoid generosity — evaluate like a real recruiter screening 200+ applications.
-
--------------------------------------
-OUTPUT FORMAT (STRICT JSON ONLY)
--------------------------------------
-Return EXACTLY this JSON, with NO commentary, NO preface, NO markdown:
-
-{{
-  "status": "SUCCESS",
-  "evaluation": {{
-    "overall_summary": "...",
-    "criteria": [
-      {{"id": 1, "name": "Layout & ATS Compatibility", "score": "0-5", "feedback": "..."}},
-      {{"id": 2, "name": "Professional Presentation", "score": "0-5", "feedback": "..."}},
-      {{"id": 3, "name": "Resume Length", "score": "0-5", "feedback": "..."}},
-      {{"id": 4, "name": "Skim Value & Readability", "score": "0-5", "feedback": "..."}},
-      {{"id": 5, "name": "Summary/Profile", "score": "0-5", "feedback": "..."}},
-      {{"id": 6, "name": "Work Experience Structure", "score": "0-5", "feedback": "..."}},
-      {{"id": 7, "name": "Language & Tone", "score": "0-5", "feedback": "..."}},
-      {{"id": 8, "name": "Work Experience Timeline Clarity", "score": "0-5", "feedback": "..."}},
-      {{"id": 9, "name": "Education", "score": "0-5", "feedback": "..."}},
-      {{"id": 10, "name": "Quantifiable Achievements", "score": "0-5", "feedback": "..."}},
-      {{"id": 11, "name": "Action-Result Structure", "score": "0-5", "feedback": "..."}},
-      {{"id": 12, "name": "Skills Section", "score": "0-5", "feedback": "..."}},
-      {{"id": 13, "name": "JD Keyword Alignment", "score": "0-5", "feedback": "..."}},
-      {{"id": 14, "name": "Early Visibility of Key Qualifications", "score": "0-5", "feedback": "..."}},
-      {{"id": 15, "name": "Originality", "score": "0-5", "feedback": "..."}},
-      {{"id": 16, "name": "Job Level Fit", "score": "0-5", "feedback": "..."}},
-      {{"id": 17, "name": "Market Competitiveness", "score": "0-5", "feedback": "..."}}
-}}    ],
-    "total_score": "Average of the 17 scores (2 decimals)",
-    "competitiveness_percentile": "e.g. Top 15% / Average / Below Average",
-    "action_recommendation": "Immediate Interview / Further Review / Needs Major Revision / Reject"
-  }}
-}}
-
-STRICT RULES:
-- Must be valid JSON (must pass json.loads()).
-- No markdown.
-- No explanation.
-- Output ends exactly after the closing braces.
-- Keep response under 1500 tokens.
-"""
-
-    user_prompt = f"""
-        RESUME TEXT:
-        {resume_text}
-
-        JOB DESCRIPTION TEXT:
-        {jd_text}
-
-        Analyze the resume against the job description using the rules in the system prompt.
-        Return ONLY the JSON object.
-        """
+    request, key, budget = prepare_jd_match(resume_text, jd_text)
+    cached = cache_get(key)
+    if cached is not None:
+        return {**cached, "token_budget": budget}
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-5",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        try:
-            return json.loads(content)
-        except:
-            return {"error": "Invalid JSON output from GPT-5", "raw_output": content}
+        # Shared RPM/TPM budget + backoff retries
+        client = get_openai_client()
+        if stream is not None:
+            content = rate_limited_call(lambda: collect(client.chat.completions.create(**stream_request(request)), stream), request)
+        else:
+            content = rate_limited_call(lambda: client.chat.completions.create(**request), request).choices[0].message.content
+        return finish_jd_match(content, key, budget)
+
+    except Exception as e:
+        return {"error": f"GPT-5 JD match analysis failed: {str(e)}"}
+
+
+async def amatch_resume_to_jd(resume_text: str, jd_text: str, stream=None):
+    """
+    Async twin of match_resume_to_jd for the LLM gateway.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        return {"error": "Missing OPENAI_API_KEY"}
+
+    request, key, budget = prepare_jd_match(resume_text, jd_text)
+    cached = await acache_get(key)
+    if cached is not None:
+        return {**cached, "token_budget": budget}
+
+    try:
+        client = get_async_openai_client()
+
+        async def call():
+            if stream is not None:
+                return await acollect(await client.chat.completions.create(**stream_request(request)), stream)
+            return await client.chat.completions.create(**request)
+
+        result = await arate_limited_call(call, request)
+        content = result if stream is not None else result.choices[0].message.content
+        # Parsing also writes the cache (sync Redis) — keep it off the event loop
+        return await asyncio.to_thread(finish_jd_match, content, key, budget)
 
     except Exception as e:
         return {"error": f"GPT-5 JD match analysis failed: {str(e)}"}
@@ -0,0 +1,99 @@
+import os
+import re
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+from core.utils.clean_ai_output import conform
+from core.utils.response_schemas import LATEX_CONTENT_SCHEMA
+
+TEMPLATE_DIR = os.path.dirname(__file__)
+DEFAULT_TEMPLATE = "latex_temp_1.tex.j2"
+
+_LATEX_SPECIAL = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIAL_RE = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIAL))
+_URL_SPECIAL_RE = re.compile(r"[\\%#{}]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def latex_escape(value) -> str:
+    """Plain text → LaTeX-safe text (one pass, so escapes are never re-escaped)."""
+    text = _WHITESPACE.sub(" ", str(value or "")).strip()
+    return _LATEX_SPECIAL_RE.sub(lambda m: _LATEX_SPECIAL[m.group()], text)
+
+
+def latex_url(value) -> str:
+    """URL for \\href: only the characters hyperref cannot take literally are escaped."""
+    url = _WHITESPACE.sub("", str(value or ""))
+    return _URL_SPECIAL_RE.sub(lambda m: "\\" + m.group(), url)
+
+
+# LaTeX is full of { } and {# — use delimiters that never occur in the template.
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    block_start_string="((*",
+    block_end_string="*))",
+    variable_start_string="(((",
+    variable_end_string=")))",
+    comment_start_string="((=",
+    comment_end_string="=))",
+    trim_blocks=True,
+    lstrip_blocks=True,
+    autoescape=False,
+    keep_trailing_newline=True,
+    undefined=StrictUndefined,
+)
+_env.filters["latex_escape"] = latex_escape
+_env.filters["latex_url"] = latex_url
+
+
+def _absolute(url: str) -> str:
+    url = url.strip()
+    if url and not re.match(r"^[a-z][a-z0-9+.-]*:", url, re.I):
+        return f"https://{url}"
+    return url
+
+
+def _label(url: str) -> str:
+    return re.sub(r"^https?://(www\.)?", "", url).rstrip("/")
+
+
+def _section(section):
+    """The section with `kind` pointing at its filled list, or None when it is empty."""
+    kinds = [section["kind"]] + [k for k in ("entries", "skills", "lines") if k != section["kind"]]
+    for kind in kinds:
+        if isinstance(section.get(kind), list) and section[kind]:
+            return {**section, "kind": kind}
+    return None
+
+
+def render_context(content: dict) -> dict:
+    """Validate model content against LATEX_CONTENT_SCHEMA and shape it for the template."""
+    content, _ = conform(content, LATEX_CONTENT_SCHEMA)
+    website = _absolute(content["website"])
+    linkedin = _absolute(content["linkedin"])
+    links = [{"url": website, "label": _label(website)}] if website else []
+    if linkedin:
+        links.append({"url": linkedin, "label": "LinkedIn"})
+    return {
+        **content,
+        "website": website,
+        "links": links,
+        # An empty list environment is a LaTeX error
+        "sections": [s for s in map(_section, content["sections"]) if s],
+    }
+
+
+def render_latex(content: dict, template_name: str = DEFAULT_TEMPLATE) -> str:
+    """Render structured resume content to a complete LaTeX document."""
+    return _env.get_template(template_name).render(**render_context(content))
@@ -1,9 +1,16 @@
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
+from typing import Dict, Any, List, Tuple
 from dotenv import load_dotenv
+from core.utils.llm_cache import cache_key, cache_get, cache_set, acache_get, acache_set
+from core.utils.openai_client import get_openai_client, get_async_openai_client
+from core.utils.prompt_registry import latex_prompt, get_prompt
+from core.utils.clean_ai_output import parse_structured
+from core.utils.response_schemas import LATEX_CONTENT_SCHEMA, LATEX_SECTION_SCHEMA, response_format
+from core.utils.latex_render import render_latex
+from core.utils.token_budget import fit_resume, compact_json, estimate_tokens
+from core.utils.rate_limiter import rate_limited_call, arate_limited_call
 
 # Load environment variables
 load_dotenv()
@@ -12,8 +19,202 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# "model": GPT-5 writes the whole LaTeX document.
+# "template": GPT-5 returns structured content (JSON) and latex_temp_1.tex.j2 is rendered locally.
+LATEX_RENDER_MODE = os.getenv("LATEX_RENDER_MODE", "model")
+CONTENT_FORMAT = response_format("latex_content", LATEX_CONTENT_SCHEMA)
+SECTION_FORMAT = response_format("latex_section", LATEX_SECTION_SCHEMA)
+
+
+def _suggestions_json(ai_suggestions: Dict[str, Any]) -> str:
+    # token_budget is bookkeeping from the analysis step, not a suggestion
+    suggestions = {k: v for k, v in ai_suggestions.items() if k != "token_budget"}
+    suggestions_json = compact_json(suggestions)
+    logger.info(
+        f"✂️ suggestions input: {estimate_tokens(json.dumps(ai_suggestions, indent=2, ensure_ascii=False))}"
+        f" → {estimate_tokens(suggestions_json)} tokens"
+    )
+    return suggestions_json
+
+
+def build_latex_messages(
+    resume_text: str,
+    ai_suggestions: Dict[str, Any],
+    *,
+    system_prompt_file: str = "latex_system_prompt.txt",
+    template_file: str = "latex_temp_1.txt",
+) -> Tuple[List[Dict[str, str]], str]:
+    """
+    Assemble the chat messages for LaTeX generation.
+    Returns (messages, prompt_version); prompt and template are loaded once
+    per process by the prompt registry. The resume is fitted to the token
+    budget and the suggestions are sent as compact JSON.
+    """
+    prompt = latex_prompt(system_prompt_file, template_file)
+    resume_text, _ = fit_resume(resume_text)
+    messages = prompt.messages(resume_text=resume_text, suggestions_json=_suggestions_json(ai_suggestions))
+    return messages, prompt.version
+
+
+def build_content_messages(resume_text: str, ai_suggestions: Dict[str, Any]) -> Tuple[List[Dict[str, str]], str]:
+    """Chat messages for template mode: the model writes structured content only, no LaTeX."""
+    prompt = get_prompt("latex_content")
+    resume_text, _ = fit_resume(resume_text)
+    messages = prompt.messages(resume_text=resume_text, suggestions_json=_suggestions_json(ai_suggestions))
+    return messages, prompt.version
+
+
+def _message_content(response) -> str:
+    # Extract response content safely
+    content = ""
+    if hasattr(response, "choices") and response.choices:
+        msg = getattr(response.choices[0], "message", None)
+        if msg and hasattr(msg, "content"):
+            content = msg.content
+        elif isinstance(response.choices[0], dict):
+            content = response.choices[0].get("message", {}).get("content", "")
+    if not content:
+        raise ValueError("Empty response from GPT-5 API")
+    return content
+
+
+def parse_latex_response(response) -> str:
+    """Pull the LaTeX out of a chat completion, stripping markdown fences."""
+    content = _message_content(response)
+
+    # Clean markdown fences if any
+    return (
+        content.replace("```latex", "")
+        .replace("```", "")
+        .strip()
+    )
+
+
+def parse_content_response(response) -> Dict[str, Any]:
+    """Structured resume content from a chat completion, validated against LATEX_CONTENT_SCHEMA."""
+    content, _ = parse_structured(_message_content(response), LATEX_CONTENT_SCHEMA)
+    if not content["sections"]:
+        raise ValueError("GPT-5 returned no resume sections")
+    return content
+
+
+def _content_request(resume_text, ai_suggestions, model):
+    messages, prompt_version = build_content_messages(resume_text, ai_suggestions)
+    request = {"model": model, "messages": messages}
+    if CONTENT_FORMAT:
+        request["response_format"] = CONTENT_FORMAT
+    key = cache_key("latex_content", model, prompt_version, CONTENT_FORMAT, resume_text, ai_suggestions)
+    return request, key
+
+
+def generate_resume_content(
+    resume_text: str,
+    ai_suggestions: Dict[str, Any],
+    *,
+    model: str = "gpt-5",
+    max_retries: int = 2,
+) -> Dict[str, Any]:
+    """
+    Template mode: ask GPT-5 for the optimized resume as structured content
+    (contact details + sections) instead of a full LaTeX document.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("❌ Missing OPENAI_API_KEY in .env file.")
+
+    request, key = _content_request(resume_text, ai_suggestions, model)
+    cached = cache_get(key)
+    if cached is not None:
+        logger.info("✅ Resume content served from response cache.")
+        return cached
+
+    logger.info(f"🚀 Starting GPT-5 resume content generation using model `{model}`")
+    client = get_openai_client()
+    try:
+        content = rate_limited_call(
+            lambda: client.chat.completions.create(**request), request,
+            parse=parse_content_response, max_retries=max_retries, retry_on=(ValueError,),
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ GPT-5 resume content generation failed: {e}") from e
+
+    cache_set(key, content)
+    return content
+
+
+async def agenerate_resume_content(
+    resume_text: str,
+    ai_suggestions: Dict[str, Any],
+    *,
+    model: str = "gpt-5",
+    max_retries: int = 2,
+) -> Dict[str, Any]:
+    """Async twin of generate_resume_content for the LLM gateway."""
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("❌ Missing OPENAI_API_KEY in .env file.")
+
+    request, key = _content_request(resume_text, ai_suggestions, model)
+    cached = await acache_get(key)
+    if cached is not None:
+        return cached
+
+    client = get_async_openai_client()
+
+    async def call():
+        return await client.chat.completions.create(**request)
+
+    try:
+        content = await arate_limited_call(
+            call, request, parse=parse_content_response, max_retries=max_retries, retry_on=(ValueError,),
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ GPT-5 resume content generation failed: {e}") from e
+
+    await acache_set(key, content)
+    return content
+
+
+def generate_section(
+    section: Dict[str, Any],
+    guidance: str,
+    *,
+    model: str = "gpt-5",
+    max_retries: int = 2,
+) -> Dict[str, Any]:
+    """
+    Rewrite one section of template-mode content according to `guidance`.
+    Only that section is sent, so an edit costs one small model call.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("❌ Missing OPENAI_API_KEY in .env file.")
+
+    prompt = get_prompt("latex_section")
+    messages = prompt.messages(section_json=compact_json(section), guidance=guidance.strip() or "None")
+    request = {"model": model, "messages": messages}
+    if SECTION_FORMAT:
+        request["response_format"] = SECTION_FORMAT
+
+    key = cache_key("latex_section", model, prompt.version, SECTION_FORMAT, section, guidance)
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
+
+    def parse(response):
+        return parse_structured(_message_content(response), LATEX_SECTION_SCHEMA)[0]
+
+    client = get_openai_client()
+    try:
+        rewritten = rate_limited_call(
+            lambda: client.chat.completions.create(**request), request,
+            parse=parse, max_retries=max_retries, retry_on=(ValueError,),
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ GPT-5 section regeneration failed: {e}") from e
+
+    # The edit may not move or retype the section
+    rewritten = {**rewritten, "title": section.get("title", rewritten["title"]), "kind": section.get("kind", rewritten["kind"])}
+    cache_set(key, rewritten)
+    return rewritten
+
 
 def generate_latex_resume(
     resume_text: str,
@@ -43,85 +244,84 @@ def generate_latex_resume(
         OpenAI model to use (default: "gpt-5").
     max_retries : int
         Retry attempts on transient errors.
+
+    With LATEX_RENDER_MODE=template the model only writes structured content
+    and the document is rendered locally from latex_temp_1.tex.j2
+    (system_prompt_file / template_file are not used).
     """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise EnvironmentError("❌ Missing OPENAI_API_KEY in .env file.")
+
+    if LATEX_RENDER_MODE == "template":
+        return render_latex(generate_resume_content(resume_text, ai_suggestions, model=model, max_retries=max_retries))
+
+    messages, prompt_version = build_latex_messages(
+        resume_text, ai_suggestions,
+        system_prompt_file=system_prompt_file, template_file=template_file,
+    )
+
+    # --- Response cache ---
+    key = cache_key("latex", model, prompt_version, resume_text, ai_suggestions)
+    cached = cache_get(key)
+    if cached is not None:
+        logger.info("✅ LaTeX served from response cache.")
+        return cached
+
+    logger.info(f"🚀 Starting GPT-5 LaTeX generation using model `{model}`")
+
+    # --- GPT API call (shared RPM/TPM budget; backoff retries, incl. empty responses) ---
+    request = {"model": model, "messages": messages}
+    client = get_openai_client()
+    try:
+        cleaned_output = rate_limited_call(
+            lambda: client.chat.completions.create(**request), request,
+            parse=parse_latex_response, max_retries=max_retries, retry_on=(ValueError,),
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ GPT-5 LaTeX generation failed: {e}") from e
+
+    logger.info("✅ LaTeX generation successful.")
+    cache_set(key, cleaned_output)
+    return cleaned_output
 
-    base_dir = os.path.dirname(__file__)
-    system_prompt_path = os.path.join(base_dir, system_prompt_file)
-    template_path = os.path.join(base_dir, template_file)
 
-    # --- Validation ---
+async def agenerate_latex_resume(
+    resume_text: str,
+    ai_suggestions: Dict[str, Any],
+    *,
+    model: str = "gpt-5",
+    max_retries: int = 2,
+) -> str:
+    """
+    Async twin of generate_latex_resume for the LLM gateway.
+    """
     if not os.getenv("OPENAI_API_KEY"):
         raise EnvironmentError("❌ Missing OPENAI_API_KEY in .env file.")
-    if not os.path.exists(system_prompt_path):
-        raise FileNotFoundError(f"System prompt not found: {system_prompt_path}")
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template file not found: {template_path}")
 
-    # --- Load prompt & template ---
-    with open(system_prompt_path, "r", encoding="utf-8") as f:
-        system_prompt = f.read()
+    if LATEX_RENDER_MODE == "template":
+        content = await agenerate_resume_content(resume_text, ai_suggestions, model=model, max_retries=max_retries)
+        return render_latex(content)
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        latex_template = f.read()
+    messages, prompt_version = build_latex_messages(resume_text, ai_suggestions)
 
-    # Replace placeholder {{TEMPLATE}} inside system prompt
-    if "{{TEMPLATE}}" in system_prompt:
-        system_prompt = system_prompt.replace("{{TEMPLATE}}", latex_template)
-    else:
-        system_prompt += "\n\n" + latex_template
+    key = cache_key("latex", model, prompt_version, resume_text, ai_suggestions)
+    cached = await acache_get(key)
+    if cached is not None:
+        logger.info("✅ LaTeX served from response cache.")
+        return cached
 
-    # --- Prepare user input ---
-    suggestions_json = json.dumps(ai_suggestions, indent=2, ensure_ascii=False)
-    user_input = f"""
-RAW RESUME TEXT:
-{resume_text}
+    request = {"model": model, "messages": messages}
+    client = get_async_openai_client()
 
-ATS SCORE AND SUGGESTIONS:
-{suggestions_json}
+    async def call():
+        return await client.chat.completions.create(**request)
 
-Please generate the final LaTeX resume using the provided template and instructions.
-Return only the LaTeX code — no explanations, no markdown fences.
-"""
-
-    logger.info(f"🚀 Starting GPT-5 LaTeX generation using model `{model}`")
+    try:
+        cleaned_output = await arate_limited_call(
+            call, request, parse=parse_latex_response, max_retries=max_retries, retry_on=(ValueError,),
+        )
+    except Exception as e:
+        raise RuntimeError(f"❌ GPT-5 LaTeX generation failed: {e}") from e
 
-    # --- GPT API call ---
-    last_error: Optional[Exception] = None
-    for attempt in range(1, max_retries + 2):
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input},
-                ],
-            )
-
-            # Extract response content safely
-            content = ""
-            if hasattr(response, "choices") and response.choices:
-                msg = getattr(response.choices[0], "message", None)
-                if msg and hasattr(msg, "content"):
-                    content = msg.content
-                elif isinstance(response.choices[0], dict):
-                    content = response.choices[0].get("message", {}).get("content", "")
-            if not content:
-                raise ValueError("Empty response from GPT-5 API")
-
-            # Clean markdown fences if any
-            cleaned_output = (
-                content.replace("```latex", "")
-                .replace("```", "")
-                .strip()
-            )
-
-            logger.info("✅ LaTeX generation successful.")
-            return cleaned_output
-
-        except Exception as e:
-            logger.warning(f"⚠️ Attempt {attempt} failed: {e}")
-            last_error = e
-            if attempt == max_retries + 1:
-                raise RuntimeError(f"❌ GPT-5 failed after {attempt} attempts: {e}")
-
-    raise RuntimeError("Unexpected error during LaTeX generation") from last_error
+    await acache_set(key, cleaned_output)
+    return cleaned_output
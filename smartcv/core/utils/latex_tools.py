@@ -1,28 +1,144 @@
 import os
+import json
+import time
+import shutil
+import logging
 import tempfile
 import subprocess
+from functools import lru_cache
 
-def compile_tex_to_pdf(tex_content):
+logger = logging.getLogger(__name__)
+
+TECTONIC_BIN = os.getenv("TECTONIC_BIN", "tectonic")
+# Pinned local bundle/format cache shared by every compile (seed it once, then compiles run offline).
+TECTONIC_CACHE_DIR = os.getenv("TECTONIC_CACHE_DIR", "")
+# Pin the bundle URL so the cache never silently switches TeX Live versions.
+TECTONIC_BUNDLE = os.getenv("TECTONIC_BUNDLE", "")
+# "auto" = --only-cached once the cache has been seeded; "1"/"0" force it on/off.
+TECTONIC_ONLY_CACHED = os.getenv("TECTONIC_ONLY_CACHED", "auto")
+TECTONIC_TIMEOUT = int(os.getenv("TECTONIC_TIMEOUT", "120"))
+
+_SEED_MARKER = "smartcv-seeded.json"
+_SEED_TEMPLATE = os.path.join(os.path.dirname(__file__), "latex_temp_1.txt")
+
+
+@lru_cache(maxsize=1)
+def tectonic_version() -> str:
+    """`tectonic --version` output (part of the compiled-PDF identity)."""
+    try:
+        out = subprocess.run([TECTONIC_BIN, "--version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+        return out.stdout.decode().strip() or "unknown"
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+
+def _marker_path():
+    return os.path.join(TECTONIC_CACHE_DIR, _SEED_MARKER) if TECTONIC_CACHE_DIR else None
+
+
+def cache_seeded() -> bool:
+    """True when the pinned cache was seeded by this tectonic version with this bundle."""
+    path = _marker_path()
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        with open(path, encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return marker.get("tectonic") == tectonic_version() and marker.get("bundle") == TECTONIC_BUNDLE
+
+
+def _only_cached() -> bool:
+    if TECTONIC_ONLY_CACHED == "auto":
+        return cache_seeded()
+    return TECTONIC_ONLY_CACHED == "1"
+
+
+def _run_tectonic(workdir, tex_content, only_cached=None):
+    """Compile `tex_content` inside `workdir` and return the PDF bytes."""
+    tex_file = os.path.join(workdir, "resume.tex")
+    pdf_path = os.path.join(workdir, "resume.pdf")
+    with open(tex_file, "w", encoding="utf-8") as f:
+        f.write(tex_content)
+    if os.path.exists(pdf_path):
+        os.remove(pdf_path)
+
+    cmd = [TECTONIC_BIN, tex_file, "--outdir", workdir]
+    if TECTONIC_BUNDLE:
+        cmd += ["--bundle", TECTONIC_BUNDLE]
+    if _only_cached() if only_cached is None else only_cached:
+        cmd.append("--only-cached")
+
+    env = dict(os.environ)
+    if TECTONIC_CACHE_DIR:
+        env["TECTONIC_CACHE_DIR"] = TECTONIC_CACHE_DIR
+
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=TECTONIC_TIMEOUT,
+        env=env,
+    )
+
+    if result.returncode != 0:
+        print(tex_content)
+        raise Exception(f"Tectonic compile failed: {result.stderr.decode()}")
+
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+class CompileWorkdir:
+    """
+    A scratch directory kept for the life of a compile worker, so repeated
+    compiles skip creating and deleting a temp tree each time.
+    """
+
+    def __init__(self):
+        self.path = tempfile.mkdtemp(prefix="smartcv-tex-")
+
+    def compile(self, tex_content):
+        return _run_tectonic(self.path, tex_content)
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def compile_tex_to_pdf(tex_content, workdir=None):
     """
     Compile a LaTeX string to PDF using tectonic (no shell escape).
+    Pass a CompileWorkdir to reuse its scratch directory.
     Returns compiled PDF bytes.
     """
+    if workdir is not None:
+        return workdir.compile(tex_content)
     with tempfile.TemporaryDirectory() as tmpdir:
-        tex_file = os.path.join(tmpdir, "resume.tex")
-        with open(tex_file, "w", encoding="utf-8") as f:
-            f.write(tex_content)
-
-        result = subprocess.run(
-            ["tectonic", tex_file, "--outdir", tmpdir],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=120
-        )
-
-        if result.returncode != 0:
-            print(tex_content)
-            raise Exception(f"Tectonic compile failed: {result.stderr.decode()}")
-
-        pdf_path = os.path.join(tmpdir, "resume.pdf")
-        with open(pdf_path, "rb") as f:
-            return f.read()
+        return _run_tectonic(tmpdir, tex_content)
+
+
+def seed_cache():
+    """
+    Compile the shipped template once with network access so the pinned
+    cache holds every bundle file and the format our resumes need, then
+    mark it seeded — later compiles run with --only-cached.
+    """
+    if not TECTONIC_CACHE_DIR:
+        raise ValueError("Set TECTONIC_CACHE_DIR before seeding the tectonic cache.")
+    os.makedirs(TECTONIC_CACHE_DIR, exist_ok=True)
+
+    with open(_SEED_TEMPLATE, encoding="utf-8") as f:
+        template = f.read()
+
+    timings = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for only_cached in (False, True):  # fetch, then prove it works offline
+            start = time.perf_counter()
+            _run_tectonic(tmpdir, template, only_cached=only_cached)
+            timings.append(round((time.perf_counter() - start) * 1000))
+
+    with open(_marker_path(), "w", encoding="utf-8") as f:
+        json.dump({"tectonic": tectonic_version(), "bundle": TECTONIC_BUNDLE, "seeded_at": int(time.time())}, f)
+    logger.info(f"✅ Tectonic cache seeded at {TECTONIC_CACHE_DIR} (cold {timings[0]} ms, warm {timings[1]} ms)")
+    return {"cold_ms": timings[0], "warm_ms": timings[1]}
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cached model responses live in the same Redis that RQ uses.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+_PREFIX = "llmcache"
+_INDEX_KEY = f"{_PREFIX}:lru"      # sorted set: key → last access time
+_STATS_KEY = f"{_PREFIX}:stats"    # hash: "<namespace>:hits" / "<namespace>:misses"
+
+
+def _redis():
+    """Shared RQ connection, or None when Redis isn't configured/reachable."""
+    try:
+        import django_rq
+        return django_rq.get_connection("default")
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache disabled (no Redis): {e}")
+        return None
+
+
+def _namespace(key: str) -> str:
+    return key.split(":")[1]
+
+
+# ------------------ KEYS ------------------
+def cache_key(namespace: str, model: str, prompt_version: str, *inputs) -> str:
+    """
+    Key = namespace + SHA-256(model, prompt-template version, normalized inputs).
+    Dict/list inputs are hashed as canonical JSON (sorted keys, compact).
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, *inputs):
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return f"{_PREFIX}:{namespace}:{digest.hexdigest()}"
+
+
+# ------------------ GET / SET ------------------
+def cache_get(key: str):
+    """Return the cached value, or None on a miss (or when the cache is off)."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    conn = _redis()
+    if conn is None:
+        return None
+    try:
+        raw = conn.get(key)
+        field = "hits" if raw is not None else "misses"
+        pipe = conn.pipeline()
+        pipe.hincrby(_STATS_KEY, f"{_namespace(key)}:{field}", 1)
+        if raw is not None:
+            pipe.zadd(_INDEX_KEY, {key: time.time()})
+        pipe.execute()
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache read failed: {e}")
+        return None
+
+
+def cache_set(key: str, value):
+    """
+    Store a value with TTL, then evict least-recently-used entries beyond
+    LLM_CACHE_MAX_ENTRIES (and index entries whose TTL already expired).
+    """
+    if not LLM_CACHE_ENABLED:
+        return
+    conn = _redis()
+    if conn is None:
+        return
+    try:
+        now = time.time()
+        pipe = conn.pipeline()
+        pipe.setex(key, LLM_CACHE_TTL, json.dumps(value, ensure_ascii=False))
+        pipe.zadd(_INDEX_KEY, {key: now})
+        pipe.zremrangebyscore(_INDEX_KEY, 0, now - LLM_CACHE_TTL)
+        pipe.zcard(_INDEX_KEY)
+        size = pipe.execute()[-1]
+
+        overflow = size - LLM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            victims = conn.zrange(_INDEX_KEY, 0, overflow - 1)
+            if victims:
+                pipe = conn.pipeline()
+                pipe.delete(*victims)
+                pipe.zrem(_INDEX_KEY, *victims)
+                pipe.hincrby(_STATS_KEY, "evictions", len(victims))
+                pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache write failed: {e}")
+
+
+# Coroutines (LLM gateway) run the Redis round-trips in a thread, off the event loop.
+async def acache_get(key: str):
+    return await asyncio.to_thread(cache_get, key)
+
+
+async def acache_set(key: str, value):
+    await asyncio.to_thread(cache_set, key, value)
+
+
+def cache_stats() -> dict:
+    """Hit/miss/eviction counters plus current entry count."""
+    conn = _redis()
+    if conn is None:
+        return {}
+    stats = {
+        (k.decode() if isinstance(k, bytes) else k): int(v)
+        for k, v in conn.hgetall(_STATS_KEY).items()
+    }
+    stats["entries"] = conn.zcard(_INDEX_KEY)
+    return stats
@@ -0,0 +1,307 @@
+import os
+import re
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Streamed model output is relayed to browsers through Redis pub/sub.
+LLM_STREAM_ENABLED = os.getenv("LLM_STREAM_ENABLED", "1") == "1"
+LLM_STREAM_SNAPSHOT_TTL = int(os.getenv("LLM_STREAM_SNAPSHOT_TTL", "3600"))
+
+_PREFIX = "llmstream"
+
+
+def _redis():
+    try:
+        import django_rq
+        return django_rq.get_connection("default")
+    except Exception as e:
+        logger.warning(f"⚠️ LLM streaming disabled (no Redis): {e}")
+        return None
+
+
+def async_redis():
+    """redis.asyncio client pointed at the same Redis as RQ's default connection."""
+    import django_rq
+    import redis.asyncio as aioredis
+    kwargs = django_rq.get_connection("default").connection_pool.connection_kwargs
+    return aioredis.Redis(**{
+        k: kwargs[k]
+        for k in ("host", "port", "db", "username", "password")
+        if k in kwargs
+    })
+
+
+# One redis.asyncio client per event loop, shared by every async publisher.
+_async_conn = None
+_async_conn_loop = None
+
+
+def _shared_async_redis():
+    global _async_conn, _async_conn_loop
+    loop = asyncio.get_running_loop()
+    if _async_conn is None or _async_conn_loop is not loop:
+        try:
+            _async_conn, _async_conn_loop = async_redis(), loop
+        except Exception as e:
+            logger.warning(f"⚠️ LLM streaming disabled (no Redis): {e}")
+            return None
+    return _async_conn
+
+
+def channel_name(kind: str, object_id) -> str:
+    return f"{_PREFIX}:{kind}:{object_id}"
+
+
+def snapshot_key(kind: str, object_id) -> str:
+    return f"{channel_name(kind, object_id)}:snapshot"
+
+
+# ------------------ PARTIAL JSON ------------------
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*')  # stops at the closing quote or a lone trailing backslash
+_NUMBER = re.compile(r"[-+.0-9eE]+")
+_WHITESPACE = " \t\r\n"
+
+
+class PartialFields:
+    """
+    Pulls completed fields out of a JSON object while it is still being
+    generated. `fields` are scalar keys reported once their value is
+    complete; `list_field` names an array of objects whose items are
+    reported one by one as each closes.
+
+    The scanner keeps its position and string/nesting state between
+    feed() calls, so every character is looked at once; only a token that
+    is still being written is kept in the buffer.
+    """
+
+    def __init__(self, fields, list_field=None):
+        self.fields = set(fields)
+        self.list_field = list_field
+        self.found = {}
+        self._buf = ""
+        self._pos = 0               # next unscanned index in _buf
+        self._string_start = None   # set while inside a string
+        self._last_string = None    # last closed string: the key, if ":" follows
+        self._key = None            # key whose value is being read
+        self._depth = 0
+        self._list_depth = None     # depth of list_field's array while inside it
+        self._list_done = False
+        self._item_start = None
+
+    def feed(self, delta: str) -> dict:
+        """Add a chunk; return {"fields": {...}, "items": [...]} for what just completed."""
+        self._buf += delta
+        new_fields, items = {}, []
+        buf, pos, end = self._buf, self._pos, len(self._buf)
+
+        while pos < end:
+            if self._string_start is not None:
+                pos = _STRING_BODY.match(buf, pos).end()
+                if pos >= end or buf[pos] != '"':
+                    break  # string (or an escape) continues in the next delta
+                self._close_string(buf[self._string_start:pos + 1], new_fields)
+                self._string_start = None
+                pos += 1
+                continue
+
+            c = buf[pos]
+            if c in _WHITESPACE:
+                pos += 1
+            elif c == '"':
+                self._string_start = pos
+                pos += 1
+            elif c in "-0123456789":
+                m = _NUMBER.match(buf, pos)
+                if m.end() >= end:
+                    break  # number may continue in the next delta
+                self._set_field(m.group(), new_fields)
+                pos = m.end()
+            elif c == ":":
+                self._key = self._decode(self._last_string)
+                self._last_string = None
+                pos += 1
+            elif c in "{[":
+                if c == "[" and self._key == self.list_field and self._list_depth is None and not self._list_done:
+                    self._list_depth = self._depth + 1
+                elif c == "{" and self._depth == self._list_depth:
+                    self._item_start = pos
+                self._depth += 1
+                self._key = None
+                pos += 1
+            elif c in "}]":
+                self._depth -= 1
+                if c == "}" and self._item_start is not None and self._depth == self._list_depth:
+                    item = self._decode(buf[self._item_start:pos + 1])
+                    if item is not None:
+                        items.append(item)
+                    self._item_start = None
+                elif c == "]" and self._list_depth is not None and self._depth < self._list_depth:
+                    self._list_depth, self._list_done = None, True
+                self._key = None
+                pos += 1
+            else:  # "," and the literals true / false / null
+                self._key = self._last_string = None
+                pos += 1
+
+        # Keep only what a later delta may still need
+        keep = min(i for i in (pos, self._string_start, self._item_start) if i is not None)
+        self._buf = buf[keep:]
+        self._pos = pos - keep
+        if self._string_start is not None:
+            self._string_start -= keep
+        if self._item_start is not None:
+            self._item_start -= keep
+        return {"fields": new_fields, "items": items}
+
+    @staticmethod
+    def _decode(token):
+        if token is None:
+            return None
+        try:
+            return json.loads(token)
+        except ValueError:
+            return None
+
+    def _close_string(self, token: str, new_fields: dict):
+        if self._key is not None:
+            self._set_field(token, new_fields)
+        else:
+            self._last_string = token
+
+    def _set_field(self, token: str, new_fields: dict):
+        name, self._key = self._key, None
+        if name not in self.fields or name in self.found:
+            return
+        value = self._decode(token)
+        if value is not None:
+            self.found[name] = new_fields[name] = value
+
+
+# ------------------ PUBLISHING ------------------
+class StreamPublisher:
+    """
+    Publishes partial results for one object to its pub/sub channel and keeps a
+    snapshot (everything published so far) so late subscribers can catch up.
+    Redis errors are logged and swallowed — streaming must never fail a job.
+    """
+
+    def __init__(self, kind: str, object_id, fields, list_field=None):
+        self.channel = channel_name(kind, object_id)
+        self.snapshot_key = snapshot_key(kind, object_id)
+        self.parser = PartialFields(fields, list_field)
+        self.list_field = list_field
+        self.snapshot = {"status": "STREAMING", "fields": {}, "items": []}
+
+    def _update(self, delta: str):
+        """Parse a delta; returns the update to publish, or None."""
+        if not delta:
+            return None
+        update = self.parser.feed(delta)
+        if not (update["fields"] or update["items"]):
+            return None
+        self.snapshot["fields"].update(update["fields"])
+        self.snapshot["items"].extend(update["items"])
+        return update
+
+    def _pipeline(self, conn, event: str, data: dict):
+        pipe = conn.pipeline()
+        pipe.setex(self.snapshot_key, LLM_STREAM_SNAPSHOT_TTL, json.dumps(self.snapshot, ensure_ascii=False))
+        pipe.publish(self.channel, json.dumps({"event": event, "data": data}, ensure_ascii=False))
+        return pipe
+
+    def feed(self, delta: str):
+        update = self._update(delta)
+        if update is None:
+            return
+        conn = _redis()
+        if conn is None:
+            return
+        try:
+            self._pipeline(conn, "partial", update).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ LLM stream publish failed: {e}")
+
+    async def afeed(self, delta: str):
+        """feed() for code running on an event loop: publishes through redis.asyncio."""
+        update = self._update(delta)
+        if update is None:
+            return
+        conn = _shared_async_redis()
+        if conn is None:
+            return
+        try:
+            await self._pipeline(conn, "partial", update).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ LLM stream publish failed: {e}")
+
+
+def publish_done(kind: str, object_id, data: dict):
+    """Final event for an object: the stored result (SUCCESS or FAILED)."""
+    conn = _redis()
+    if conn is None:
+        return
+    try:
+        pipe = conn.pipeline()
+        pipe.setex(snapshot_key(kind, object_id), LLM_STREAM_SNAPSHOT_TTL,
+                   json.dumps({"status": "DONE", "result": data}, ensure_ascii=False))
+        pipe.publish(channel_name(kind, object_id), json.dumps({"event": "done", "data": data}, ensure_ascii=False))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ LLM stream publish failed: {e}")
+
+
+# ------------------ CONSUMING MODEL STREAMS ------------------
+def stream_request(request: dict) -> dict:
+    """chat.completions kwargs for a streamed call; the last chunk then reports token usage."""
+    return {**request, "stream": True, "stream_options": {"include_usage": True}}
+
+
+class StreamedText(str):
+    """
+    The full text of a drained stream. `usage` is the token usage reported by
+    the final chunk (None if the provider sent none), so the rate limiter can
+    settle a streamed call like a regular completion.
+    """
+
+    usage = None
+
+
+def _delta(chunk) -> str:
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _streamed_text(parts, usage) -> StreamedText:
+    text = StreamedText("".join(parts))
+    text.usage = usage
+    return text
+
+
+def collect(chunks, publisher: StreamPublisher = None) -> StreamedText:
+    """Drain a streamed chat completion, feeding the publisher; returns the full text."""
+    parts, usage = [], None
+    for chunk in chunks:
+        usage = getattr(chunk, "usage", None) or usage
+        delta = _delta(chunk)
+        if delta:
+            parts.append(delta)
+            if publisher is not None:
+                publisher.feed(delta)
+    return _streamed_text(parts, usage)
+
+
+async def acollect(chunks, publisher: StreamPublisher = None) -> StreamedText:
+    """Async variant of collect for AsyncOpenAI streams."""
+    parts, usage = [], None
+    async for chunk in chunks:
+        usage = getattr(chunk, "usage", None) or usage
+        delta = _delta(chunk)
+        if delta:
+            parts.append(delta)
+            if publisher is not None:
+                await publisher.afeed(delta)
+    return _streamed_text(parts, usage)
@@ -1,58 +1,241 @@
+import re
 
+# ------------------ KEYWORD GROUPS ------------------
+EXPERIENCE_ALIASES = [
+    "experience", "work experience", "employment", "career history",
+    "professional experience", "internship", "projects", "work history"
+]
+EDUCATION_ALIASES = [
+    "education", "academic background", "qualifications", "academics",
+    "educational qualifications", "degree", "university"
+]
+SENSITIVE_TERMS = ["age", "gender", "religion", "married", "nationality"]
+BULLET_SYMBOLS = ["-", "*", "•"]
 
+# Positions kept per keyword group.
+MAX_POSITIONS = 25
+
+
+# Keyword groups whose match positions are reported. All their keywords go
+# into ONE combined pattern, scanned once over the lowered text; the group of
+# a match is looked up from the keyword it matched. (A named group per
+# keyword group would cost sre its first-character prefilter, making the
+# scan ~4x slower.)
+_KEYWORD_GROUPS = {
+    "sensitive": SENSITIVE_TERMS,
+    "experience": EXPERIENCE_ALIASES,
+    "education": EDUCATION_ALIASES,
+}
+_WHOLE_WORD = {"sensitive"}
+_KEYWORDS = {w: g for g, words in _KEYWORD_GROUPS.items() for w in words}
+_SCANNED = list(_KEYWORD_GROUPS)
+
+
+def _alternation(words):
+    # Longest first so "work experience" wins over "experience" at the same offset
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+
+def _trie_pattern(words, whole_words=()) -> str:
+    """
+    Regex for a keyword set, shaped as a trie: "e(?:ducation|xperience)" instead
+    of "education|experience". sre then has one branch to follow per character
+    instead of one per keyword. Greedy, so the longest keyword at an offset
+    wins. Whole-word keywords get only the trailing \b: a leading one would
+    cost the first-character prefilter, so scan_text checks it by hand.
+    """
+    root = {}
+    for word in words:
+        node = root
+        for c in word:
+            node = node.setdefault(c, {})
+        node[""] = word in whole_words
+
+    def emit(node):
+        branches = [re.escape(c) + emit(child) for c, child in sorted(node.items()) if c]
+        ends = node.get("")  # None: no keyword ends here, True: a whole-word one does
+        if ends is False:
+            return f"(?:{'|'.join(branches)})?" if branches else ""
+        if ends:
+            branches.append(r"\b")
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return emit(root)
+
+
+_SCAN_PATTERN = re.compile(_trie_pattern(_KEYWORDS, [w for w, g in _KEYWORDS.items() if g in _WHOLE_WORD]))
+# Single-group patterns, only used to confirm a group the combined scan may have hidden
+_KEYWORD_PATTERNS = {
+    g: re.compile(rf"\b(?:{_alternation(words)})\b" if g in _WHOLE_WORD else _alternation(words))
+    for g, words in _KEYWORD_GROUPS.items()
+}
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _hideable(keyword: str) -> set:
+    """
+    Groups with a match that could start inside `keyword` (e.g. "experience"
+    hides "education" in "experienceducation"). A scan match only consumes
+    text that way for these groups, so only they need a second look.
+    """
+    groups = set()
+    # A whole-word match rejected for its leading \b can also hide a shorter
+    # keyword at the same offset
+    first = 0 if _KEYWORDS[keyword] in _WHOLE_WORD else 1
+    for k in range(first, len(keyword)):
+        tail = keyword[k:]
+        for other, group in _KEYWORDS.items():
+            if other == keyword:
+                continue
+            if other.startswith(tail) or tail.startswith(other):
+                if _KEYWORD_PATTERNS[group].match(keyword + other[len(tail):] + " ", k):
+                    groups.add(group)
+    return groups
+
+
+_HIDES = {w: _hideable(w) for w in _KEYWORDS}
+
+# Groups the rules only test for presence: one search() each, which stops
+# at the first hit. The look-behind anchors email candidates at the start
+# of a run of address characters, so a text without an address is not
+# re-scanned from every offset inside every word.
+_PRESENCE_PATTERNS = {
+    "email": re.compile(r"(?<![\w.-])[\w.-]+@[\w.-]+\.\w{2,}"),
+    "bullet": re.compile(f"[{re.escape(''.join(BULLET_SYMBOLS))}]"),
+}
+
+
+def _lowered_offsets(text: str):
+    """Map offsets in text.lower() back to text (only needed when lower() changes the length)."""
+    offsets = []
+    for i, c in enumerate(text):
+        offsets.extend([i] * len(c.lower()))
+    offsets.append(len(text))
+    return offsets
+
+
+def scan_text(text: str) -> dict:
+    """
+    One pass of the combined keyword pattern, plus a short-circuiting
+    search for each presence-only group.
+    Returns {"words": int, "found": {group: bool}, "positions": {group: [[start, end], ...]}}.
+    Positions (keyword groups only, at most MAX_POSITIONS each) refer to the original text.
+    """
+    lowered = text.lower()
+    offsets = _lowered_offsets(text) if len(lowered) != len(text) else None
+
+    positions = {g: [] for g in _SCANNED}
+    found = dict.fromkeys(_SCANNED, False)
+    maybe_hidden = set()
+    open_groups = len(_SCANNED)
+    for m in _SCAN_PATTERN.finditer(lowered):
+        keyword = m.group()
+        maybe_hidden |= _HIDES[keyword]
+        group = _KEYWORDS[keyword]
+        start, end = m.span()
+        if group in _WHOLE_WORD and start and _is_word_char(lowered[start - 1]):
+            continue
+        found[group] = True
+        spans = positions[group]
+        if len(spans) >= MAX_POSITIONS:
+            continue
+        if offsets:
+            start, end = offsets[start], offsets[end - 1] + 1
+        spans.append([start, end])
+        if len(spans) == MAX_POSITIONS:
+            open_groups -= 1
+            if not open_groups:
+                break
+
+    for group in maybe_hidden:
+        if not found[group]:
+            found[group] = _KEYWORD_PATTERNS[group].search(lowered) is not None
+    for group, pattern in _PRESENCE_PATTERNS.items():
+        found[group] = pattern.search(text) is not None
+    return {"words": len(text.split()), "found": found, "positions": positions}
+
+
+# ------------------ RULE REGISTRY ------------------
+RULES = []
+
+
+def rule(name: str, severity: str, group: str = None):
+    """
+    Register a check. The function receives the scan result and returns a
+    feedback message when the rule is violated (falsy when it passes).
+    severity "error" fails the pre-check; "warning" only adds feedback.
+    `group` attaches that group's match positions to the reported issue.
+    """
+    def register(func):
+        RULES.append({"name": name, "severity": severity, "group": group, "check": func})
+        return func
+    return register
+
+
+@rule("length", "error")
+def _check_length(scan):
+    if scan["words"] < 150:
+        return "Resume seems too short (<150 words). Add more experience or details."
+    if scan["words"] > 1200:
+        return "Resume seems too long (>1200 words). Condense to 1–2 pages."
+
+
+@rule("sections", "error")
+def _check_sections(scan):
+    missing = []
+    if not scan["found"]["experience"]:
+        missing.append("Experience")
+    if not scan["found"]["education"]:
+        missing.append("Education")
+    if missing:
+        return f"Missing key section(s): {', '.join(missing)}."
+
+
+@rule("bullets", "error")
+def _check_bullets(scan):
+    if not scan["found"]["bullet"]:
+        return "No bullet points detected. Use '-' or '*' for clarity."
+
+
+@rule("sensitive_info", "warning", group="sensitive")
+def _check_sensitive(scan):
+    if scan["found"]["sensitive"]:
+        return "Contains personal info (age, gender, religion, etc.). Remove it."
+
+
+@rule("email", "error")
+def _check_email(scan):
+    if not scan["found"]["email"]:
+        return "Missing a valid email address."
 
-import re
 
 # ------------------ LOCAL RULE CHECKS ------------------
 def run_local_checks(text: str):
-    """Improved deterministic pre-check before AI call."""
-    feedback = []
+    """Deterministic pre-check before AI call: one scan, then every registered rule."""
+    scan = scan_text(text or "")
+    feedback, issues = [], []
     failed = False
-    words = len(text.split())
-    text_lower = text.lower()
-
-    # --- 1. Basic length sanity ---
-    if words < 150:
-        feedback.append("Resume seems too short (<150 words). Add more experience or details.")
-        failed = True
-    elif words > 1200:
-        feedback.append("Resume seems too long (>1200 words). Condense to 1–2 pages.")
-        failed = True
-
-    # --- 2. Flexible section check ---
-    exp_aliases = [
-        "experience", "work experience", "employment", "career history",
-        "professional experience", "internship", "projects", "work history"
-    ]
-    edu_aliases = [
-        "education", "academic background", "qualifications", "academics",
-        "educational qualifications", "degree", "university"
-    ]
-
-    has_exp = any(a in text_lower for a in exp_aliases)
-    has_edu = any(a in text_lower for a in edu_aliases)
-
-    if not has_exp or not has_edu:
-        missing = []
-        if not has_exp: missing.append("Experience")
-        if not has_edu: missing.append("Education")
-        feedback.append(f"Missing key section(s): {', '.join(missing)}.")
-        failed = True
-
-    # --- 3. Bullet point presence ---
-    if not any(sym in text for sym in ['-', '*', '•']):
-        feedback.append("No bullet points detected. Use '-' or '*' for clarity.")
-        failed = True
-
-    # --- 4. Sensitive info check ---
-    if re.search(r'\b(age|gender|religion|married|nationality)\b', text_lower):
-        feedback.append("Contains personal info (age, gender, religion, etc.). Remove it.")
-
-    # --- 5. Contact info check ---
-    if not re.search(r'[\w\.-]+@[\w\.-]+\.\w{2,}', text):
-        feedback.append("Missing a valid email address.")
-        failed = True
-
-    return {"failed": failed, "feedback": feedback}
+
+    for r in RULES:
+        message = r["check"](scan)
+        if not message:
+            continue
+        feedback.append(message)
+        issues.append({
+            "rule": r["name"],
+            "severity": r["severity"],
+            "message": message,
+            "positions": scan["positions"][r["group"]] if r["group"] else [],
+        })
+        if r["severity"] == "error":
+            failed = True
+
+    return {"failed": failed, "feedback": feedback, "issues": issues, "matches": scan["positions"]}
 
 
+def run_local_checks_many(texts):
+    """Batch pre-screen (bulk imports) — same result shape as run_local_checks, in input order."""
+    return [run_local_checks(t) for t in texts]
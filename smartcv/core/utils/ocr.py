@@ -0,0 +1,74 @@
+import os
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+pytesseract.pytesseract.tesseract_cmd = os.getenv(
+    "TESSERACT_CMD", r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+)
+
+# Render resolution is taken from the embedded image, clamped to this range.
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "150"))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+
+# Ignore logos/icons: only OCR images covering at least this share of the page.
+OCR_MIN_REGION_FRACTION = float(os.getenv("OCR_MIN_REGION_FRACTION", "0.04"))
+
+
+# ------------------ REGION DETECTION ------------------
+def _native_dpi(info: dict) -> float:
+    """Effective resolution of an embedded image as placed on the page."""
+    x0, y0, x1, y1 = info["bbox"]
+    width_in = max(x1 - x0, 1) / 72
+    height_in = max(y1 - y0, 1) / 72
+    return max(info["width"] / width_in, info["height"] / height_in)
+
+
+def _choose_dpi(native: float) -> int:
+    return int(min(max(native, OCR_MIN_DPI), OCR_MAX_DPI))
+
+
+def image_regions(page, text_rects=None):
+    """
+    Return [(rect, dpi)] for embedded images worth OCRing, in reading order.
+
+    Images overlapping an existing text block are skipped — their content
+    is already covered by the text layer.
+    """
+    page_area = abs(page.rect) or 1
+    text_rects = [fitz.Rect(t) for t in text_rects or []]
+    regions = []
+
+    for info in page.get_image_info():
+        rect = fitz.Rect(info["bbox"]) & page.rect
+        if rect.is_empty or abs(rect) / page_area < OCR_MIN_REGION_FRACTION:
+            continue
+        if any(rect.intersects(t) for t in text_rects):
+            continue
+        regions.append((rect, _choose_dpi(_native_dpi(info))))
+
+    regions.sort(key=lambda r: (round(r[0].y0), r[0].x0))
+    return regions
+
+
+# ------------------ OCR ------------------
+def ocr_region(page, rect=None, dpi: int = OCR_MAX_DPI) -> str:
+    """Rasterize a clip of the page in grayscale and OCR it."""
+    pix = page.get_pixmap(dpi=dpi, clip=rect, colorspace=fitz.csGRAY, alpha=False)
+    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    return pytesseract.image_to_string(img).strip()
+
+
+def ocr_page(page, text_rects=None) -> str:
+    """
+    OCR only the image regions of a page.
+    Pages without usable image info (e.g. vector outlines) are OCR'd whole.
+    """
+    regions = image_regions(page, text_rects)
+    if not regions:
+        if text_rects:
+            return ""
+        return ocr_region(page)
+
+    parts = [ocr_region(page, rect, dpi) for rect, dpi in regions]
+    return "\n".join(p for p in parts if p)
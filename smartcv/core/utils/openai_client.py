@@ -0,0 +1,102 @@
+import os
+import logging
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Connection pool / timeout settings (per deployment, via .env)
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "180"))
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "0") == "1"
+
+# One client per process: sockets must never be shared across a fork.
+_clients = {}
+_async_clients = {}
+
+
+def _http2_enabled() -> bool:
+    if not OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx needs the optional h2 package for HTTP/2)
+        return True
+    except ImportError:
+        logger.warning("⚠️ OPENAI_HTTP2=1 but the 'h2' package is not installed — using HTTP/1.1.")
+        return False
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_POOL_SIZE,
+        max_keepalive_connections=OPENAI_POOL_SIZE,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Long-lived OpenAI client shared by every call site in this process.
+
+    Keeps HTTP connections alive between calls (no TLS handshake per
+    analysis) and applies connect/read timeouts so a hung call can't pin
+    a worker. Run RQ with a non-forking worker class (e.g.
+    rq.worker.SimpleWorker) to keep the pool warm across jobs; forked
+    work-horses get a fresh client of their own.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        _clients.clear()  # inherited from a parent process — don't reuse its sockets
+        http_client = httpx.Client(limits=_limits(), timeout=_timeout(), http2=_http2_enabled())
+        client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            timeout=_timeout(),
+            max_retries=0,  # retries/backoff are owned by core.utils.rate_limiter
+        )
+        _clients[pid] = client
+    return client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    AsyncOpenAI twin of get_openai_client for the LLM gateway's event loop.
+    Same pool limits and timeouts; one instance per process.
+    """
+    pid = os.getpid()
+    client = _async_clients.get(pid)
+    if client is None:
+        _async_clients.clear()
+        http_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout(), http2=_http2_enabled())
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            timeout=_timeout(),
+            max_retries=0,
+        )
+        _async_clients[pid] = client
+    return client
+
+
+def get_batch_client() -> OpenAI:
+    """
+    Client for the Batch API (files + batches). OPENAI_BATCH_BASE_URL points
+    it at a stand-in server (manage.py llm_batch_stub_server) for local runs.
+    """
+    base_url = os.getenv("OPENAI_BATCH_BASE_URL")
+    if not base_url:
+        return get_openai_client()
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY") or "stub",
+        base_url=base_url,
+        timeout=_timeout(),
+    )
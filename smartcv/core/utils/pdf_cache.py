@@ -0,0 +1,111 @@
+import os
+import re
+import hashlib
+import logging
+import tempfile
+
+from core.utils.latex_tools import compile_tex_to_pdf, tectonic_version, TECTONIC_BUNDLE
+
+logger = logging.getLogger(__name__)
+
+# Compiled PDFs keyed by normalized LaTeX + compiler identity, on local disk.
+LATEX_PDF_CACHE_ENABLED = os.getenv("LATEX_PDF_CACHE_ENABLED", "1") == "1"
+LATEX_PDF_CACHE_DIR = os.getenv("LATEX_PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "smartcv-pdf-cache"))
+LATEX_PDF_CACHE_MAX_BYTES = int(os.getenv("LATEX_PDF_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+_COMMENT_LINE = re.compile(r"^[ \t]*%.*(?:\n|$)", re.M)
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.M)
+_BLANK_RUN = re.compile(r"\n{3,}")
+
+
+def normalize_latex(latex_code: str) -> str:
+    """
+    Drop what cannot change the output: whole-line comments, trailing
+    whitespace, CRLF, runs of blank lines beyond one paragraph break.
+    """
+    text = (latex_code or "").replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_SPACE.sub("", text)
+    text = _COMMENT_LINE.sub("", text)
+    text = _BLANK_RUN.sub("\n\n", text)
+    return text.strip() + "\n"
+
+
+def pdf_cache_key(latex_code: str) -> str:
+    """SHA-256 of the normalized source and the compiler that turns it into a PDF."""
+    digest = hashlib.sha256()
+    for part in (tectonic_version(), TECTONIC_BUNDLE, normalize_latex(latex_code)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(LATEX_PDF_CACHE_DIR, f"{key}.pdf")
+
+
+# ------------------ GET / PUT ------------------
+def cache_get(key: str):
+    """Cached PDF bytes, or None. A hit refreshes the entry's LRU position."""
+    if not LATEX_PDF_CACHE_ENABLED:
+        return None
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+    except OSError:
+        return None
+
+
+def cache_put(key: str, pdf_bytes: bytes):
+    if not LATEX_PDF_CACHE_ENABLED:
+        return
+    try:
+        os.makedirs(LATEX_PDF_CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=LATEX_PDF_CACHE_DIR, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, _path(key))  # atomic: readers never see half a PDF
+        _evict()
+    except OSError as e:
+        logger.warning(f"⚠️ PDF cache write failed: {e}")
+
+
+def _evict():
+    """Delete least recently used PDFs until the cache is back under 90% of its size limit."""
+    entries = []
+    total = 0
+    with os.scandir(LATEX_PDF_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".pdf"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    if total <= LATEX_PDF_CACHE_MAX_BYTES:
+        return
+
+    target = LATEX_PDF_CACHE_MAX_BYTES * 0.9
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# ------------------ COMPILE ------------------
+def compile_cached(latex_code: str, workdir=None):
+    """
+    Compile through the cache. Returns (pdf_bytes, key, hit).
+    `key` doubles as the content-addressed storage name of the PDF.
+    """
+    key = pdf_cache_key(latex_code)
+    pdf_bytes = cache_get(key)
+    if pdf_bytes is not None:
+        return pdf_bytes, key, True
+    pdf_bytes = compile_tex_to_pdf(latex_code, workdir=workdir)
+    cache_put(key, pdf_bytes)
+    return pdf_bytes, key, False
@@ -0,0 +1,130 @@
+import fitz  # PyMuPDF
+
+# A block wider than this share of the page is a full-width row (name, headings).
+SPANNING_FRACTION = 0.6
+# Minimum horizontal whitespace (pt) between columns to count as a gutter.
+MIN_GUTTER_WIDTH = 12
+# A real column holds at least one block this wide (right-aligned dates don't).
+MIN_COLUMN_FRACTION = 0.2
+
+# Text-only dict output: image blocks (and their pixel data) are left out.
+_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_BOLD_FLAG = 1 << 4
+_ITALIC_FLAG = 1 << 1
+
+
+# ------------------ COLUMN DETECTION ------------------
+def _find_gutters(blocks, page_width: float):
+    """
+    Return x positions of vertical gutters between text columns.
+
+    Projects every narrow block onto the x-axis and looks for uncovered
+    gaps in the middle of the page.
+    """
+    intervals = sorted((b["bbox"][0], b["bbox"][2]) for b in blocks)
+    if not intervals:
+        return []
+
+    gutters = []
+    _, covered_to = intervals[0]
+    for x0, x1 in intervals[1:]:
+        gap = x0 - covered_to
+        mid = (x0 + covered_to) / 2
+        if gap >= MIN_GUTTER_WIDTH and 0.15 * page_width < mid < 0.85 * page_width:
+            gutters.append(mid)
+        covered_to = max(covered_to, x1)
+
+    # Keep gutters that separate two real text columns
+    min_width = MIN_COLUMN_FRACTION * page_width
+    widest = [0.0] * (len(gutters) + 1)
+    for b in blocks:
+        center = (b["bbox"][0] + b["bbox"][2]) / 2
+        col = sum(center > g for g in gutters)
+        widest[col] = max(widest[col], b["bbox"][2] - b["bbox"][0])
+    keep = [
+        g for i, g in enumerate(gutters)
+        if widest[i] >= min_width and widest[i + 1] >= min_width
+    ]
+    return keep
+
+
+def _reading_order(blocks, page_width: float):
+    """
+    Order text blocks for reading: full-width rows split the page into
+    bands; inside a band, each column is read top-to-bottom, left to right.
+    Returns (ordered_blocks, column_count).
+    """
+    spanning = [b for b in blocks if b["bbox"][2] - b["bbox"][0] > SPANNING_FRACTION * page_width]
+    narrow = [b for b in blocks if b["bbox"][2] - b["bbox"][0] <= SPANNING_FRACTION * page_width]
+    gutters = _find_gutters(narrow, page_width)
+
+    if not gutters:
+        return sorted(blocks, key=lambda b: (round(b["bbox"][1]), b["bbox"][0])), 1
+
+    def column_of(block):
+        center = (block["bbox"][0] + block["bbox"][2]) / 2
+        return sum(center > g for g in gutters)
+
+    spanning.sort(key=lambda b: b["bbox"][1])
+    ordered = []
+    band_top = float("-inf")
+    for separator in spanning + [None]:
+        band_bottom = separator["bbox"][1] if separator else float("inf")
+        band = [b for b in narrow if band_top <= b["bbox"][1] < band_bottom]
+        band.sort(key=lambda b: (column_of(b), b["bbox"][1], b["bbox"][0]))
+        ordered.extend(band)
+        if separator:
+            ordered.append(separator)
+            band_top = separator["bbox"][1]
+
+    return ordered, len(gutters) + 1
+
+
+# ------------------ PAGE LAYOUT ------------------
+def extract_page_layout(page, page_index: int = 0) -> dict:
+    """
+    Single structured text pass over a PDF page.
+
+    Returns:
+      {
+        "text": plain text in reading order,
+        "spans": [{"text", "size", "bold", "italic", "font", "bbox", "page", "block", "line"}],
+        "columns": detected column count,
+        "text_rects": [bbox] of text blocks (for OCR region filtering),
+      }
+    """
+    data = page.get_text("dict", flags=_DICT_FLAGS)
+    blocks = [
+        b for b in data["blocks"]
+        if b.get("type") == 0 and any(s["text"].strip() for l in b["lines"] for s in l["spans"])
+    ]
+    ordered, columns = _reading_order(blocks, page.rect.width)
+
+    lines_out, spans_out = [], []
+    for block_no, block in enumerate(ordered):
+        for line_no, line in enumerate(block["lines"]):
+            line_text = "".join(s["text"] for s in line["spans"]).strip()
+            if line_text:
+                lines_out.append(line_text)
+            for span in line["spans"]:
+                if not span["text"].strip():
+                    continue
+                spans_out.append({
+                    "text": span["text"].strip(),
+                    "size": round(span["size"], 2),
+                    "bold": bool(span["flags"] & _BOLD_FLAG) or "bold" in span["font"].lower(),
+                    "italic": bool(span["flags"] & _ITALIC_FLAG),
+                    "font": span["font"],
+                    "bbox": [round(v, 2) for v in span["bbox"]],
+                    "page": page_index,
+                    "block": block_no,
+                    "line": line_no,
+                })
+
+    return {
+        "text": "\n".join(lines_out),
+        "spans": spans_out,
+        "columns": columns,
+        "text_rects": [tuple(b["bbox"]) for b in ordered],
+    }
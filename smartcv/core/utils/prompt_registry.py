@@ -0,0 +1,95 @@
+import os
+import hashlib
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = os.path.dirname(__file__)
+
+
+class Prompt:
+    """
+    A loaded prompt: a static system part (byte-identical on every call, so
+    provider-side prompt caching can reuse it) and a user template holding
+    only the per-call values, which always go last.
+    `version` hashes both parts and is used in response cache keys.
+    """
+
+    def __init__(self, name: str, system: str, user_template: str):
+        self.name = name
+        self.system = system
+        self.user_template = user_template
+        digest = hashlib.sha256()
+        for part in (system, user_template):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        self.version = digest.hexdigest()[:16]
+
+    def messages(self, **values):
+        """Chat messages: static system prompt first, then the filled-in user prompt."""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user_template.format(**values)},
+        ]
+
+
+def _read(filename: str) -> str:
+    path = os.path.join(PROMPT_DIR, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Prompt file not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _latex_system(system_prompt_file: str, template_file: str) -> str:
+    system_prompt = _read(system_prompt_file)
+    latex_template = _read(template_file)
+    # Replace placeholder {{TEMPLATE}} inside system prompt
+    if "{{TEMPLATE}}" in system_prompt:
+        return system_prompt.replace("{{TEMPLATE}}", latex_template)
+    return system_prompt + "\n\n" + latex_template
+
+
+# ------------------ REGISTRY ------------------
+_REGISTRY = {}
+
+
+def register(name: str, system: str, user_template_file: str) -> Prompt:
+    prompt = Prompt(name, system, _read(user_template_file))
+    _REGISTRY[name] = prompt
+    logger.info(f"📝 Prompt '{name}' loaded (version {prompt.version})")
+    return prompt
+
+
+def get_prompt(name: str) -> Prompt:
+    return _REGISTRY[name]
+
+
+def latex_prompt(system_prompt_file: str = "latex_system_prompt.txt",
+                 template_file: str = "latex_temp_1.txt") -> Prompt:
+    """LaTeX prompt for a system-prompt/template pair; non-default pairs load on first use."""
+    name = "latex" if (system_prompt_file, template_file) == _LATEX_DEFAULT else f"latex:{system_prompt_file}:{template_file}"
+    if name not in _REGISTRY:
+        register(name, _latex_system(system_prompt_file, template_file), "latex_user_prompt.txt")
+    return _REGISTRY[name]
+
+
+def prompt_versions() -> dict:
+    """{prompt name: version hash} for everything loaded in this process."""
+    return {name: p.version for name, p in _REGISTRY.items()}
+
+
+def today() -> str:
+    """Per-call date for the dynamic part of prompts (never baked into a template)."""
+    return datetime.now().strftime("%B %d, %Y")
+
+
+# Loaded once per process, at import (i.e. worker start).
+_LATEX_DEFAULT = ("latex_system_prompt.txt", "latex_temp_1.txt")
+register("resume_analysis", _read("resume_analysis_prompt.txt"), "resume_analysis_user.txt")
+register("jd_match", _read("jd_match_prompt.txt"), "jd_match_user.txt")
+register("latex_content", _read("latex_content_prompt.txt"), "latex_content_user.txt")
+# Same system part as latex_content, so section edits reuse its provider-side prompt cache
+register("latex_section", _read("latex_content_prompt.txt"), "latex_section_user.txt")
+latex_prompt(*_LATEX_DEFAULT)
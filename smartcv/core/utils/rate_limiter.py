@@ -0,0 +1,248 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+
+import openai
+
+from core.utils.token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Account-wide budgets, shared by every worker through Redis (per model).
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "500000"))
+# Output tokens reserved per call on top of the prompt estimate.
+OPENAI_OUTPUT_TOKEN_ALLOWANCE = int(os.getenv("OPENAI_OUTPUT_TOKEN_ALLOWANCE", "1500"))
+
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "1.0"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "60"))
+# How long a call may wait for budget before giving up.
+OPENAI_MAX_QUEUE_WAIT = float(os.getenv("OPENAI_MAX_QUEUE_WAIT", "600"))
+
+_PREFIX = "ratelimit:openai"
+
+# Refill both buckets (capacity = one minute of budget) from the Redis clock,
+# then take 1 request + `cost` tokens, or return how many ms to wait.
+_ACQUIRE_LUA = """
+redis.replicate_commands()  -- TIME before writes (no-op on Redis 7+)
+local pause = redis.call('PTTL', KEYS[2])
+if pause > 0 then return pause end
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+
+local b = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(b[1]) or rpm
+local tok = tonumber(b[2]) or tpm
+local ts = tonumber(b[3]) or now
+local minutes = math.max(now - ts, 0) / 60000
+req = math.min(rpm, req + minutes * rpm)
+tok = math.min(tpm, tok + minutes * tpm)
+
+local wait = 0
+if req < 1 then wait = math.max(wait, (1 - req) / rpm * 60000) end
+if tok < cost then wait = math.max(wait, (cost - tok) / tpm * 60000) end
+if wait == 0 then
+  req = req - 1
+  tok = tok - cost
+end
+redis.call('HSET', KEYS[1], 'req', tostring(req), 'tok', tostring(tok), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+# Give back (or charge) the difference between estimated and actual tokens.
+_SETTLE_LUA = """
+local tok = tonumber(redis.call('HGET', KEYS[1], 'tok'))
+if not tok then return 0 end
+tok = math.min(tonumber(ARGV[2]), tok + tonumber(ARGV[1]))
+redis.call('HSET', KEYS[1], 'tok', tostring(tok))
+return 1
+"""
+
+
+class RateLimitTimeout(RuntimeError):
+    """No budget became available within OPENAI_MAX_QUEUE_WAIT."""
+
+
+# One client per process (django_rq hands out a new one on every call);
+# the Lua scripts are registered on it once.
+_conn = None
+_scripts = {}
+_conn_lock = threading.Lock()
+
+
+def _redis():
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                try:
+                    import django_rq
+                    conn = django_rq.get_connection("default")
+                except Exception as e:
+                    logger.warning(f"⚠️ Rate limiter disabled (no Redis): {e}")
+                    return None
+                _scripts["acquire"] = conn.register_script(_ACQUIRE_LUA)
+                _scripts["settle"] = conn.register_script(_SETTLE_LUA)
+                _conn = conn
+    return _conn
+
+
+def _keys(model):
+    return [f"{_PREFIX}:{model}:bucket", f"{_PREFIX}:{model}:pause"]
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """Prompt estimate for a chat.completions body plus the output allowance."""
+    prompt = sum(estimate_tokens(m.get("content") or "") for m in request.get("messages", []))
+    return prompt + OPENAI_OUTPUT_TOKEN_ALLOWANCE
+
+
+def _try_acquire(model, tokens) -> float:
+    """Seconds to wait before retrying (0 = budget taken)."""
+    conn = _redis()
+    if conn is None:
+        return 0
+    try:
+        wait_ms = _scripts["acquire"](
+            keys=_keys(model), args=[OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT, tokens]
+        )
+        return int(wait_ms) / 1000
+    except Exception as e:
+        logger.warning(f"⚠️ Rate limiter unavailable, not throttling: {e}")
+        return 0
+
+
+def _settle(model, estimated, actual):
+    conn = _redis()
+    if conn is None or actual is None:
+        return
+    try:
+        _scripts["settle"](keys=_keys(model)[:1], args=[estimated - actual, OPENAI_TPM_LIMIT])
+    except Exception as e:
+        logger.warning(f"⚠️ Rate limiter settle failed: {e}")
+
+
+def _pause(model, seconds):
+    """A 429 means the provider disagrees with our buckets — hold every worker back."""
+    conn = _redis()
+    if conn is None:
+        return
+    try:
+        conn.set(_keys(model)[1], 1, px=max(int(seconds * 1000), 1))
+    except Exception as e:
+        logger.warning(f"⚠️ Rate limiter pause failed: {e}")
+
+
+# ------------------ RETRY POLICY ------------------
+def _retryable(e, retry_on) -> bool:
+    if isinstance(e, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return isinstance(e, retry_on)
+
+
+def _retry_after(e):
+    """Server hint in seconds, if the error carries one."""
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None  # HTTP-date form — fall back to our own backoff
+    return None
+
+
+def _backoff(attempt, e):
+    hint = _retry_after(e)
+    if hint is not None:
+        return min(hint, OPENAI_BACKOFF_MAX) + random.uniform(0, OPENAI_BACKOFF_BASE)
+    # Full jitter: spreads retries from many workers instead of synchronising them
+    return random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * 2 ** attempt))
+
+
+def _usage_tokens(result):
+    usage = getattr(result, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def _after_failure(model, attempt, e, max_retries):
+    """Log and return the delay before the next attempt, or re-raise if we're done."""
+    if attempt >= max_retries:
+        raise e
+    delay = _backoff(attempt, e)
+    if isinstance(e, openai.APIStatusError) and e.status_code == 429:
+        _pause(model, delay)
+    logger.warning(f"⚠️ {model} call failed ({e.__class__.__name__}), retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+    return delay
+
+
+# ------------------ ENTRY POINTS ------------------
+def rate_limited_call(call, request: dict, *, parse=None, max_retries: int = OPENAI_MAX_RETRIES, retry_on=()):
+    """
+    Run `call()` (one model request built from `request`) under the shared
+    RPM/TPM budget. Waits — rather than fails — while the budget is exhausted,
+    and retries transient errors with jittered exponential backoff,
+    honouring retry-after hints.
+
+    `call()` must return what the provider sent back (a completion, or the
+    StreamedText of a drained stream) so the budget is settled against the
+    actual token usage. `parse`, when given, turns that into the return
+    value; its errors count as a failed attempt (retried if in `retry_on`).
+    """
+    model = request.get("model", "default")
+    tokens = estimate_request_tokens(request)
+    for attempt in range(max_retries + 1):
+        waited = 0.0
+        while (wait := _try_acquire(model, tokens)) > 0:
+            if waited >= OPENAI_MAX_QUEUE_WAIT:
+                raise RateLimitTimeout(f"No {model} budget after waiting {waited:.0f}s")
+            time.sleep(wait + random.uniform(0, 0.05))
+            waited += wait
+        try:
+            response = call()
+            _settle(model, tokens, _usage_tokens(response))
+            return parse(response) if parse else response
+        except Exception as e:
+            if not _retryable(e, retry_on):
+                raise
+            time.sleep(_after_failure(model, attempt, e, max_retries))
+
+
+async def arate_limited_call(call, request: dict, *, parse=None, max_retries: int = OPENAI_MAX_RETRIES, retry_on=()):
+    """
+    Async variant of rate_limited_call; `call` is a coroutine function
+    (`parse` stays a plain function). The Redis round-trips run in a thread
+    so the event loop never blocks.
+    """
+    model = request.get("model", "default")
+    tokens = estimate_request_tokens(request)
+    for attempt in range(max_retries + 1):
+        waited = 0.0
+        while (wait := await asyncio.to_thread(_try_acquire, model, tokens)) > 0:
+            if waited >= OPENAI_MAX_QUEUE_WAIT:
+                raise RateLimitTimeout(f"No {model} budget after waiting {waited:.0f}s")
+            await asyncio.sleep(wait + random.uniform(0, 0.05))
+            waited += wait
+        try:
+            response = await call()
+            await asyncio.to_thread(_settle, model, tokens, _usage_tokens(response))
+            return parse(response) if parse else response
+        except Exception as e:
+            if not _retryable(e, retry_on):
+                raise
+            delay = await asyncio.to_thread(_after_failure, model, attempt, e, max_retries)
+            await asyncio.sleep(delay)
@@ -0,0 +1,104 @@
+import os
+
+# Ask the model for schema-constrained JSON (OpenAI Structured Outputs).
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "1") == "1"
+
+# Keywords our local validator uses but the API's strict mode does not accept.
+_LOCAL_ONLY = ("default", "minimum", "maximum")
+
+
+def _string(default=""):
+    return {"type": "string", "default": default}
+
+
+def _number(minimum, maximum, default=0, integer=False):
+    return {"type": "integer" if integer else "number", "minimum": minimum, "maximum": maximum, "default": default}
+
+
+def _array(items):
+    return {"type": "array", "items": items, "default": []}
+
+
+def _object(properties):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+ANALYSIS_SCHEMA = _object({
+    "ai_analysis": _object({
+        "ats_score": _number(0, 100, integer=True),
+        "grammar_feedback": _string(),
+        "impact_feedback": _string(),
+        "tone_feedback": _string(),
+        "keyword_feedback": _string(),
+        "overall_recommendations": _string(),
+        "confidence_score": _number(0.0, 1.0, default=0.0),
+    }),
+})
+
+JD_MATCH_SCHEMA = _object({
+    "status": _string("SUCCESS"),
+    "evaluation": _object({
+        "overall_summary": _string(),
+        "criteria": _array(_object({
+            "id": _number(1, 17, default=0, integer=True),
+            "name": _string(),
+            "score": _number(0, 5),
+            "feedback": _string(),
+        })),
+        "total_score": _number(0, 5),
+        "competitiveness_percentile": _string(),
+        "action_recommendation": {
+            "type": "string",
+            "enum": ["Immediate Interview", "Further Review", "Needs Major Revision", "Reject"],
+            "default": "Further Review",
+        },
+    }),
+})
+
+# Resume content for local LaTeX rendering (latex_temp_1.tex.j2). Each section
+# fills the list matching its kind and leaves the other two empty.
+LATEX_SECTION_SCHEMA = _object({
+    "title": _string(),
+    "kind": {"type": "string", "enum": ["entries", "skills", "lines"], "default": "lines"},
+    "entries": _array(_object({
+        "title": _string(),
+        "location": _string(),
+        "subtitle": _string(),
+        "dates": _string(),
+        "bullets": _array(_object({"label": _string(), "text": _string()})),
+    })),
+    "skills": _array(_object({"category": _string(), "details": _string()})),
+    "lines": _array(_object({"text": _string(), "date": _string()})),
+})
+
+LATEX_CONTENT_SCHEMA = _object({
+    "name": _string(),
+    "email": _string(),
+    "phone": _string(),
+    "website": _string(),
+    "linkedin": _string(),
+    "sections": _array(LATEX_SECTION_SCHEMA),
+})
+
+
+def _api_schema(schema):
+    if isinstance(schema, dict):
+        return {k: _api_schema(v) for k, v in schema.items() if k not in _LOCAL_ONLY}
+    if isinstance(schema, list):
+        return [_api_schema(v) for v in schema]
+    return schema
+
+
+def response_format(name: str, schema: dict):
+    """`response_format` argument for chat.completions (None when structured output is off)."""
+    if not LLM_STRUCTURED_OUTPUT:
+        return None
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": _api_schema(schema)},
+    }
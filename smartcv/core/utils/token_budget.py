@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-call input budgets (estimated tokens) for the text we send to the model.
+RESUME_TOKEN_BUDGET = int(os.getenv("LLM_RESUME_TOKEN_BUDGET", "6000"))
+JD_TOKEN_BUDGET = int(os.getenv("LLM_JD_TOKEN_BUDGET", "3000"))
+
+# Body lines every rubric-scored section keeps, however tight the budget.
+MIN_SECTION_LINES = 3
+
+# ------------------ SECTIONS ------------------
+# Sections the analysis / JD rubrics score — trimmed last, never dropped.
+SCORED_SECTIONS = [
+    "summary", "professional summary", "profile", "objective", "about me",
+    "experience", "work experience", "professional experience", "employment",
+    "employment history", "work history", "career history", "internship", "internships",
+    "projects", "personal projects", "education", "academic background", "qualifications",
+    "skills", "technical skills", "core competencies", "certifications", "certificates",
+    "licenses", "achievements", "awards", "honors", "publications", "leadership",
+]
+# Sections nothing downstream scores — dropped first when over budget.
+LOW_PRIORITY_SECTIONS = [
+    "hobbies", "interests", "hobbies and interests", "references", "declaration",
+    "personal details", "personal information", "personal data", "extracurricular activities",
+]
+
+_HEADING = re.compile(r"^[\W_]*(?P<name>[A-Za-z][A-Za-z &/]{1,40}?)[\s:_-]*$")
+
+# ------------------ CLEANUP PATTERNS ------------------
+_BOILERPLATE = re.compile(
+    r"^(?:references\s+(?:are\s+)?available\s+(?:up)?on\s+request\.?"
+    r"|page\s+\d+(?:\s+of\s+\d+)?"
+    r"|curriculum\s+vitae|resume|r[ée]sum[ée]"
+    r"|i\s+hereby\s+declare\b.*)$",
+    re.IGNORECASE,
+)
+_INLINE_SPACE = re.compile(r"[ \t\f\v]+")
+_TOKEN = re.compile(r"[^\W\d_]{1,6}|\d{1,3}|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local, dependency-free token estimate (BPE-like: short word pieces,
+    digit groups, one token per symbol). Slightly pessimistic on purpose.
+    """
+    return len(_TOKEN.findall(text or ""))
+
+
+def _is_garbage(line: str) -> bool:
+    """OCR noise: a line without a single letter or digit (bullet markers excepted)."""
+    return not any(c.isalnum() for c in line) and line not in ("-", "*", "•")
+
+
+def _running_lines(lines) -> set:
+    """
+    Indexes of running page headers/footers: later runs of 2+ consecutive
+    lines that repeat the document's first (or last) lines. A single
+    repeated line — a job title also shown under the name — is content.
+    """
+    rows = [i for i, line in enumerate(lines) if line]
+    text = [lines[i] for i in rows]
+    running = set()
+    # (reference block, end of the range its repeats are looked for in)
+    for ref, stop in ((text[:3], len(text)), (text[-3:], len(text) - 3)):
+        for j in range(3, stop):
+            for s in range(len(ref)):
+                run = 0
+                while j + run < stop and s + run < len(ref) and text[j + run] == ref[s + run]:
+                    run += 1
+                if run >= 2:
+                    running.update(rows[j:j + run])
+    return running
+
+
+def clean_text(text: str):
+    """
+    Collapse whitespace, drop OCR garbage and boilerplate lines, and drop
+    running page headers/footers. Returns (text, dropped_line_count).
+    """
+    lines, dropped = [], 0
+    for raw in (text or "").splitlines():
+        line = _INLINE_SPACE.sub(" ", raw).strip()
+        if line and (_is_garbage(line) or _BOILERPLATE.match(line)):
+            dropped += 1
+            continue
+        lines.append(line)
+
+    running = _running_lines(lines)
+    dropped += len(running)
+    kept = []
+    for i, line in enumerate(lines):
+        if i in running or (not line and (not kept or not kept[-1])):
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip(), dropped
+
+
+def _heading_name(line: str):
+    if len(line) > 45:
+        return None
+    m = _HEADING.match(line)
+    if not m:
+        return None
+    name = m.group("name").strip().lower()
+    if name in SCORED_SECTIONS or name in LOW_PRIORITY_SECTIONS:
+        return name
+    return None
+
+
+def _sections(lines):
+    """[(heading_name or None, [lines])] — the first block is the contact/header block."""
+    sections = [(None, [])]
+    for line in lines:
+        name = _heading_name(line)
+        if name:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _truncate(text: str, budget: int) -> str:
+    """Hard cut at roughly `budget` tokens (last resort)."""
+    for i, m in enumerate(_TOKEN.finditer(text)):
+        if i == budget:
+            return text[:m.start()].rstrip()
+    return text
+
+
+def fit_resume(text: str, budget: int = RESUME_TOKEN_BUDGET):
+    """
+    Bring a resume within `budget` estimated tokens. Text that already fits
+    is returned untouched; otherwise the order of cuts is: cleanup (whitespace, OCR garbage, boilerplate) →
+    unscored sections (hobbies, references, …) → trailing lines of the
+    longest sections, unrecognised ones first. The contact block, every
+    heading and the first MIN_SECTION_LINES of each scored section are kept.
+    Returns (text, stats) with pre/post token counts.
+    """
+    before = estimate_tokens(text)
+    stats = {"tokens_before": before, "budget": budget, "dropped_lines": 0, "trimmed_sections": []}
+    if before <= budget:
+        stats["tokens_after"] = before
+        _log("resume", stats)
+        return text, stats
+
+    cleaned, stats["dropped_lines"] = clean_text(text)
+    if estimate_tokens(cleaned) > budget:
+        sections = _sections(cleaned.splitlines())
+        kept = []
+        for name, body in sections:
+            if name in LOW_PRIORITY_SECTIONS:
+                stats["trimmed_sections"].append(name)
+            else:
+                kept.append([name, body, [estimate_tokens(l) for l in body]])
+
+        total = sum(sum(costs) for _, _, costs in kept) + len(kept)
+        while total > budget:
+            # Unrecognised sections give way first, then the longest scored one
+            candidates = [
+                s for s in kept
+                if s[0] is not None and len(s[1]) > 1 + (MIN_SECTION_LINES if s[0] in SCORED_SECTIONS else 0)
+            ]
+            if not candidates:
+                break
+            victim = max(candidates, key=lambda s: (s[0] not in SCORED_SECTIONS, sum(s[2])))
+            victim[1].pop()
+            total -= victim[2].pop()
+            if victim[0] not in stats["trimmed_sections"]:
+                stats["trimmed_sections"].append(victim[0])
+
+        cleaned = "\n".join(line for _, body, _ in kept for line in body)
+        if estimate_tokens(cleaned) > budget:
+            cleaned = _truncate(cleaned, budget)
+            stats["truncated"] = True
+
+    stats["tokens_after"] = estimate_tokens(cleaned)
+    _log("resume", stats)
+    return cleaned, stats
+
+
+def fit_text(text: str, budget: int, label: str = "text"):
+    """
+    Cleanup plus a hard token cap, for free text without resume sections
+    (e.g. a JD). Text that already fits is returned untouched.
+    """
+    before = estimate_tokens(text)
+    stats = {"tokens_before": before, "budget": budget, "dropped_lines": 0}
+    if before <= budget:
+        stats["tokens_after"] = before
+        _log(label, stats)
+        return text, stats
+
+    cleaned, stats["dropped_lines"] = clean_text(text)
+    if estimate_tokens(cleaned) > budget:
+        cleaned = _truncate(cleaned, budget)
+        stats["truncated"] = True
+    stats["tokens_after"] = estimate_tokens(cleaned)
+    _log(label, stats)
+    return cleaned, stats
+
+
+def compact_json(obj) -> str:
+    """JSON for prompts: no indentation or spaces after separators."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _log(label: str, stats: dict):
+    logger.info(
+        f"✂️ {label} input: {stats['tokens_before']} → {stats['tokens_after']} tokens "
+        f"(budget {stats['budget']}, {stats['dropped_lines']} lines dropped)"
+    )
@@ -0,0 +1,90 @@
+import io
+import zipfile
+import fitz  # PyMuPDF
+import puremagic
+
+from core.utils.ocr import image_regions
+
+# Only this many pages are probed for a text layer.
+TEXT_LAYER_PROBE_PAGES = 5
+
+
+# ------------------ FILE TYPE SNIFFING ------------------
+def sniff_file_type(data: bytes):
+    """
+    Detect the real document type from magic bytes (not the filename).
+    Returns "pdf", "docx" or None.
+    """
+    try:
+        ext = puremagic.from_string(data[:4096])
+    except puremagic.PureError:
+        ext = None
+
+    if ext == ".pdf" or data[:1024].lstrip().startswith(b"%PDF-"):
+        return "pdf"
+
+    # DOCX is a zip container — confirm it actually holds a Word body
+    if ext in (".zip", ".docx") or data[:4] == b"PK\x03\x04":
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                if "word/document.xml" in zf.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            return None
+
+    return None
+
+
+# ------------------ UPLOAD TRIAGE ------------------
+def triage_upload(file) -> dict:
+    """
+    Inspect an uploaded file before any job is queued.
+
+    Returns ResumeUpload field values:
+      {"file_type": "pdf" | "docx", "page_count": int | None, "has_text_layer": bool}
+
+    Raises ValueError for unsupported, corrupt or encrypted files.
+    """
+    file.seek(0)
+    data = file.read()
+    file.seek(0)
+
+    file_type = sniff_file_type(data)
+    if file_type is None:
+        raise ValueError("Unsupported file type. Upload a PDF or DOCX resume.")
+
+    if file_type == "docx":
+        return {"file_type": "docx", "page_count": None, "has_text_layer": True}
+
+    try:
+        with fitz.open(stream=data, filetype="pdf") as pdf:
+            if pdf.needs_pass:
+                raise ValueError("Password-protected PDFs are not supported.")
+            page_count = pdf.page_count
+            has_text_layer = any(
+                pdf[i].get_text("text").strip()
+                for i in range(min(page_count, TEXT_LAYER_PROBE_PAGES))
+            )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Could not read PDF: {e}")
+
+    if page_count == 0:
+        raise ValueError("PDF has no pages.")
+
+    return {"file_type": "pdf", "page_count": page_count, "has_text_layer": has_text_layer}
+
+
+# ------------------ OCR PROBE ------------------
+def needs_ocr(data: bytes) -> bool:
+    """
+    True when extracting this PDF would run OCR on any page: a page without
+    text, or one carrying an image large enough to be OCR'd. Errs towards
+    True (images are checked without subtracting the text blocks).
+    """
+    try:
+        with fitz.open(stream=data, filetype="pdf") as pdf:
+            return any(not page.get_text("text").strip() or image_regions(page) for page in pdf)
+    except Exception:
+        return True
@@ -1,9 +1,13 @@
 # core/views/api.py
 
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse, HttpResponse, HttpResponseNotModified
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, require_http_methods
+from django.urls import reverse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
 from core.tasks import process_jd_match
+import os
+import re
 import json
 import django_rq
 
@@ -11,13 +15,20 @@ from core.models import (
     ResumeUpload,
     ResumeAnalysis,
     LatexResume,
+    LatexSection,
     JDMatch
 )
 
 from core.tasks import (
     process_resume_upload,
-    generate_latex_task
+    generate_latex_task,
+    regenerate_latex_sections_task,
+    file_sha256,
+    queue_name_for,
+    prime_resume_text,
 )
+from core.utils.triage import triage_upload
+from core.latex_sections import HEADER_KEY
 
 
 # -------------------------------------------------------
@@ -33,11 +44,22 @@ def api_resume_analyze(request):
     if not file:
         return JsonResponse({"error": "Resume file is required."}, status=400)
 
-    # Save the resume
-    instance = ResumeUpload.objects.create(user=request.user, file=file)
+    # Reject bad files here, before a worker slot is spent on them
+    try:
+        triage = triage_upload(file)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    # Queue async processing
-    queue = django_rq.get_queue("default")
+    # Save the resume (hash lets the worker reuse text from identical uploads)
+    instance = ResumeUpload.objects.create(
+        user=request.user, file=file, sha256=file_sha256(file), **triage
+    )
+
+    # Small text-layer uploads are extracted from memory right here
+    prime_resume_text(instance, file)
+
+    # Queue async processing (scanned PDFs → OCR queue)
+    queue = django_rq.get_queue(queue_name_for(instance))
     job = queue.enqueue(process_resume_upload, instance.id)
 
     return JsonResponse({
@@ -121,7 +143,168 @@ def api_latex_status(request, latex_resume_id):
     except LatexResume.DoesNotExist:
         return JsonResponse({"error": "LaTeX resume not found."}, status=404)
 
-    return JsonResponse(latex_instance.result_json or {"status": "PROCESSING"})
+    result = dict(latex_instance.result_json or {"status": "PROCESSING"})
+    # Rows compiled before PDFs were served separately still hold a base64 copy
+    result.pop("pdf_data_uri", None)
+    if result.get("status") == "SUCCESS" and latex_instance.pdf_file:
+        result["pdf_url"] = reverse("api_latex_pdf", args=[latex_instance.id])
+    return JsonResponse(result)
+
+
+@login_required(login_url="/login/")
+@require_http_methods(["GET", "POST"])
+def api_latex_sections(request, latex_resume_id):
+    """
+    GET  → the stored fragments (key, title, content hash) of a template-mode resume.
+    POST → {"guidance": {key: instruction}, "edits": {key: content}}: regenerate or
+           replace only those sections, then reassemble and recompile in the background.
+    """
+    try:
+        latex_instance = LatexResume.objects.get(id=latex_resume_id, user=request.user)
+    except LatexResume.DoesNotExist:
+        return JsonResponse({"error": "LaTeX resume not found."}, status=404)
+
+    sections = list(LatexSection.objects.filter(latex_resume=latex_instance).order_by("position"))
+    if not sections:
+        return JsonResponse(
+            {"error": "This resume has no stored sections (generate it with LATEX_RENDER_MODE=template)."},
+            status=400,
+        )
+
+    if request.method == "GET":
+        return JsonResponse({"sections": [
+            {"key": s.key, "title": s.content.get("title", ""), "content": s.content, "content_hash": s.content_hash}
+            for s in sections
+        ]})
+
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Body must be JSON."}, status=400)
+    if not isinstance(body, dict):
+        return JsonResponse({"error": "Body must be a JSON object."}, status=400)
+    guidance = body.get("guidance") or {}
+    edits = body.get("edits") or {}
+    if not isinstance(guidance, dict) or not all(isinstance(v, str) for v in guidance.values()):
+        return JsonResponse({"error": "guidance must map section keys to instructions."}, status=400)
+    if not isinstance(edits, dict) or not all(isinstance(v, dict) for v in edits.values()):
+        return JsonResponse({"error": "edits must map section keys to section content."}, status=400)
+    if not guidance and not edits:
+        return JsonResponse({"error": "Nothing to change."}, status=400)
+
+    unknown = sorted((set(guidance) | set(edits)) - {s.key for s in sections})
+    if unknown:
+        return JsonResponse({"error": f"Unknown section(s): {', '.join(unknown)}"}, status=400)
+    if HEADER_KEY in guidance:
+        return JsonResponse({"error": "The header can only be edited directly, not regenerated."}, status=400)
+
+    latex_instance.result_json = {"status": "PROCESSING"}
+    latex_instance.save(update_fields=["result_json"])
+
+    queue = django_rq.get_queue("default")
+    job = queue.enqueue(regenerate_latex_sections_task, latex_instance.id, guidance, edits)
+
+    return JsonResponse({
+        "status": "PROCESSING_LATEX",
+        "latex_resume_id": latex_instance.id,
+        "sections": sorted(set(guidance) | set(edits)),
+        "job_id": job.id,
+    })
+
+
+def _pdf_etag(latex_instance):
+    # Stored names are content-addressed (latex_resumes/<sha256>.pdf), so the
+    # name alone identifies the bytes, whatever state result_json is in.
+    return f'"{os.path.splitext(os.path.basename(latex_instance.pdf_file.name))[0]}"'
+
+
+def _byte_range(header, size):
+    """
+    (start, end) for a single "bytes=" range, None to send the whole file,
+    or False when the range cannot be satisfied.
+    """
+    m = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if not m or m.groups() == ("", ""):
+        return None
+    first, last = m.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+@login_required(login_url="/login/")
+def api_latex_pdf(request, latex_resume_id):
+    """
+    Stream the compiled PDF (inline preview; ?download=1 for an attachment).
+    Supports conditional requests (ETag / Last-Modified → 304) and single byte ranges (206).
+    """
+    try:
+        latex_instance = LatexResume.objects.get(id=latex_resume_id, user=request.user)
+    except LatexResume.DoesNotExist:
+        return JsonResponse({"error": "LaTeX resume not found."}, status=404)
+    if not latex_instance.pdf_file:
+        return JsonResponse({"error": "PDF not ready."}, status=404)
+
+    field = latex_instance.pdf_file
+    etag = _pdf_etag(latex_instance)
+    try:
+        size = field.size
+        last_modified = field.storage.get_modified_time(field.name)
+    except (OSError, NotImplementedError):
+        return JsonResponse({"error": "PDF file missing."}, status=404)
+
+    def _headers(response):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        response["Accept-Ranges"] = "bytes"
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    # ---- Conditional GET ----
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        not_modified = if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    else:
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        not_modified = since is not None and int(last_modified.timestamp()) <= since
+    if not_modified:
+        return _headers(HttpResponseNotModified())
+
+    as_attachment = request.GET.get("download") == "1"
+    filename = f"resume_{latex_instance.id}.pdf"
+
+    # ---- Range (ignored when If-Range names another version) ----
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range.strip() == etag:
+        byte_range = _byte_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return _headers(response)
+
+    if byte_range:
+        start, end = byte_range
+        with field.open("rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start + 1)
+        response = HttpResponse(chunk, status=206, content_type="application/pdf")
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+        return _headers(response)
+
+    response = FileResponse(
+        field.open("rb"), as_attachment=as_attachment, filename=filename, content_type="application/pdf"
+    )
+    return _headers(response)
 
 
 
@@ -3,7 +3,6 @@ from django.shortcuts import render
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from core.models import ResumeUpload
-from core.utils.extract_text import extract_text_from_docx, extract_text_from_pdf
 from core.utils.normalize import normalize_text
 from core.utils.local_checks import run_local_checks
 from core.utils.jd_resume_analysis import match_resume_to_jd
@@ -11,7 +10,8 @@ import django_rq
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from core.models import ResumeUpload, JDMatch
-from core.tasks import process_jd_match
+from core.tasks import process_jd_match, file_sha256, get_resume_text, queue_name_for, prime_resume_text
+from core.utils.triage import triage_upload
 
 @require_POST
 @login_required(login_url="/login/")
@@ -22,15 +22,13 @@ def upload_resume_with_jd(request):
     if not file or not jd_text:
         return render(request, "core/jd_upload.html", {"error": "Please upload resume and job description."})
 
-    instance = ResumeUpload.objects.create(file=file, user=request.user)
-    path = instance.file.path
-
-    if path.lower().endswith(".pdf"):
-        resume_text = extract_text_from_pdf(path)
-    else:
-        resume_text = extract_text_from_docx(path)
+    try:
+        triage = triage_upload(file)
+    except ValueError as e:
+        return render(request, "core/jd_upload.html", {"error": str(e)})
 
-    resume_text = normalize_text(resume_text)
+    instance = ResumeUpload.objects.create(file=file, user=request.user, sha256=file_sha256(file), **triage)
+    resume_text = get_resume_text(instance)
     jd_text = normalize_text(jd_text)
 
     local_check = run_local_checks(resume_text)
@@ -50,9 +48,12 @@ def upload_resume_with_jd(request):
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from core.models import ResumeUpload
-from core.utils.extract_text import extract_text_from_pdf, extract_text_from_docx
 from core.utils.normalize import normalize_text
+import os
+import uuid
 
+# Most job descriptions accepted in one multi-JD request.
+JD_MATCH_MAX_JDS = int(os.getenv("JD_MATCH_MAX_JDS", "20"))
 
 
 @require_POST
@@ -66,7 +67,15 @@ def jd_match_api(request):
     if not jd_text:
         return JsonResponse({"error": "Job Description required."}, status=400)
 
-    resume = ResumeUpload.objects.create(user=request.user, file=file)
+    try:
+        triage = triage_upload(file)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    resume = ResumeUpload.objects.create(
+        user=request.user, file=file, sha256=file_sha256(file), **triage
+    )
+    prime_resume_text(resume, file)
 
     jd_match = JDMatch.objects.create(
         user=request.user,
@@ -76,7 +85,7 @@ def jd_match_api(request):
         result_json={"status": "PROCESSING"},
     )
 
-    queue = django_rq.get_queue("default")
+    queue = django_rq.get_queue(queue_name_for(resume))
     queue.enqueue("core.tasks.process_jd_match", jd_match.id)
 
     return JsonResponse({"status": "PROCESSING", "jd_id": jd_match.id})
@@ -88,3 +97,96 @@ def jd_match_status(request, jd_id):
         return JsonResponse(jd.result_json)
     except JDMatch.DoesNotExist:
         return JsonResponse({"error": "No such job"}, status=404)
+
+
+def _posted_jd_texts(request):
+    """JDs from repeated `jd_text` fields, or a JSON list in `jd_texts`."""
+    texts = request.POST.getlist("jd_text")
+    if not texts and request.POST.get("jd_texts"):
+        try:
+            texts = json.loads(request.POST["jd_texts"])
+        except ValueError:
+            return None
+        if not isinstance(texts, list):
+            return None
+    return [str(t).strip() for t in texts if str(t).strip()]
+
+
+@require_POST
+@login_required(login_url="/login/")
+def jd_match_batch_api(request):
+    """
+    One resume (new upload, or `resume_id` of an earlier one) × many JDs.
+    Creates one JDMatch per JD under a shared batch id and queues a single job.
+    """
+    jd_texts = _posted_jd_texts(request)
+    if jd_texts is None:
+        return JsonResponse({"error": "jd_texts must be a JSON list of strings."}, status=400)
+    if not jd_texts:
+        return JsonResponse({"error": "At least one Job Description required."}, status=400)
+    if len(jd_texts) > JD_MATCH_MAX_JDS:
+        return JsonResponse({"error": f"At most {JD_MATCH_MAX_JDS} Job Descriptions per request."}, status=400)
+
+    file = request.FILES.get("resume")
+    if file:
+        try:
+            triage = triage_upload(file)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        resume = ResumeUpload.objects.create(
+            user=request.user, file=file, sha256=file_sha256(file), **triage
+        )
+        prime_resume_text(resume, file)
+    else:
+        resume_id = request.POST.get("resume_id", "")
+        resume = ResumeUpload.objects.filter(user=request.user, id=resume_id).first() if resume_id.isdigit() else None
+        if not resume:
+            return JsonResponse({"error": "Resume file or resume_id required."}, status=400)
+
+    batch_id = uuid.uuid4().hex
+    jd_matches = JDMatch.objects.bulk_create([
+        JDMatch(
+            user=request.user,
+            resume=resume,
+            jd_text=jd_text,
+            status="PROCESSING",
+            result_json={"status": "PROCESSING"},
+            batch_id=batch_id,
+        )
+        for jd_text in jd_texts
+    ])
+
+    queue = django_rq.get_queue(queue_name_for(resume))
+    queue.enqueue("core.tasks.process_jd_match_batch", [m.id for m in jd_matches])
+
+    return JsonResponse({
+        "status": "PROCESSING",
+        "batch_id": batch_id,
+        "resume_id": resume.id,
+        "jd_ids": [m.id for m in jd_matches],
+    })
+
+
+@login_required(login_url="/login/")
+def jd_match_batch_status(request, batch_id):
+    matches = list(
+        JDMatch.objects.filter(batch_id=batch_id, user=request.user)
+        .order_by("id")
+        .values("id", "status", "result_json")
+    )
+    if not matches:
+        return JsonResponse({"error": "No such batch"}, status=404)
+
+    counts = {}
+    for m in matches:
+        counts[m["status"]] = counts.get(m["status"], 0) + 1
+
+    return JsonResponse({
+        "batch_id": batch_id,
+        "status": "PROCESSING" if counts.get("PROCESSING") else "DONE",
+        "counts": counts,
+        "matches": [
+            {"jd_id": m["id"], "status": m["status"], "result": m["result_json"]}
+            for m in matches
+        ],
+    })
@@ -5,10 +5,9 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from core.models import ResumeUpload
-from core.tasks import process_resume_upload
-from core.utils.extract_text import extract_text_from_docx, extract_text_from_pdf
-from core.utils.normalize import normalize_text
+from core.tasks import process_resume_upload, file_sha256, get_resume_text, queue_name_for
 from core.utils.local_checks import run_local_checks
+from core.utils.triage import triage_upload
 
 @require_POST
 @login_required(login_url="/login/")
@@ -17,20 +16,16 @@ def upload_resume(request):
     if not file:
         return render(request, "core/upload.html", {"error": "Please select a file to upload."})
 
-    instance = ResumeUpload.objects.create(file=file, user=request.user)
-    file_path = instance.file.path
+    try:
+        triage = triage_upload(file)
+    except ValueError as e:
+        return render(request, "core/upload.html", {"error": str(e)})
 
-    if file_path.lower().endswith(".pdf"):
-        resume_text = extract_text_from_pdf(file_path)
-    elif file_path.lower().endswith(".docx"):
-        resume_text = extract_text_from_docx(file_path)
-    else:
-        return render(request, "core/upload.html", {"error": "Unsupported file type."})
-
-    resume_text = normalize_text(resume_text)
+    instance = ResumeUpload.objects.create(file=file, user=request.user, sha256=file_sha256(file), **triage)
+    resume_text = get_resume_text(instance)
     local_check = run_local_checks(resume_text)
 
-    queue = django_rq.get_queue("default")
+    queue = django_rq.get_queue(queue_name_for(instance))
     job = queue.enqueue(process_resume_upload, instance.id)
 
     result = {
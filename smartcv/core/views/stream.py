@@ -0,0 +1,109 @@
+# core/views/stream.py
+"""
+Server-Sent Events for in-progress LLM results.
+
+Workers publish partial fields to Redis while the model is still writing
+(core.utils.llm_stream); these views relay them to the browser. They are
+async views, so run the project under ASGI (smartcv/asgi.py) — under WSGI
+every open stream would hold a whole worker thread.
+"""
+import json
+import asyncio
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+
+from core.models import ResumeUpload, ResumeAnalysis, JDMatch
+from core.utils.llm_stream import async_redis, channel_name, snapshot_key
+
+HEARTBEAT_SECONDS = 15
+STREAM_MAX_SECONDS = 600
+
+
+def _sse(event: str, data) -> str:
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _relay(kind: str, object_id, stored_result):
+    """
+    Yield SSE frames: the snapshot so far, then live updates until "done".
+    `stored_result` is an async callable returning the final result if it is
+    already in the database (covers streams opened after the snapshot expired).
+    """
+    conn = async_redis()
+    pubsub = conn.pubsub()
+    try:
+        # Subscribe before reading the snapshot so nothing falls in between
+        await pubsub.subscribe(channel_name(kind, object_id))
+
+        result = await stored_result()
+        if result is not None:
+            yield _sse("done", result)
+            return
+
+        snapshot = await conn.get(snapshot_key(kind, object_id))
+        if snapshot:
+            snapshot = json.loads(snapshot)
+            if snapshot.get("status") == "DONE":
+                yield _sse("done", snapshot["result"])
+                return
+            yield _sse("snapshot", snapshot)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_MAX_SECONDS
+        while loop.time() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            payload = json.loads(message["data"])
+            yield _sse(payload["event"], payload["data"])
+            if payload["event"] == "done":
+                return
+        yield _sse("timeout", {"status": "PROCESSING"})
+    finally:
+        await pubsub.aclose()
+        await conn.aclose()
+
+
+def _stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
+
+
+@login_required(login_url="/login/")
+async def api_resume_stream(request, resume_id):
+    """
+    SSE: partial resume analysis fields as the model produces them.
+    """
+    user = await request.auser()
+    if not await ResumeUpload.objects.filter(id=resume_id, user=user).aexists():
+        return JsonResponse({"error": "Resume not found."}, status=404)
+
+    async def stored_result():
+        analysis = await ResumeAnalysis.objects.filter(resume_id=resume_id).afirst()
+        return analysis.data if analysis else None
+
+    return _stream_response(_relay("resume", resume_id, stored_result))
+
+
+@login_required(login_url="/login/")
+async def api_jd_stream(request, jd_id):
+    """
+    SSE: JD match summary and per-criterion scores as they complete.
+    """
+    user = await request.auser()
+    jd_instance = await JDMatch.objects.filter(id=jd_id, user=user).afirst()
+    if jd_instance is None:
+        return JsonResponse({"error": "Not found"}, status=404)
+
+    async def stored_result():
+        await jd_instance.arefresh_from_db(fields=["result_json"])
+        result = jd_instance.result_json or {}
+        return result if result.get("status") not in (None, "PROCESSING") else None
+
+    return _stream_response(_relay("jd", jd_id, stored_result))
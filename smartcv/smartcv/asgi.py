@@ -3,6 +3,10 @@ ASGI config for smartcv project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live-result endpoints (/api/resume/stream/, /api/jd/stream/) are async
+Server-Sent Events views; serve them through this application, e.g.
+``uvicorn smartcv.asgi:application``, so open streams don't pin worker threads.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """